@@ -1,17 +1,78 @@
+import atexit
+import json
 import logging
 import os
 import sqlite3
+import time
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, jsonify, render_template, request, stream_with_context
 from flask_cors import CORS
 
-from search import search_products
+from metrics import CONTENT_TYPE, gauge, histogram, render_latest
+from offers import as_dicts
+
+from scrapers.aio import shutdown_aio
+from scrapers.browser_pool import browser_pool_stats, shutdown_browser_pool
+from scrapers.fetch_strategy import FETCH_STRATEGY
+from scrapers.http_cache import get_http_cache
+from scrapers.parse_pool import shutdown_parse_pool
+from scrapers.preview_cache import PREVIEW_CACHE
+from scrapers.retry import FETCHER
+from scrapers.scheduler import INTERACTIVE, get_scheduler, request_priority
+from scrapers.transport import get_transport
+from scrapers.utils import close_sessions
+from search import (
+    SCRAPER_HEALTH,
+    SCRAPER_SOURCES,
+    SEARCH_CACHE,
+    SEARCH_FLIGHTS,
+    search_products,
+    stream_search_events,
+)
 
 app = Flask(__name__)
 app.logger.setLevel(logging.INFO)
 CORS(app)
+atexit.register(shutdown_browser_pool)
+atexit.register(close_sessions)
+atexit.register(shutdown_parse_pool)
+atexit.register(shutdown_aio)
+
+HTTP_REQUEST_SECONDS = histogram(
+    "pricescout_http_request_duration_seconds",
+    "Time to build each API response (time to headers for streams).",
+    ("endpoint", "method", "status"),
+)
+_BREAKER_STATES = ("closed", "half_open", "open")
+
+
+def _cache_gauge(stats: Dict[str, object]) -> Dict[tuple, float]:
+    return {(name,): value for name, value in stats.items() if isinstance(value, (int, float)) and not isinstance(value, bool)}
+
+
+gauge(
+    "pricescout_search_cache",
+    "Search cache counters and size.",
+    lambda: _cache_gauge(SEARCH_CACHE.stats()),
+    ("stat",),
+)
+gauge(
+    "pricescout_preview_cache",
+    "Preview cache counters and size.",
+    lambda: _cache_gauge({k: v for k, v in PREVIEW_CACHE.stats().items() if k != "stored_entries"}),
+    ("stat",),
+)
+gauge(
+    "pricescout_scraper_breaker_state",
+    "Circuit breaker state per scraper (0 closed, 1 half-open, 2 open).",
+    lambda: {
+        (name,): _BREAKER_STATES.index(stats["state"])
+        for name, stats in SCRAPER_HEALTH.stats([name for name, _scraper in SCRAPER_SOURCES]).items()
+    },
+    ("scraper",),
+)
 
 DEFAULT_DB_PATH = os.path.join("/tmp", "google_reviews.db")
 REVIEW_DB_PATH = os.environ.get("REVIEW_DB_PATH", DEFAULT_DB_PATH)
@@ -110,6 +171,29 @@ def _init_db() -> None:
 _init_db()
 
 
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response: Response) -> Response:
+    started = g.pop("request_started", None)
+    if started is not None and request.endpoint != "metrics":
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render_latest(), content_type=CONTENT_TYPE)
+
+
 @app.route("/")
 def home():
     return render_template("index.html")
@@ -121,8 +205,54 @@ def api_search_products():
     if not query:
         return jsonify({"error": "Missing query parameter 'q'."}), 400
 
-    results = search_products(query)
-    return jsonify({"query": query, "results": results, "count": len(results)})
+    with request_priority(INTERACTIVE):
+        results = search_products(query)
+    return jsonify({"query": query, "results": as_dicts(results), "count": len(results)})
+
+
+@app.route("/api/search/stream", methods=["GET"])
+def api_search_stream():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing query parameter 'q'."}), 400
+
+    def generate():
+        with request_priority(INTERACTIVE):
+            for event in stream_search_events(query):
+                name = event.pop("event")
+                event["results"] = as_dicts(event["results"])
+                event["query"] = query
+                yield f"event: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/admin/stats", methods=["GET"])
+def admin_stats():
+    http_cache = get_http_cache()
+    return jsonify(
+        {
+            "search_cache": SEARCH_CACHE.stats(),
+            "search_in_flight": SEARCH_FLIGHTS.stats(),
+            "http_cache": http_cache.stats() if http_cache else None,
+            "preview_cache": PREVIEW_CACHE.stats(),
+            "fetch_strategy": FETCH_STRATEGY.stats(),
+            "render_profiles": browser_pool_stats(),
+            "fetch_queue": get_scheduler().stats(),
+            "fetch_retries": FETCHER.stats(),
+            "transport": get_transport().stats(),
+        }
+    )
+
+
+@app.route("/api/admin/scrapers", methods=["GET"])
+def admin_scrapers():
+    names = [name for name, _scraper in SCRAPER_SOURCES]
+    return jsonify({"scrapers": SCRAPER_HEALTH.stats(names)})
 
 
 @app.route("/api/storefronts", methods=["GET"])
@@ -0,0 +1,431 @@
+"""Offline benchmarks for the parsers, the search pipeline and the review API.
+
+Every outbound fetch is answered from the pages in ``benchmarks/fixtures``
+and OpenAI is replaced by a deterministic stub, so runs need no network
+access or API key. The pages are synthetic, not recorded captures: each one
+imitates its site's markup (the selectors the parsers use, head boilerplate
+and navigation padded out with generated filler) closely enough to exercise
+the parsers, but its size and shape are not the live site's. Overwrite a
+fixture with a saved copy of the real page to measure against live markup.
+
+Results are printed (or written with ``--output``) as JSON; ``--compare``
+prints the change against an earlier run::
+
+    python -m benchmarks.run --output before.json
+    git checkout my-branch
+    python -m benchmarks.run --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+from unittest import mock
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Keep the benchmark's caches away from the shared on-disk ones.
+os.environ.setdefault("HTTP_CACHE_DIR", tempfile.mkdtemp(prefix="pricescout-bench-http-"))
+os.environ.setdefault("PREVIEW_CACHE_DB_PATH", "")
+
+import openai_search  # noqa: E402
+import search  # noqa: E402
+from scrapers import fixez, google_search, laptopscreen, mengtor, mobilesentrix, utils, websearch  # noqa: E402
+from scrapers.fetch_strategy import FETCH_STRATEGY  # noqa: E402
+from scrapers.preview_cache import PREVIEW_CACHE  # noqa: E402
+from scrapers.vendors import parse_vendor_page  # noqa: E402
+
+QUERY = "iphone 13 lcd screen replacement"
+RESULT_SIZES = (10, 100, 1000)
+
+# Search hosts answered with their results page; any other URL is a product
+# page fetched for a preview.
+SEARCH_FIXTURES = {
+    "www.mobilesentrix.com": "mobilesentrix.html",
+    "www.fixez.com": "fixez.html",
+    "www.laptopscreen.com": "laptopscreen.html",
+    "www.mengtor.com": "mengtor.html",
+    "www.google.com": "google.html",
+    "duckduckgo.com": "duckduckgo.html",
+}
+PREVIEW_FIXTURES = {"amazon.": "preview_amazon.html", "ebay.": "preview_ebay.html"}
+
+
+def load_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def fixture_for(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    if host in SEARCH_FIXTURES:
+        return SEARCH_FIXTURES[host]
+    for marker, name in PREVIEW_FIXTURES.items():
+        if marker in host:
+            return name
+    return "preview_generic.html"
+
+
+def _stub_chat(prompt: str, payload: str) -> str | None:
+    """Answer like the chat model would, without the network round trip."""
+
+    data = json.loads(payload)
+    if prompt == openai_search.REWRITE_TEMPLATE:
+        query = data["query"]
+        return json.dumps({"primary": query, "boosted": [f"{query} MobileSentrix", f"{query} Amazon"]})
+    if prompt == openai_search.SUMMARY_TEMPLATE:
+        offers = sorted(data["offers"], key=search._price_sort_key)
+        return json.dumps(offers[:10])
+    return None
+
+
+@contextlib.contextmanager
+def offline(chat_latency: float = 0.0) -> Iterator[None]:
+    """Serve every fetch from the fixtures and stub the OpenAI client."""
+
+    pages = {path.name: path.read_text(encoding="utf-8") for path in FIXTURES.glob("*.html")}
+
+    def fetch(url: str, *args, **kwargs) -> str:
+        return pages[fixture_for(url)]
+
+    def chat(prompt: str, payload: str) -> str | None:
+        if chat_latency:
+            time.sleep(chat_latency)
+        return _stub_chat(prompt, payload)
+
+    with contextlib.ExitStack() as stack:
+        for module in (utils, google_search, websearch, mobilesentrix):
+            stack.enter_context(mock.patch.object(module, "safe_get", fetch))
+        for module in (utils, fixez, laptopscreen, mengtor, mobilesentrix):
+            stack.enter_context(mock.patch.object(module, "render_page", fetch))
+        stack.enter_context(mock.patch.object(openai_search, "_call_chat", chat))
+        yield
+
+
+def _reset_state() -> None:
+    search.SEARCH_CACHE.clear()
+    search.SCRAPER_HEALTH.reset()
+    PREVIEW_CACHE.clear()
+    FETCH_STRATEGY.reset()
+
+
+def _timings(fn: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "iterations": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+    }
+
+
+PARSERS: Dict[str, tuple[str, Callable[[str], list]]] = {
+    "mobilesentrix": ("mobilesentrix.html", lambda html: parse_vendor_page(html, "mobilesentrix", QUERY)[1]),
+    "fixez": ("fixez.html", lambda html: parse_vendor_page(html, "fixez", QUERY)[1]),
+    "laptopscreen": ("laptopscreen.html", lambda html: parse_vendor_page(html, "laptopscreen", QUERY)[1]),
+    "mengtor": ("mengtor.html", lambda html: parse_vendor_page(html, "mengtor", QUERY)[1]),
+    "google": ("google.html", google_search._parse_page),
+    "duckduckgo": ("duckduckgo.html", lambda html: websearch._parse_results(html, QUERY)),
+    "preview_amazon": (
+        "preview_amazon.html",
+        lambda html: [websearch._parse_preview(html, "https://www.amazon.com/dp/B0TEST")],
+    ),
+    "preview_ebay": ("preview_ebay.html", lambda html: [websearch._parse_preview(html, "https://www.ebay.com/itm/1")]),
+    "preview_generic": (
+        "preview_generic.html",
+        lambda html: [websearch._parse_preview(html, "https://shop.example.com/item")],
+    ),
+}
+
+
+def bench_parsers(iterations: int) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    for name, (fixture, parse) in PARSERS.items():
+        html = load_fixture(fixture)
+        items = parse(html)
+        summary = _summary(_timings(lambda: parse(html), iterations))
+        seconds = summary["median_ms"] / 1000
+        summary.update(
+            {
+                "bytes": len(html.encode("utf-8")),
+                "items": len(items),
+                "pages_per_s": round(1 / seconds, 1) if seconds else None,
+                "mb_per_s": round(len(html) / seconds / 1e6, 2) if seconds else None,
+            }
+        )
+        results[name] = summary
+    return results
+
+
+def _offer_pool() -> List[Dict[str, object]]:
+    pool: List[Dict[str, object]] = []
+    for name, (fixture, parse) in PARSERS.items():
+        if not name.startswith("preview"):
+            pool.extend(parse(load_fixture(fixture)))
+    return pool
+
+
+def _scaled_sources(pool: List[Dict[str, object]], size: int) -> List[tuple[str, search.Scraper]]:
+    """Split *size* distinct offers drawn from *pool* across the real source names."""
+
+    names = [name for name, _scraper in search.SCRAPER_SOURCES]
+    share, extra = divmod(size, len(names))
+
+    def source(index: int, count: int) -> search.Scraper:
+        def scrape(_query: str) -> List[Dict[str, object]]:
+            offers = []
+            for n in range(count):
+                offer = dict(pool[(index + n * len(names)) % len(pool)])
+                offer["link"] = f"{offer.get('link')}?variant={index}-{n}"
+                offers.append(offer)
+            return offers
+
+        return scrape
+
+    return [(name, source(i, share + (i < extra))) for i, name in enumerate(names)]
+
+
+def bench_search(iterations: int, sizes=RESULT_SIZES) -> Dict[str, object]:
+    """``search_products`` latency, uncached, end to end and at fixed result sizes."""
+
+    def run() -> None:
+        search.SEARCH_CACHE.clear()
+        PREVIEW_CACHE.clear()
+        search.search_products(QUERY)
+
+    results: Dict[str, object] = {}
+    _reset_state()
+    results["fixtures"] = _summary(_timings(run, iterations))
+    results["fixtures"]["results"] = len(search.search_products(QUERY))
+
+    pool = _offer_pool()
+    for size in sizes:
+        _reset_state()
+        with mock.patch.object(search, "SCRAPER_SOURCES", _scaled_sources(pool, size)):
+            results[f"offers_{size}"] = _summary(_timings(run, iterations))
+    return results
+
+
+def bench_memory(sizes=RESULT_SIZES) -> Dict[str, object]:
+    """Peak traced allocation while parsing each page and searching each size."""
+
+    def peak(fn: Callable[[], object]) -> float:
+        tracemalloc.start()
+        try:
+            fn()
+            return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    results: Dict[str, object] = {}
+    for name, (fixture, parse) in PARSERS.items():
+        html = load_fixture(fixture)
+        results[f"parse_{name}_peak_kb"] = peak(lambda: parse(html))
+
+    pool = _offer_pool()
+    for size in sizes:
+        _reset_state()
+        with mock.patch.object(search, "SCRAPER_SOURCES", _scaled_sources(pool, size)):
+            results[f"search_{size}_peak_kb"] = peak(lambda: search.search_products(QUERY))
+    return results
+
+
+def _seed_reviews(db_path: str, count: int) -> None:
+    with sqlite3.connect(db_path) as conn:
+        storefronts = [row[0] for row in conn.execute("SELECT id FROM storefronts")]
+        conn.executemany(
+            """
+            INSERT INTO reviews (storefront_id, reviewer_name, rating, comment, review_date, status)
+            VALUES (?, ?, ?, ?, ?, 'pending')
+            """,
+            [
+                (
+                    storefronts[i % len(storefronts)],
+                    f"Reviewer {i}",
+                    1 + i % 5,
+                    f"Benchmark review {i}: quick repair, fair price.",
+                    f"2024-01-{1 + i % 28:02d}T12:00:00Z",
+                )
+                for i in range(count)
+            ],
+        )
+
+
+@contextlib.contextmanager
+def _review_app(db_path: str) -> Iterator[object]:
+    """Yield the ``app`` module with the review API pointed at *db_path*.
+
+    The environment is only changed while ``app`` is first imported, so that
+    import creates its tables in *db_path* rather than the default database.
+    """
+
+    with mock.patch.dict(os.environ, {"REVIEW_DB_PATH": db_path}):
+        import app as app_module
+    with mock.patch.object(app_module, "REVIEW_DB_PATH", db_path):
+        app_module._init_db()
+        yield app_module
+
+
+def bench_review_api(requests_total: int, concurrency: int, reviews: int) -> Dict[str, object]:
+    """Concurrent load against the review endpoints on a seeded temporary database."""
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="pricescout-bench-reviews-"), "reviews.db")
+    with _review_app(db_path) as app_module:
+        _seed_reviews(db_path, reviews)
+
+        with app_module.app.test_client() as client:
+            storefront_id = client.get("/api/storefronts").get_json()[0]["id"]
+            review_ids = [row["id"] for row in client.get("/api/reviews?status=pending").get_json()]
+
+        calls: List[tuple[str, Callable]] = [
+            ("GET /api/storefronts", lambda c, _i: c.get("/api/storefronts")),
+            ("GET /api/reviews", lambda c, _i: c.get(f"/api/reviews?storefront_id={storefront_id}")),
+            ("GET /api/overview", lambda c, _i: c.get("/api/overview")),
+            ("GET /api/auto-rules", lambda c, _i: c.get("/api/auto-rules")),
+            (
+                "POST /api/reviews/<id>/respond",
+                lambda c, i: c.post(
+                    f"/api/reviews/{review_ids[i % len(review_ids)]}/respond",
+                    json={"response_text": "Thanks for visiting!"},
+                ),
+            ),
+        ]
+
+        def worker(worker_index: int) -> List[tuple[str, float, int]]:
+            samples = []
+            with app_module.app.test_client() as client:
+                for i in range(worker_index, requests_total, concurrency):
+                    label, call = calls[i % len(calls)]
+                    started = time.perf_counter()
+                    response = call(client, i)
+                    samples.append((label, time.perf_counter() - started, response.status_code))
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = [sample for batch in executor.map(worker, range(concurrency)) for sample in batch]
+        elapsed = time.perf_counter() - started
+
+        endpoints: Dict[str, object] = {}
+        for label, _call in calls:
+            durations = [seconds for name, seconds, _status in samples if name == label]
+            summary = _summary(durations)
+            summary["errors"] = sum(1 for name, _s, status in samples if name == label and status >= 400)
+            endpoints[label] = summary
+        return {
+            "requests": len(samples),
+            "concurrency": concurrency,
+            "seeded_reviews": reviews,
+            "requests_per_s": round(len(samples) / elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+
+def _metadata() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def run(quick: bool = False, chat_latency: float = 0.0) -> Dict[str, object]:
+    iterations = 5 if quick else 30
+    results: Dict[str, object] = {"meta": _metadata()}
+    results["meta"]["quick"] = quick
+    with offline(chat_latency):
+        results["parse"] = bench_parsers(iterations)
+        results["search"] = bench_search(max(3, iterations // 3))
+        results["memory"] = bench_memory()
+    results["review_api"] = bench_review_api(
+        requests_total=100 if quick else 1000, concurrency=8, reviews=200 if quick else 2000
+    )
+    return results
+
+
+def _flatten(data: Dict[str, object], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object]) -> List[str]:
+    """Describe how timing, throughput and memory metrics moved since *baseline*."""
+
+    tracked = ("_ms", "_kb", "per_s")
+    before, after = _flatten(baseline), _flatten(current)
+    lines = []
+    for path in sorted(before.keys() & after.keys()):
+        if path.startswith("meta.") or not path.endswith(tracked) or not before[path]:
+            continue
+        change = (after[path] - before[path]) / before[path] * 100
+        lines.append(f"{path:<60} {before[path]:>12} -> {after[path]:>12} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="fewer iterations, for smoke runs")
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run to compare against")
+    parser.add_argument(
+        "--openai-latency-ms", type=float, default=0.0, help="simulated latency of each stubbed OpenAI call"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(quick=args.quick, chat_latency=args.openai_latency_ms / 1000)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"Compared with {baseline.get('meta', {}).get('commit')}:", file=sys.stderr)
+        for line in compare(baseline, results):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
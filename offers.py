@@ -0,0 +1,216 @@
+"""Compact offer records passed through the search pipeline."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from scrapers.canonical import canonical_url, identity_key
+from scrapers.utils import parse_price
+
+# Keys every offer has, in the order they are serialized.
+FIELDS = ("title", "price", "price_value", "in_stock", "source", "link", "image")
+# Keys present only once they are known.
+OPTIONAL_FIELDS = ("vendor", "match_score")
+
+_FIELD_SET = frozenset(FIELDS)
+_OPTIONAL_SET = frozenset(OPTIONAL_FIELDS)
+
+
+class Offer(Mapping):
+    """One product listing.
+
+    Scraper dicts are converted once with :meth:`from_mapping`, which works
+    out the numeric ``price_value`` and the canonical link up front, so
+    sorting and deduplication never re-parse them. Offers read like the
+    dicts they replace (``offer["title"]``, ``offer.get("price")``) and are
+    turned back into plain dicts with :meth:`to_dict` at the API edge.
+    """
+
+    __slots__ = (
+        "title",
+        "price",
+        "price_value",
+        "in_stock",
+        "source",
+        "link",
+        "image",
+        "canonical_link",
+        "vendor",
+        "match_score",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        title: str = "",
+        price: object = None,
+        price_value: Optional[float] = None,
+        in_stock: object = None,
+        source: object = None,
+        link: str = "",
+        image: object = None,
+        vendor: Optional[str] = None,
+        match_score: Optional[float] = None,
+        extra: Optional[Dict[str, object]] = None,
+    ):
+        self.title = title
+        self.price = price
+        self.price_value = price_value
+        self.in_stock = in_stock
+        self.source = source
+        self.link = link
+        self.image = image
+        self.canonical_link = canonical_url(link) if link else ""
+        self.vendor = vendor
+        self.match_score = match_score
+        # Scraper-specific keys such as "snippet" or "stock_label".
+        self.extra = extra
+
+    @classmethod
+    def from_mapping(cls, item: Mapping[str, object], vendor: Optional[str] = None) -> "Offer":
+        """Build an offer from a scraper or JSON dict; offers are returned as is."""
+
+        if isinstance(item, Offer):
+            return item
+
+        extra: Dict[str, object] = {}
+        for key, value in item.items():
+            if key not in _FIELD_SET and key not in _OPTIONAL_SET:
+                extra[key] = value
+
+        score = item.get("match_score")
+        return cls(
+            title=str(item.get("title") or ""),
+            price=item.get("price"),
+            price_value=normalize_price(item.get("price_value"), item.get("price")),
+            in_stock=item.get("in_stock"),
+            source=item.get("source"),
+            link=str(item.get("link") or ""),
+            image=item.get("image"),
+            vendor=item.get("vendor") or vendor,
+            match_score=float(score) if score is not None else None,
+            extra=extra or None,
+        )
+
+    @property
+    def key(self) -> str:
+        """Identity used to recognise the same product from different sources."""
+
+        return identity_key(self.canonical_link) if self.canonical_link else self.title.strip().lower()
+
+    @property
+    def sort_price(self) -> float:
+        """``price_value``, with unknown prices sorting last."""
+
+        return math.inf if self.price_value is None else self.price_value
+
+    def merge(self, other: "Offer") -> None:
+        """Fill fields this offer lacks from *other*, a duplicate listing."""
+
+        if self.price_value is None and other.price_value is not None:
+            self.price, self.price_value = other.price, other.price_value
+        for name in ("in_stock", "source", "image", "vendor"):
+            if _missing(getattr(self, name)) and not _missing(getattr(other, name)):
+                setattr(self, name, getattr(other, name))
+        if other.extra:
+            extra = dict(self.extra or {})
+            for name, value in other.extra.items():
+                if _missing(extra.get(name)) and not _missing(value):
+                    extra[name] = value
+            self.extra = extra
+
+    def to_dict(self) -> Dict[str, object]:
+        return {key: self[key] for key in self}
+
+    def __getitem__(self, key: str) -> object:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if key in _OPTIONAL_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FIELDS
+        if self.extra:
+            yield from self.extra
+        for key in OPTIONAL_FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _key in self)
+
+    def __repr__(self) -> str:
+        return f"Offer(title={self.title!r}, price_value={self.price_value!r}, link={self.link!r})"
+
+
+class DedupeIndex:
+    """Offers in arrival order, one per product.
+
+    Offers are matched on :attr:`Offer.key`, so the same product reached
+    through different URLs (see :mod:`scrapers.canonical`) is kept once;
+    the first listing wins and is completed with fields from later ones.
+    """
+
+    def __init__(self):
+        self._offers: Dict[str, Offer] = {}
+        self.merged = 0
+
+    def add(self, offer: Offer) -> bool:
+        """Index *offer*; return ``False`` when it duplicates a known one."""
+
+        key = offer.key
+        if not key:
+            return False
+        existing = self._offers.get(key)
+        if existing is None:
+            self._offers[key] = offer
+            return True
+        if existing is not offer:
+            existing.merge(offer)
+            self.merged += 1
+        return False
+
+    def offers(self) -> List[Offer]:
+        return list(self._offers.values())
+
+
+def _missing(value: object) -> bool:
+    return value is None or value == ""
+
+
+def normalize_price(*candidates: object) -> Optional[float]:
+    """Return the first candidate that reads as a finite price, or ``None``.
+
+    Numbers are taken as is; strings such as ``"$1,299.00"`` go through
+    :func:`scrapers.utils.parse_price`.
+    """
+
+    for value in candidates:
+        if value is None or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            number = float(value)
+        else:
+            text = str(value)
+            try:
+                number = float(text)
+            except ValueError:
+                if not any(char.isdigit() for char in text):
+                    continue
+                number = parse_price(text)
+        if math.isfinite(number):
+            return number
+    return None
+
+
+def as_dicts(items: Iterable[Mapping[str, object]]) -> List[Dict[str, object]]:
+    """Serialize offers (or plain dicts) for a JSON response."""
+
+    return [item.to_dict() if isinstance(item, Offer) else dict(item) for item in items]
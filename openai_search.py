@@ -6,7 +6,9 @@ from typing import Dict, Iterable, List
 import openai
 from openai import OpenAI
 
-from scrapers.utils import parse_price
+from offers import Offer, as_dicts
+from scrapers.canonical import canonical_url
+from scrapers.transport import get_transport
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
@@ -30,8 +32,16 @@ SUMMARY_TEMPLATE = (
 
 
 def _call_chat(prompt: str, user_payload: str) -> str | None:
-    """Best-effort call to the configured chat model."""
+    """Best-effort call to the configured chat model.
 
+    Goes through :func:`scrapers.transport.get_transport`, so completions can
+    be recorded and replayed like page fetches.
+    """
+
+    return get_transport().chat(MODEL, prompt, user_payload, lambda: _send_chat(prompt, user_payload))
+
+
+def _send_chat(prompt: str, user_payload: str) -> str | None:
     if not OPENAI_API_KEY:
         try:
             response = openai.ChatCompletion.create(
@@ -89,27 +99,14 @@ def rewrite_query_with_vendors(query: str) -> Dict[str, object]:
     return {"primary": query, "boosted": boosted}
 
 
-def _normalize_price_value(item: Dict[str, object]) -> Dict[str, object]:
-    result = dict(item)
-    if "price_value" in result:
-        return result
-
-    price = result.get("price")
-    try:
-        result["price_value"] = float(price)
-    except (TypeError, ValueError):
-        result["price_value"] = parse_price(str(price or "")) if price is not None else float("inf")
-    return result
-
-
-def _fallback_top_offers(results: Iterable[Dict[str, object]]) -> List[Dict[str, object]]:
-    normalized = [_normalize_price_value(item) for item in results]
+def _fallback_top_offers(results: Iterable[Dict[str, object]]) -> List[Offer]:
+    normalized = [Offer.from_mapping(item) for item in results]
     required = ("mobilesentrix", "amazon", "ebay", "fixez")
 
     def matches_vendor(item, vendor):
-        return vendor in str(item.get("source", "")).lower()
+        return vendor in str(item.source or "").lower()
 
-    top: List[Dict[str, object]] = []
+    top: List[Offer] = []
     seen_ids = set()
 
     for vendor in required:
@@ -122,7 +119,7 @@ def _fallback_top_offers(results: Iterable[Dict[str, object]]) -> List[Dict[str,
                 seen_ids.add(key)
                 break
 
-    for candidate in sorted(normalized, key=lambda r: r.get("price_value", float("inf"))):
+    for candidate in sorted(normalized, key=lambda r: r.sort_price):
         key = id(candidate)
         if key in seen_ids:
             continue
@@ -134,20 +131,34 @@ def _fallback_top_offers(results: Iterable[Dict[str, object]]) -> List[Dict[str,
     return top[:10]
 
 
-def summarize_offers_with_openai(query: str, offers: List[Dict[str, object]]) -> List[Dict[str, object]]:
+def _match_input_offers(parsed: List[object], offers: List[Offer]) -> List[Offer]:
+    # The model echoes the original objects; map them back to the offers
+    # already built instead of re-creating them from JSON.
+    by_link = {offer.canonical_link: offer for offer in offers if offer.canonical_link}
+    matched: List[Offer] = []
+    for entry in parsed:
+        if not isinstance(entry, dict):
+            continue
+        offer = by_link.get(canonical_url(str(entry.get("link") or "")))
+        matched.append(offer or Offer.from_mapping(entry))
+    return matched
+
+
+def summarize_offers_with_openai(query: str, offers: List[Dict[str, object]]) -> List[Offer]:
     """Use OpenAI to select the 10 best-priced offers, guaranteeing vendor coverage."""
 
     if not offers:
         return []
 
-    payload = json.dumps({"query": query, "offers": offers})
+    offers = [Offer.from_mapping(item) for item in offers]
+    payload = json.dumps({"query": query, "offers": as_dicts(offers)})
     content = _call_chat(SUMMARY_TEMPLATE, payload)
 
     if content:
         try:
             parsed = json.loads(content)
             if isinstance(parsed, list):
-                return parsed[:10]
+                return _match_input_offers(parsed[:10], offers)
         except Exception:
             pass
 
@@ -0,0 +1,205 @@
+"""Rolling per-scraper latency/error statistics and circuit breakers."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SCRAPER_HEALTH_WINDOW = int(os.environ.get("SCRAPER_HEALTH_WINDOW", 50))
+# Timeouts are the observed latency percentile times a safety factor, kept
+# between the floor and SCRAPER_TIMEOUT_MAX_SECONDS (used until
+# SCRAPER_TIMEOUT_MIN_SAMPLES calls have been seen).
+SCRAPER_TIMEOUT_PERCENTILE = float(os.environ.get("SCRAPER_TIMEOUT_PERCENTILE", 0.95))
+SCRAPER_TIMEOUT_MULTIPLIER = float(os.environ.get("SCRAPER_TIMEOUT_MULTIPLIER", 1.5))
+SCRAPER_TIMEOUT_MIN_SAMPLES = int(os.environ.get("SCRAPER_TIMEOUT_MIN_SAMPLES", 10))
+SCRAPER_TIMEOUT_FLOOR_SECONDS = float(os.environ.get("SCRAPER_TIMEOUT_FLOOR_SECONDS", 3))
+SCRAPER_TIMEOUT_MAX_SECONDS = float(os.environ.get("SCRAPER_TIMEOUT_MAX_SECONDS", 25))
+# The breaker opens when at least BREAKER_MIN_CALLS recent calls have an
+# error rate of BREAKER_ERROR_RATE or more, or after BREAKER_CONSECUTIVE_FAILURES
+# failures in a row, and allows one probe call after BREAKER_OPEN_SECONDS.
+BREAKER_ERROR_RATE = float(os.environ.get("BREAKER_ERROR_RATE", 0.5))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", 6))
+BREAKER_CONSECUTIVE_FAILURES = int(os.environ.get("BREAKER_CONSECUTIVE_FAILURES", 4))
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", 60))
+
+
+class _ScraperState:
+    __slots__ = ("calls", "state", "opened_at", "probe_started", "consecutive_failures", "counters")
+
+    def __init__(self, window: int):
+        # (seconds, ok, timed) for the most recent calls; ``timed`` marks the
+        # calls whose duration describes the scraper's latency.
+        self.calls: deque[tuple[float, bool, bool]] = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.consecutive_failures = 0
+        self.counters = {"calls": 0, "failures": 0, "timeouts": 0, "skipped": 0, "opened": 0}
+
+
+class ScraperHealth:
+    """Track each scraper's recent calls and gate new calls with a breaker.
+
+    A call slower than the scraper's current timeout counts as a failure,
+    even if it eventually returned, but its duration (capped at
+    ``max_seconds``) still feeds the latency percentile, so the timeout
+    catches up with a scraper that has become slower. While the breaker is
+    open calls are skipped; after ``open_seconds`` a single half-open probe
+    is let through, and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        window: int = SCRAPER_HEALTH_WINDOW,
+        percentile: float = SCRAPER_TIMEOUT_PERCENTILE,
+        multiplier: float = SCRAPER_TIMEOUT_MULTIPLIER,
+        min_samples: int = SCRAPER_TIMEOUT_MIN_SAMPLES,
+        floor_seconds: float = SCRAPER_TIMEOUT_FLOOR_SECONDS,
+        max_seconds: float = SCRAPER_TIMEOUT_MAX_SECONDS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        min_calls: int = BREAKER_MIN_CALLS,
+        consecutive_failures: int = BREAKER_CONSECUTIVE_FAILURES,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.floor_seconds = floor_seconds
+        self.max_seconds = max_seconds
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._scrapers: Dict[str, _ScraperState] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, name: str) -> bool:
+        """Return whether *name* may be called now (claiming the probe if half-open)."""
+
+        now = self._clock()
+        with self._lock:
+            state = self._state(name)
+            if state.state == OPEN and now - state.opened_at >= self.open_seconds:
+                state.state = HALF_OPEN
+                state.probe_started = None
+            if state.state == HALF_OPEN:
+                # A probe that never reported back (e.g. abandoned at the
+                # search deadline) is replaced after one timeout.
+                if state.probe_started is None or now - state.probe_started >= self.max_seconds:
+                    state.probe_started = now
+                    return True
+            elif state.state == CLOSED:
+                return True
+            state.counters["skipped"] += 1
+            return False
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            state = self._state(name)
+            timed_out = seconds > self._timeout(state)
+            sample = (min(seconds, self.max_seconds), ok and not timed_out, ok or timed_out)
+            ok = ok and not timed_out
+            state.calls.append(sample)
+            state.counters["calls"] += 1
+            state.counters["failures"] += int(not ok)
+            state.counters["timeouts"] += int(timed_out)
+            state.consecutive_failures = 0 if ok else state.consecutive_failures + 1
+
+            if state.state == HALF_OPEN:
+                if ok:
+                    state.state = CLOSED
+                    state.calls.clear()
+                    state.calls.append(sample)
+                else:
+                    self._open(state)
+            elif state.state == CLOSED and not ok and self._should_open(state):
+                self._open(state)
+
+    def timeout_for(self, name: str) -> float:
+        """Seconds a call to *name* may take before it is abandoned."""
+
+        with self._lock:
+            return self._timeout(self._state(name))
+
+    def state_of(self, name: str) -> str:
+        with self._lock:
+            return self._state(name).state
+
+    def stats(self, names: Iterable[str] = ()) -> Dict[str, Dict[str, object]]:
+        """Describe every tracked scraper, plus *names* even if never called."""
+
+        with self._lock:
+            for name in names:
+                self._state(name)
+            return {name: self._describe(state) for name, state in self._scrapers.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._scrapers.clear()
+
+    def _should_open(self, state: _ScraperState) -> bool:
+        if state.consecutive_failures >= self.consecutive_failures:
+            return True
+        if len(state.calls) < self.min_calls:
+            return False
+        failures = sum(1 for _seconds, ok, _timed in state.calls if not ok)
+        return failures / len(state.calls) >= self.error_rate
+
+    def _open(self, state: _ScraperState) -> None:
+        state.state = OPEN
+        state.opened_at = self._clock()
+        state.probe_started = None
+        state.counters["opened"] += 1
+
+    def _timeout(self, state: _ScraperState) -> float:
+        latency = self._latency(state, self.percentile, self.min_samples)
+        if latency is None:
+            return self.max_seconds
+        return min(self.max_seconds, max(self.floor_seconds, latency * self.multiplier))
+
+    @staticmethod
+    def _latency(state: _ScraperState, quantile: float, min_samples: int = 1) -> Optional[float]:
+        # Successful and timed-out calls describe how long the scraper takes;
+        # quick errors (refused connections, parse failures) do not.
+        samples = sorted(seconds for seconds, _ok, timed in state.calls if timed)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def _describe(self, state: _ScraperState) -> Dict[str, object]:
+        recent = len(state.calls)
+        failures = sum(1 for _seconds, ok, _timed in state.calls if not ok)
+        p50 = self._latency(state, 0.5)
+        p95 = self._latency(state, 0.95)
+        description: Dict[str, object] = dict(state.counters)
+        description.update(
+            {
+                "state": state.state,
+                "recent_calls": recent,
+                "recent_error_rate": round(failures / recent, 3) if recent else 0.0,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "timeout_seconds": round(self._timeout(state), 2),
+            }
+        )
+        if state.state == OPEN:
+            description["retry_in_seconds"] = round(
+                max(0.0, self.open_seconds - (self._clock() - state.opened_at)), 1
+            )
+        return description
+
+    def _state(self, name: str) -> _ScraperState:
+        state = self._scrapers.get(name)
+        if state is None:
+            state = self._scrapers[name] = _ScraperState(self.window)
+        return state
@@ -0,0 +1,264 @@
+"""Asyncio fetch layer for the async search engine.
+
+Scrapers run as coroutines on one background event loop
+(:func:`get_loop`), so an in-flight search costs a few coroutine frames
+instead of a thread per scraper call. When the transport is live, static
+fetches use an ``httpx`` async client (if installed) and renders await a
+page on the shared :class:`~scrapers.browser_pool.BrowserPool`, whose
+browsers each load several pages at once; rate-limit waits are awaited
+too, so none of these hold a thread. Everything else (the requests
+fallback, record/replay, OpenAI calls and HTML parsing, which are
+blocking) is handed to a bounded thread pool with :func:`run_blocking`.
+Either way a fetch still goes through the HTTP cache and the per-domain
+rate limiter, and at most ``AIO_DOMAIN_CONCURRENCY`` fetches per domain are
+in flight at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+try:  # pragma: no cover - optional dependency
+    import httpx
+except ImportError:  # pragma: no cover - exercised when httpx is missing
+    httpx = None
+
+from .browser_pool import RENDER_TIMEOUT_SECONDS, get_browser_pool
+from .http_cache import get_http_cache
+from .parse_pool import run_parser
+from .retry import FETCHER, RETRYABLE_STATUS, full_jitter
+from .scheduler import RateLimitTimeout, get_scheduler
+from .transport import LIVE, get_transport
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+AIO_DOMAIN_CONCURRENCY = int(os.environ.get("AIO_DOMAIN_CONCURRENCY", 4))
+# Threads for blocking work (renders, parsing, OpenAI, requests fallback).
+AIO_BLOCKING_WORKERS = int(os.environ.get("AIO_BLOCKING_WORKERS", 32))
+AIO_HTTP_MAX_CONNECTIONS = int(os.environ.get("AIO_HTTP_MAX_CONNECTIONS", 100))
+
+
+class _LoopState:
+    """Objects bound to one event loop."""
+
+    def __init__(self):
+        self.domain_slots: Dict[str, asyncio.Semaphore] = {}
+        self.client: Any = None
+
+
+_STATES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+_STATE_LOCK = threading.Lock()
+_EXECUTOR: ThreadPoolExecutor | None = None
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOOP_THREAD: threading.Thread | None = None
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    with _STATE_LOCK:
+        state = _STATES.get(loop)
+        if state is None:
+            state = _STATES[loop] = _LoopState()
+        return state
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _STATE_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=AIO_BLOCKING_WORKERS, thread_name_prefix="aio-blocking")
+        return _EXECUTOR
+
+
+async def run_blocking(fn: Callable[..., T], *args) -> T:
+    """Run blocking *fn* on the shared thread pool, keeping context variables."""
+
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_executor(), call)
+
+
+def _domain_slot(url: str) -> asyncio.Semaphore:
+    domain = (urlparse(url).hostname or "").lower()
+    slots = _state().domain_slots
+    slot = slots.get(domain)
+    if slot is None:
+        slot = slots[domain] = asyncio.Semaphore(AIO_DOMAIN_CONCURRENCY)
+    return slot
+
+
+async def fetch_text(url: str, params: Optional[Dict[str, object]] = None) -> Optional[str]:
+    """Async :func:`scrapers.utils.safe_get`: the body of *url*, or ``None``."""
+
+    from . import utils
+
+    async with _domain_slot(url):
+        client = _client()
+        if client is None:
+            return await run_blocking(utils.safe_get, url, params)
+        return await _fetch_with_client(client, url, params)
+
+
+async def render(url: str, wait_selector: Optional[str] = None, fallback: bool = True) -> Optional[str]:
+    """Async :func:`scrapers.utils.render_page` on the shared browser pool.
+
+    Like ``render_page``, a failed render falls back to a static fetch
+    unless *fallback* is false, in which case it returns ``None``.
+    """
+
+    from . import utils
+
+    async with _domain_slot(url):
+        if get_transport().mode != LIVE:
+            return await run_blocking(utils.render_page, url, wait_selector, fallback)
+        try:
+            await get_scheduler().acquire_async(url)
+        except RateLimitTimeout:
+            logger.warning("Rate limit queue timed out for %s", url)
+            return None
+
+        future = None
+        try:
+            future = get_browser_pool().submit(url, wait_selector)
+            return await asyncio.wait_for(asyncio.wrap_future(future), RENDER_TIMEOUT_SECONDS)
+        except Exception:
+            if future is not None:
+                future.cancel()
+            logger.exception("Playwright failed for %s", url)
+
+    if not fallback:
+        return None
+    logger.info("Falling back to static fetch for %s", url)
+    return await fetch_text(url)
+
+
+async def parse(parser: Callable[..., T], html: str, *args) -> T:
+    """Run *parser* off the event loop via :func:`scrapers.parse_pool.run_parser`."""
+
+    return await run_blocking(run_parser, parser, html, *args)
+
+
+def _client():
+    if httpx is None or get_transport().mode != LIVE:
+        return None
+    state = _state()
+    if state.client is None:
+        from .utils import HEADERS, REQUEST_TIMEOUT_SECONDS
+
+        state.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=AIO_HTTP_MAX_CONNECTIONS),
+        )
+    return state.client
+
+
+async def _fetch_with_client(client, url: str, params: Optional[Dict[str, object]]) -> Optional[str]:
+    cache = get_http_cache()
+    cache_url = cache.url_for(url, params) if cache else None
+    cached = await run_blocking(cache.lookup, cache_url) if cache else None
+    if cached is not None and cache.is_fresh(cached):
+        return cached.body
+
+    conditional = cached.conditional_headers() if cached else None
+    response = None
+    for attempt in range(FETCHER.retries + 1):
+        last = attempt == FETCHER.retries
+        try:
+            await get_scheduler().acquire_async(url)
+            response = await client.get(url, params=params, headers=conditional)
+        except RateLimitTimeout:
+            logger.warning("Rate limit queue timed out for %s", url)
+            return None
+        except httpx.TransportError as exc:
+            if last:
+                logger.warning("Request failed for %s: %s", url, exc)
+                return None
+        except httpx.HTTPError as exc:
+            # Not worth retrying (too many redirects, undecodable body), but
+            # still a failed fetch, as it is for safe_get.
+            logger.warning("Request failed for %s: %s", url, exc)
+            return None
+        else:
+            if last or response.status_code not in RETRYABLE_STATUS:
+                break
+        await asyncio.sleep(full_jitter(attempt, FETCHER.backoff_base, FETCHER.backoff_max))
+
+    if cached is not None and response.status_code == 304:
+        await run_blocking(cache.revalidated, cache_url, cached, response.headers)
+        return cached.body
+    if response.status_code >= 400:
+        logger.warning("Request failed for %s: HTTP %s", url, response.status_code)
+        return None
+    if cache:
+        try:
+            await run_blocking(cache.store, cache_url, response)
+        except Exception:
+            logger.exception("Failed to cache response for %s", url)
+    return response.text
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+
+    global _LOOP, _LOOP_THREAD
+    with _STATE_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True)
+            thread.start()
+            _LOOP, _LOOP_THREAD = loop, thread
+        return _LOOP
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run *coro* on the background loop and wait for its result.
+
+    The caller's context variables (such as the request priority) are
+    carried over. Must not be called from the loop thread itself.
+    """
+
+    loop = get_loop()
+    if threading.current_thread() is _LOOP_THREAD:
+        coro.close()
+        raise RuntimeError("run_sync() called from the event loop thread")
+
+    context = contextvars.copy_context()
+    future: "asyncio.Future[T]" = asyncio.run_coroutine_threadsafe(_in_context(coro, context), loop)
+    return future.result(timeout)
+
+
+async def _in_context(coro: Awaitable[T], context: contextvars.Context) -> T:
+    # Tasks copy the current context when created, so create the task from
+    # within the caller's context.
+    return await asyncio.get_running_loop().create_task(coro, context=context)
+
+
+def shutdown_aio() -> None:
+    """Close HTTP clients, stop the background loop and the blocking pool."""
+
+    global _LOOP, _LOOP_THREAD, _EXECUTOR
+    with _STATE_LOCK:
+        loop, thread, executor = _LOOP, _LOOP_THREAD, _EXECUTOR
+        _LOOP = _LOOP_THREAD = _EXECUTOR = None
+    if loop is not None:
+        state = _STATES.get(loop)
+        if state is not None and state.client is not None:
+            asyncio.run_coroutine_threadsafe(state.client.aclose(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,464 @@
+"""Process-wide pool of warm Playwright browsers used by :func:`render_page`."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2))
+# Pages each browser renders concurrently.
+BROWSER_PAGES_PER_BROWSER = int(os.environ.get("BROWSER_PAGES_PER_BROWSER", 4))
+BROWSER_CONTEXT_MAX_USES = int(os.environ.get("BROWSER_CONTEXT_MAX_USES", 50))
+RENDER_TIMEOUT_SECONDS = float(os.environ.get("RENDER_TIMEOUT_SECONDS", 45))
+NAVIGATION_TIMEOUT_MS = 15000
+SELECTOR_TIMEOUT_MS = 5000
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """How much of a page to load when rendering it for its DOM.
+
+    Requests whose Playwright resource type is in ``blocked_resources`` or
+    whose host ends with one of ``blocked_domains`` are aborted. Navigation
+    returns once ``wait_until`` fires and the wait selector is attached.
+    """
+
+    name: str
+    blocked_resources: frozenset = frozenset()
+    blocked_domains: tuple[str, ...] = ()
+    wait_until: str = "load"
+    navigation_timeout_ms: int = NAVIGATION_TIMEOUT_MS
+    selector_timeout_ms: int = SELECTOR_TIMEOUT_MS
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resources:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.blocked_domains)
+
+
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "segment.io",
+    "klaviyo.com",
+    "tiktok.com",
+    "criteo.com",
+)
+
+RENDER_PROFILES: Dict[str, RenderProfile] = {
+    "full": RenderProfile("full"),
+    "lightweight": RenderProfile(
+        "lightweight",
+        blocked_resources=frozenset({"image", "font", "stylesheet", "media"}),
+        blocked_domains=TRACKER_DOMAINS,
+        wait_until="domcontentloaded",
+        navigation_timeout_ms=10000,
+    ),
+}
+RENDER_PROFILE = os.environ.get("RENDER_PROFILE", "lightweight")
+# Profile name per domain (matched on the host suffix); other hosts use
+# RENDER_PROFILE.
+RENDER_PROFILE_DOMAINS: Dict[str, str] = {
+    "mobilesentrix.com": "lightweight",
+    "fixez.com": "lightweight",
+    "laptopscreen.com": "lightweight",
+    "mengtor.com": "lightweight",
+    **json.loads(os.environ.get("RENDER_PROFILE_DOMAINS") or "{}"),
+}
+
+
+def profile_for(url: str) -> RenderProfile:
+    """Return the render profile configured for *url*'s domain."""
+
+    host = (urlparse(url).hostname or "").lower()
+    for domain, name in RENDER_PROFILE_DOMAINS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return RENDER_PROFILES.get(name, RENDER_PROFILES["full"])
+    return RENDER_PROFILES.get(RENDER_PROFILE, RENDER_PROFILES["full"])
+
+
+class _BrowserSlot:
+    """One Chromium instance and the context new pages are opened in.
+
+    Slots are owned by a single worker thread whose event loop drives
+    Playwright's async API, so several pages can load in one browser at
+    once. A context is retired after ``max_uses`` pages or a failed render
+    and closed once its last open page is done.
+    """
+
+    def __init__(self, max_uses: int):
+        self.max_uses = max_uses
+        self._manager = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._uses = 0
+        # Pages still open per context, including retired ones.
+        self._open_pages: Dict[object, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def open_context(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                await self.close()
+                await self._start()
+
+            if self._context is None or self._uses >= self.max_uses:
+                await self._retire_context()
+                self._context = await self._browser.new_context()
+                self._uses = 0
+
+            self._uses += 1
+            context = self._context
+            self._open_pages[context] = self._open_pages.get(context, 0) + 1
+            return context
+
+    async def release_context(self, context, failed: bool = False) -> None:
+        """Return a page's *context*; a failed render retires it."""
+
+        async with self._lock:
+            self._open_pages[context] = self._open_pages.get(context, 1) - 1
+            if failed and self._browser is not None and not self._browser.is_connected():
+                await self.close()
+                return
+            if failed and context is self._context:
+                await self._retire_context()
+            elif context is not self._context and self._open_pages[context] <= 0:
+                await self._close_context(context)
+
+    async def close(self) -> None:
+        for context in list(self._open_pages):
+            await self._close_context(context)
+        self._context = None
+        self._uses = 0
+
+        async def close_browser():
+            if self._browser is not None:
+                await self._browser.close()
+
+        async def stop_playwright():
+            if self._manager is not None:
+                await self._manager.__aexit__(None, None, None)
+
+        for closer in (close_browser, stop_playwright):
+            try:
+                await closer()
+            except Exception:  # pragma: no cover - defensive cleanup
+                logger.debug("Error while closing Playwright", exc_info=True)
+        self._manager = None
+        self._playwright = None
+        self._browser = None
+
+    async def _start(self) -> None:
+        # Imported lazily so environments without Playwright can still run the
+        # static scrapers.
+        from playwright.async_api import async_playwright
+
+        manager = async_playwright()
+        self._playwright = await manager.__aenter__()
+        self._manager = manager
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        logger.info("Launched pooled Chromium instance")
+
+    async def _retire_context(self) -> None:
+        context, self._context = self._context, None
+        self._uses = 0
+        if context is not None and self._open_pages.get(context, 0) <= 0:
+            await self._close_context(context)
+
+    async def _close_context(self, context) -> None:
+        self._open_pages.pop(context, None)
+        try:
+            await context.close()
+        except Exception:  # pragma: no cover - defensive cleanup
+            logger.debug("Error while closing browser context", exc_info=True)
+
+
+class _Worker:
+    """A browser slot and the thread running its event loop."""
+
+    def __init__(self, pool: "BrowserPool", name: str):
+        self.pool = pool
+        self.slot = _BrowserSlot(pool.max_uses)
+        self.loop = asyncio.new_event_loop()
+        # Pages being rendered or about to be; guarded by the pool's lock.
+        self.active = 0
+        self._tasks: set[asyncio.Task] = set()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self, job: tuple) -> None:
+        self.loop.call_soon_threadsafe(self._start_job, job)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _start_job(self, job: tuple) -> None:
+        task = self.loop.create_task(self.pool._handle(self, *job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+            self.loop.run_until_complete(self._finish())
+        finally:
+            self.loop.close()
+
+    async def _finish(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.slot.close()
+
+
+class BrowserPool:
+    """Hand out pages from a bounded set of long-lived Chromium instances.
+
+    Each browser runs on a dedicated worker thread with its own event loop
+    and renders up to ``pages_per_browser`` pages at once. Scraper threads
+    submit render jobs and block on a future for the resulting HTML. Jobs
+    go to an idle browser first, then to a new one (up to ``size``), then
+    to the least busy browser with a free page; the rest wait in arrival
+    order. Contexts are recycled after ``max_uses`` renders or whenever a
+    render fails.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_uses: int = BROWSER_CONTEXT_MAX_USES,
+        pages_per_browser: int = BROWSER_PAGES_PER_BROWSER,
+    ):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self._pending: Deque[tuple] = deque()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._profile_stats: Dict[str, Dict[str, float]] = {}
+
+    def render(
+        self,
+        url: str,
+        wait_selector: str | None = None,
+        timeout: float | None = None,
+        profile: RenderProfile | None = None,
+    ) -> str:
+        """Render *url* on a pooled browser and return the page HTML.
+
+        ``profile`` defaults to the one configured for the URL's domain.
+        """
+
+        future = self.submit(url, wait_selector, profile)
+        try:
+            return future.result(timeout=timeout or RENDER_TIMEOUT_SECONDS)
+        except Exception:
+            future.cancel()
+            raise
+
+    def submit(self, url: str, wait_selector: str | None = None, profile: RenderProfile | None = None) -> Future:
+        """Queue a render of *url* and return a future for its HTML."""
+
+        future: Future = Future()
+        job = (future, url, wait_selector, profile or profile_for(url))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool has been shut down")
+            self._workers = [worker for worker in self._workers if worker.thread.is_alive()]
+            worker = self._pick_worker()
+            if worker is None:
+                self._pending.append(job)
+            else:
+                worker.active += 1
+                worker.start(job)
+        return future
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Load time and bytes transferred per render profile."""
+
+        with self._lock:
+            snapshot = {name: dict(counters) for name, counters in self._profile_stats.items()}
+        for counters in snapshot.values():
+            renders = counters["renders"] or 1
+            counters["avg_ms"] = round(counters["total_ms"] / renders, 1)
+            counters["avg_bytes"] = int(counters["bytes"] / renders)
+            counters["total_ms"] = round(counters["total_ms"], 1)
+        return snapshot
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop all workers and close their browsers."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            self._workers = []
+            pending = list(self._pending)
+            self._pending.clear()
+
+        for job in pending:
+            job[0].cancel()
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.thread.join(timeout=timeout)
+
+    def _pick_worker(self) -> Optional[_Worker]:
+        # Called with the lock held.
+        idle = [worker for worker in self._workers if worker.active == 0]
+        if idle:
+            return idle[0]
+        if len(self._workers) < self.size:
+            worker = _Worker(self, f"browser-pool-{len(self._workers)}")
+            self._workers.append(worker)
+            worker.thread.start()
+            return worker
+        free = [worker for worker in self._workers if worker.active < self.pages_per_browser]
+        return min(free, key=lambda worker: worker.active) if free else None
+
+    async def _handle(
+        self,
+        worker: _Worker,
+        future: Future,
+        url: str,
+        wait_selector: str | None,
+        profile: RenderProfile,
+    ) -> None:
+        try:
+            if future.set_running_or_notify_cancel():
+                await self._render_job(worker.slot, future, url, wait_selector, profile)
+        finally:
+            with self._lock:
+                job = self._pending.popleft() if self._pending and not self._closed else None
+                if job is None:
+                    worker.active -= 1
+            if job is not None:
+                worker.start(job)
+
+    async def _render_job(
+        self,
+        slot: _BrowserSlot,
+        future: Future,
+        url: str,
+        wait_selector: str | None,
+        profile: RenderProfile,
+    ) -> None:
+        traffic = {"bytes": 0, "blocked": 0}
+        started = time.perf_counter()
+        context = None
+        try:
+            context = await slot.open_context()
+            html = await self._render_with(context, url, wait_selector, profile, traffic)
+        except Exception as exc:
+            if context is not None:
+                await slot.release_context(context, failed=True)
+            future.set_exception(exc)
+        else:
+            await slot.release_context(context)
+            self._record(profile, time.perf_counter() - started, traffic)
+            future.set_result(html)
+
+    def _record(self, profile: RenderProfile, seconds: float, traffic: Dict[str, int]) -> None:
+        with self._lock:
+            counters = self._profile_stats.setdefault(
+                profile.name, {"renders": 0, "total_ms": 0.0, "bytes": 0, "blocked_requests": 0}
+            )
+            counters["renders"] += 1
+            counters["total_ms"] += seconds * 1000
+            counters["bytes"] += traffic["bytes"]
+            counters["blocked_requests"] += traffic["blocked"]
+
+    @staticmethod
+    async def _render_with(
+        context,
+        url: str,
+        wait_selector: str | None,
+        profile: RenderProfile,
+        traffic: Dict[str, int],
+    ) -> str:
+        page = await context.new_page()
+        try:
+            if profile.blocked_resources or profile.blocked_domains:
+
+                async def route(route):
+                    request = route.request
+                    if profile.blocks(request.resource_type, request.url):
+                        traffic["blocked"] += 1
+                        await route.abort()
+                    else:
+                        await route.continue_()
+
+                await page.route("**/*", route)
+
+            def count_bytes(response):
+                # Content-Length of compressed responses is the wire size;
+                # chunked responses without it are not counted.
+                try:
+                    traffic["bytes"] += int(response.headers.get("content-length") or 0)
+                except ValueError:
+                    pass
+
+            page.on("response", count_bytes)
+            await page.goto(url, timeout=profile.navigation_timeout_ms, wait_until=profile.wait_until)
+            if wait_selector:
+                try:
+                    await page.wait_for_selector(
+                        wait_selector, state="attached", timeout=profile.selector_timeout_ms
+                    )
+                except Exception:
+                    logger.warning("Selector %s not found for %s", wait_selector, url)
+            return await page.content()
+        finally:
+            await page.close()
+
+
+_POOL: BrowserPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide :class:`BrowserPool`, creating it on first use."""
+
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._closed:
+            _POOL = BrowserPool()
+        return _POOL
+
+
+def browser_pool_stats() -> Dict[str, Dict[str, float]]:
+    """Per-profile render stats of the shared pool, empty if none was created."""
+
+    with _POOL_LOCK:
+        pool = _POOL
+    return pool.stats() if pool is not None else {}
+
+
+def shutdown_browser_pool() -> None:
+    """Close the shared browsers; safe to call when no pool was created."""
+
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,171 @@
+"""Canonical product URLs, so the same listing found twice is recognised.
+
+The same product can reach a search through a vendor scraper, Google and a
+DuckDuckGo redirect, each time with a different URL: tracking parameters,
+``http`` vs ``https``, ``m.`` vs ``www.`` hosts, or a category path in front
+of the product slug. :func:`canonical_url` reduces such variants to one URL
+using generic rules plus per-domain rules for Amazon (ASIN), eBay (item id)
+and the MobileSentrix/Fixez storefronts (product slug), and
+:func:`identity_key` turns that URL into a key for deduplication.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlparse, urlunparse
+
+TRACKING_PREFIXES = ("utm_", "pd_rd_", "pf_rd_", "_trk")
+TRACKING_PARAMS = {
+    "ref",
+    "ref_",
+    "tag",
+    "gclid",
+    "gclsrc",
+    "dclid",
+    "fbclid",
+    "msclkid",
+    "srsltid",
+    "mc_cid",
+    "mc_eid",
+    "campid",
+    "customid",
+    "toolid",
+    "mkcid",
+    "mkevt",
+    "mkrid",
+    "spm",
+}
+# Mobile site hosts, mapped to the www. host.
+_MOBILE_PREFIXES = ("m.", "mobile.")
+
+_ASIN = re.compile(r"/(?:dp|gp/product|gp/aw/d|exec/obidos/asin|o/asin)/([A-Z0-9]{10})(?:[/?]|$)", re.I)
+_EBAY_ITEM = re.compile(r"/itm/(?:[^/]+/)?(\d{9,15})(?:[/?]|$)")
+_SHOPIFY_PRODUCT = re.compile(r"/products/([^/]+)")
+
+# (scheme, host, path, query) -> the same, with the rule applied.
+Parts = Tuple[str, str, str, str]
+DomainRule = Callable[[Parts], Optional[Parts]]
+
+
+def _amazon(parts: Parts) -> Optional[Parts]:
+    scheme, host, path, query = parts
+    match = _ASIN.search(path)
+    if not match:
+        return None
+    return scheme, host, f"/dp/{match.group(1).upper()}", ""
+
+
+def _ebay(parts: Parts) -> Optional[Parts]:
+    scheme, host, path, query = parts
+    match = _EBAY_ITEM.search(path)
+    item = match.group(1) if match else (parse_qs(query).get("item") or [None])[0]
+    if not item or not item.isdigit():
+        return None
+    return scheme, host, f"/itm/{item}", ""
+
+
+def _storefront(parts: Parts) -> Optional[Parts]:
+    # Shopify (/collections/<c>/products/<handle>) and Magento
+    # (/<category>/<slug>.html) product URLs both end in a unique slug;
+    # only a product variant id changes what the page offers.
+    scheme, host, path, query = parts
+    match = _SHOPIFY_PRODUCT.search(path)
+    if match:
+        path = f"/products/{match.group(1)}"
+    elif path.endswith(".html"):
+        path = "/" + path.rsplit("/", 1)[-1]
+    variant = [(name, value) for name, value in parse_qsl(query) if name == "variant"]
+    return scheme, host, path, urlencode(variant)
+
+
+DOMAIN_RULES: Dict[str, DomainRule] = {
+    "amazon": _amazon,
+    "ebay": _ebay,
+    "mobilesentrix": _storefront,
+    "fixez": _storefront,
+}
+
+
+def _rule_for(host: str) -> Optional[DomainRule]:
+    # Matched on the registrable name, so amazon.co.uk and m.ebay.de count.
+    labels = host.split(".")
+    for label in labels[-3:-1] if len(labels) > 2 else labels[:1]:
+        rule = DOMAIN_RULES.get(label)
+        if rule:
+            return rule
+    return None
+
+
+def unwrap_redirect(url: str) -> str:
+    """Return the destination of a DuckDuckGo or Google redirect link."""
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith("duckduckgo.com") and parsed.path.startswith("/l/"):
+        target = parse_qs(parsed.query).get("uddg")
+    elif "google" in host.split(".") and parsed.path == "/url":
+        params = parse_qs(parsed.query)
+        target = params.get("q") or params.get("url")
+    else:
+        return url
+    return target[0] if target else url
+
+
+def canonical_url(url: str) -> str:
+    """Normalize *url* so every variant of one product page is the same URL.
+
+    Fragments and tracking parameters are dropped, the scheme becomes
+    ``https``, mobile hosts become ``www.`` and the remaining query is
+    sorted; known shops are reduced further by :data:`DOMAIN_RULES`.
+    Links without a host only lose surrounding whitespace and the fragment.
+    """
+
+    url = unwrap_redirect(url.strip())
+    if url.startswith("//"):
+        url = f"https:{url}"
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return urlunparse(parsed._replace(fragment=""))
+
+    host = parsed.netloc.lower()
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    for prefix in _MOBILE_PREFIXES:
+        if host.startswith(prefix):
+            host = "www." + host[len(prefix):]
+            break
+
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PREFIXES) and name.lower() not in TRACKING_PARAMS
+    ]
+    parts: Parts = ("https", host, parsed.path.rstrip("/") or "/", urlencode(sorted(query)))
+
+    rule = _rule_for(host)
+    if rule is not None:
+        parts = rule(parts) or parts
+
+    scheme, host, path, query = parts
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+def identity_key(canonical: str) -> str:
+    """Deduplication key for a URL returned by :func:`canonical_url`.
+
+    Ignores the scheme, a leading ``www.`` and the case of the host; paths
+    and queries keep their case, since many shops treat it as significant.
+    """
+
+    parsed = urlparse(canonical)
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return canonical
+    return f"{host}{parsed.path}?{parsed.query}" if parsed.query else f"{host}{parsed.path}"
+
+
+def dedupe_key(url: str) -> str:
+    return identity_key(canonical_url(url)) if url.strip() else ""
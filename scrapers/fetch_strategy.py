@@ -0,0 +1,150 @@
+"""Per-domain choice between a static fetch and a Playwright render."""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from typing import Dict, List
+
+# Recent static outcomes kept per domain, how many are needed before static
+# can be preferred, the success rate required, and how often (in requests) a
+# domain that currently renders first is probed with a static fetch.
+FETCH_STATIC_WINDOW = int(os.environ.get("FETCH_STATIC_WINDOW", 20))
+FETCH_STATIC_MIN_SAMPLES = int(os.environ.get("FETCH_STATIC_MIN_SAMPLES", 3))
+FETCH_STATIC_SUCCESS_RATE = float(os.environ.get("FETCH_STATIC_SUCCESS_RATE", 0.8))
+FETCH_REPROBE_EVERY = int(os.environ.get("FETCH_REPROBE_EVERY", 10))
+
+STATIC = "static"
+RENDERED = "rendered"
+
+_FIXED_PLANS = {
+    "static": [STATIC],
+    "rendered": [RENDERED],
+    "rendered_then_static": [RENDERED, STATIC],
+}
+
+
+class _DomainState:
+    __slots__ = ("static_window", "since_probe", "counters", "seconds")
+
+    def __init__(self, window: int):
+        self.static_window: deque[bool] = deque(maxlen=window)
+        self.since_probe = 0
+        self.counters = {
+            "requests": 0,
+            "static_first": 0,
+            "static_attempts": 0,
+            "static_successes": 0,
+            "render_attempts": 0,
+            "render_successes": 0,
+            "render_fallbacks": 0,
+        }
+        self.seconds = {STATIC: 0.0, RENDERED: 0.0}
+
+    def prefers_static(self, min_samples: int, success_rate: float) -> bool:
+        outcomes = self.static_window
+        return len(outcomes) >= min_samples and sum(outcomes) / len(outcomes) >= success_rate
+
+
+class FetchStrategy:
+    """Learn per domain whether a static fetch already yields product items.
+
+    ``adaptive`` vendors start with the render and fall back to a static
+    fetch. Once enough recent static fetches parsed into items, static goes
+    first and Playwright is only used when it fails. While rendering first,
+    every ``reprobe_every``-th request tries static first to re-check.
+    """
+
+    def __init__(
+        self,
+        window: int = FETCH_STATIC_WINDOW,
+        min_samples: int = FETCH_STATIC_MIN_SAMPLES,
+        success_rate: float = FETCH_STATIC_SUCCESS_RATE,
+        reprobe_every: int = FETCH_REPROBE_EVERY,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.success_rate = success_rate
+        self.reprobe_every = reprobe_every
+        self._domains: Dict[str, _DomainState] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, domain: str, strategy: str) -> List[str]:
+        """Return the fetch paths to try, in order, for one request."""
+
+        fixed = _FIXED_PLANS.get(strategy)
+        if fixed is not None:
+            return list(fixed)
+
+        with self._lock:
+            state = self._state(domain)
+            state.counters["requests"] += 1
+            static_first = state.prefers_static(self.min_samples, self.success_rate)
+            if not static_first:
+                state.since_probe += 1
+                if self.reprobe_every and state.since_probe >= self.reprobe_every:
+                    state.since_probe = 0
+                    static_first = True
+            if static_first:
+                state.counters["static_first"] += 1
+        return [STATIC, RENDERED] if static_first else [RENDERED, STATIC]
+
+    def record(self, domain: str, path: str, ok: bool, seconds: float, fallback: bool = False) -> None:
+        """Record one fetch+parse attempt; ``fallback`` marks a render after a failed static fetch."""
+
+        with self._lock:
+            state = self._state(domain)
+            state.seconds[path] += seconds
+            if path == STATIC:
+                state.static_window.append(ok)
+                state.counters["static_attempts"] += 1
+                state.counters["static_successes"] += int(ok)
+            else:
+                state.counters["render_attempts"] += 1
+                state.counters["render_successes"] += int(ok)
+                state.counters["render_fallbacks"] += int(fallback)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {domain: self._domain_stats(state) for domain, state in self._domains.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._domains.clear()
+
+    def _domain_stats(self, state: _DomainState) -> Dict[str, object]:
+        counters = state.counters
+        stats: Dict[str, object] = dict(counters)
+        static_avg = _average(state.seconds[STATIC], counters["static_attempts"])
+        render_avg = _average(state.seconds[RENDERED], counters["render_attempts"])
+        renders_avoided = counters["static_first"] - counters["render_fallbacks"]
+        stats.update(
+            {
+                "preferred": STATIC if state.prefers_static(self.min_samples, self.success_rate) else RENDERED,
+                "static_success_rate": _ratio(counters["static_successes"], counters["static_attempts"]),
+                "render_fallback_rate": _ratio(counters["render_fallbacks"], counters["static_first"]),
+                "static_avg_ms": round(static_avg * 1000, 1),
+                "render_avg_ms": round(render_avg * 1000, 1),
+                "renders_avoided": renders_avoided,
+                "render_seconds_saved": round(max(renders_avoided, 0) * render_avg, 3),
+            }
+        )
+        return stats
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState(self.window)
+        return state
+
+
+def _average(total: float, count: int) -> float:
+    return total / count if count else 0.0
+
+
+def _ratio(part: int, whole: int) -> float:
+    return round(part / whole, 3) if whole else 0.0
+
+
+FETCH_STRATEGY = FetchStrategy()
@@ -8,12 +8,17 @@ from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 
-from scrapers.utils import parse_price, safe_get
+from scrapers import aio
+from scrapers.parse_pool import run_parser
+from scrapers.utils import ScraperUnavailable, make_soup, parse_price, safe_get, strainer
 
 logger = logging.getLogger(__name__)
 
 SEARCH_URL = "https://www.google.com/search"
 MAX_RESULTS = 10
+# Organic result cards and Shopping carousel cards; everything else on the
+# SERP is skipped while parsing.
+RESULT_CARDS = strainer("div", ["g", "MjjYud", "sh-dgr__content"])
 
 
 def _price_from_snippet(snippet: str | None) -> str | None:
@@ -34,8 +39,7 @@ def _domain_for(url: str) -> str:
         return "Web"
 
 
-def _parse_results(html: str) -> List[Dict[str, object]]:
-    soup = BeautifulSoup(html, "html.parser")
+def _parse_results(soup: BeautifulSoup) -> List[Dict[str, object]]:
     results: List[Dict[str, object]] = []
 
     for card in soup.select("div.g, div.MjjYud"):
@@ -74,8 +78,7 @@ def _parse_results(html: str) -> List[Dict[str, object]]:
     return results
 
 
-def _parse_prices_from_shopping(html: str) -> List[Dict[str, object]]:
-    soup = BeautifulSoup(html, "html.parser")
+def _parse_prices_from_shopping(soup: BeautifulSoup) -> List[Dict[str, object]]:
     listings: List[Dict[str, object]] = []
 
     for product in soup.select("div.sh-dgr__content"):
@@ -111,6 +114,19 @@ def _parse_prices_from_shopping(html: str) -> List[Dict[str, object]]:
     return listings
 
 
+def _parse_page(html: str) -> List[Dict[str, object]]:
+    """Return Shopping listings followed by organic results from a SERP."""
+
+    soup = make_soup(html, RESULT_CARDS)
+    organic = _parse_results(soup)
+    shopping = _parse_prices_from_shopping(soup)
+
+    combined: List[Dict[str, object]] = []
+    combined.extend(shopping)
+    combined.extend(organic)
+    return combined[:MAX_RESULTS]
+
+
 def scrape_google_search(query: str) -> Iterable[Dict[str, object]]:
     """Perform a Google search and return lightweight results."""
 
@@ -119,13 +135,19 @@ def scrape_google_search(query: str) -> Iterable[Dict[str, object]]:
 
     html = safe_get(SEARCH_URL, params={"q": query, "hl": "en"})
     if not html:
-        logger.warning("Google search did not return HTML for query '%s'", query)
+        raise ScraperUnavailable(f"Google search did not return HTML for query '{query}'")
+
+    return run_parser(_parse_page, html)
+
+
+async def scrape_google_search_async(query: str) -> List[Dict[str, object]]:
+    """Coroutine version of :func:`scrape_google_search` for the async engine."""
+
+    if not query.strip():
         return []
 
-    organic = _parse_results(html)
-    shopping = _parse_prices_from_shopping(html)
+    html = await aio.fetch_text(SEARCH_URL, params={"q": query, "hl": "en"})
+    if not html:
+        raise ScraperUnavailable(f"Google search did not return HTML for query '{query}'")
 
-    combined: List[Dict[str, object]] = []
-    combined.extend(shopping)
-    combined.extend(organic)
-    return combined[:MAX_RESULTS]
+    return await aio.parse(_parse_page, html)
@@ -0,0 +1,290 @@
+"""On-disk HTTP response cache with conditional revalidation for safe_get."""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+# An empty HTTP_CACHE_DIR disables the cache.
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join("/tmp", "pricescout_http_cache"))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Minimum freshness in seconds per domain (matched on the host suffix, the
+# longest match winning). It
+# applies even when the server asks for revalidation, but never overrides
+# ``Cache-Control: no-store``.
+HTTP_CACHE_MIN_TTL: Dict[str, float] = {
+    "mobilesentrix.com": 900,
+    "fixez.com": 900,
+    "laptopscreen.com": 900,
+    "mengtor.com": 900,
+    **json.loads(os.environ.get("HTTP_CACHE_MIN_TTL") or "{}"),
+}
+
+
+class CachedResponse:
+    __slots__ = ("key", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, key: str, body: str, etag: str | None, last_modified: str | None, expires_at: float):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, str]:
+    directives: Dict[str, str] = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"')
+    return directives
+
+
+class HttpCache:
+    """Store response bodies gzip-compressed on disk, indexed in SQLite.
+
+    Freshness follows ``Cache-Control`` (``max-age``/``s-maxage``,
+    ``no-cache``, ``no-store``) and ``Expires``, raised to the per-domain
+    minimum TTL. Stale entries with an ``ETag`` or ``Last-Modified`` are
+    revalidated with a conditional GET. The total body size is capped and
+    the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        min_ttls: Mapping[str, float] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_ttls = dict(HTTP_CACHE_MIN_TTL if min_ttls is None else min_ttls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._db_path = os.path.join(directory, "index.db")
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    @staticmethod
+    def url_for(url: str, params=None) -> str:
+        if not params:
+            return url
+        return requests.Request("GET", url, params=params).prepare().url
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached response for the full *url*, fresh or stale."""
+
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (self._clock(), key))
+
+        try:
+            with gzip.open(self._body_path(key), "rt", encoding="utf-8") as handle:
+                body = handle.read()
+        except OSError:
+            self._delete(key)
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        return CachedResponse(key, body, row[0], row[1], row[2])
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        fresh = entry.expires_at > self._clock()
+        if fresh:
+            with self._lock:
+                self._counters["hits"] += 1
+        return fresh
+
+    def store(self, url: str, response: requests.Response) -> None:
+        if response.status_code != 200:
+            return
+
+        expires_at = self._expires_at(url, response.headers)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if expires_at is None or (expires_at <= self._clock() and not (etag or last_modified)):
+            return
+
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        compressed = gzip.compress(response.text.encode("utf-8"))
+        if len(compressed) > self.max_bytes:
+            return
+
+        tmp_path = f"{self._body_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(compressed)
+        os.replace(tmp_path, self._body_path(key))
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                (key, url, etag, last_modified, expires_at, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, url, etag, last_modified, expires_at, len(compressed), self._clock()),
+            )
+            self._counters["stores"] += 1
+            self._evict(conn)
+
+    def revalidated(self, url: str, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Record a ``304 Not Modified`` answer for *entry*."""
+
+        expires_at = self._expires_at(url, headers)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE entries SET expires_at = ?, etag = COALESCE(?, etag) WHERE key = ?",
+                (expires_at or self._clock(), headers.get("ETag"), entry.key),
+            )
+            self._counters["revalidated"] += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            stats: Dict[str, object] = dict(self._counters)
+        stats["entries"] = entries
+        stats["bytes"] = size
+        return stats
+
+    def _expires_at(self, url: str, headers: Mapping[str, str]) -> Optional[float]:
+        """Return the expiry timestamp, or ``None`` when storing is forbidden."""
+
+        now = self._clock()
+        directives = _cache_control(headers)
+        if "no-store" in directives:
+            return None
+
+        ttl = 0.0
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        if "no-cache" in directives:
+            ttl = 0.0
+        elif max_age is not None:
+            try:
+                ttl = float(max_age)
+            except ValueError:
+                ttl = 0.0
+        elif headers.get("Expires"):
+            try:
+                ttl = parsedate_to_datetime(headers["Expires"]).timestamp() - now
+            except (TypeError, ValueError):
+                ttl = 0.0
+
+        # The most specific (longest) matching suffix wins, whatever the dict order.
+        host = (urlparse(url).hostname or "").lower()
+        matches = [domain for domain in self.min_ttls if host == domain or host.endswith(f".{domain}")]
+        if matches:
+            ttl = max(ttl, float(self.min_ttls[max(matches, key=len)]))
+
+        return now + max(ttl, 0.0)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._remove_body(key)
+            self._counters["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _delete(self, key: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._remove_body(key)
+
+    def _remove_body(self, key: str) -> None:
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.gz")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Commits or rolls back like ``with conn:`` and then closes the
+        # connection, which sqlite3's own context manager never does.
+        conn = sqlite3.connect(self._db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_CACHE: HttpCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Return the shared cache, or ``None`` when ``HTTP_CACHE_DIR`` is empty."""
+
+    global _CACHE
+    if not HTTP_CACHE_DIR:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            # Replayed pages stay out of the live cache, and each replay starts cold.
+            directory = (
+                tempfile.mkdtemp(prefix="pricescout-replay-http-cache-")
+                if get_transport().replays
+                else HTTP_CACHE_DIR
+            )
+            try:
+                _CACHE = HttpCache(directory)
+            except (OSError, sqlite3.Error):
+                logger.exception("HTTP cache unavailable at %s", directory)
+                return None
+        return _CACHE
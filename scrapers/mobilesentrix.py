@@ -1,71 +1,21 @@
-import logging
-from urllib.parse import quote_plus, urljoin
+"""MobileSentrix catalogue search; see :data:`scrapers.vendors.VENDORS`."""
 
-from bs4 import BeautifulSoup
+from functools import partial
 
-from .utils import parse_price, render_page, safe_get
+from .utils import render_page, safe_get
+from .vendors import VENDORS, parse_vendor_items, scrape_vendor, scrape_vendor_async
 
-BASE = "https://www.mobilesentrix.com"
-logger = logging.getLogger(__name__)
+SPEC = VENDORS["mobilesentrix"]
+BASE = SPEC.base
 
 
 def _parse_items(html: str, query: str):
-    soup = BeautifulSoup(html, "html.parser")
-    items = soup.select("li.product-item, li.item.product.product-item") or soup.select(
-        "div.product-item, div.item.product"
-    )
-    if not items:
-        return []
-
-    results = []
-    for item in items:
-        link_tag = item.select_one("a.product-item-link") or item.select_one("a")
-        price_tag = item.select_one("span.price") or item.select_one("span[data-price]")
-        image_tag = item.select_one("img")
-        if not link_tag:
-            logger.warning("MobileSentrix: missing link tag, skipping item")
-            continue
-
-        link = urljoin(BASE, link_tag.get("href", ""))
-        title = link_tag.get_text(strip=True) or query
-        raw_price = price_tag.get_text() if price_tag else None
-        price = parse_price(raw_price) if raw_price else 0.0
-        in_stock = item.find(string=lambda s: s and "out of stock" in s.lower()) is None
-        image = (
-            urljoin(BASE, image_tag["src"])
-            if image_tag and image_tag.has_attr("src")
-            else "https://via.placeholder.com/100"
-        )
-
-        results.append(
-            {
-                "title": title,
-                "price": price,
-                "in_stock": in_stock,
-                "source": "MobileSentrix",
-                "link": link,
-                "image": image,
-            }
-        )
-
-    return results
+    return parse_vendor_items(html, SPEC.key, query)
 
 
 def scrape_mobilesentrix(query):
-    search_url = f"{BASE}/catalogsearch/result/?q={quote_plus(query)}"
-    html = render_page(search_url, "li.product-item")
-    if html:
-        parsed = _parse_items(html, query)
-        if parsed:
-            return parsed
-        logger.info("MobileSentrix: falling back to static fetch for %s", query)
-
-    static_html = safe_get(search_url)
-    if not static_html:
-        return []
+    return scrape_vendor(SPEC, query, render=partial(render_page, fallback=False), fetch=safe_get)
 
-    parsed = _parse_items(static_html, query)
-    if not parsed:
-        logger.warning("MobileSentrix: no product items found for %s", query)
 
-    return parsed
+async def scrape_mobilesentrix_async(query):
+    return await scrape_vendor_async(SPEC, query)
@@ -0,0 +1,75 @@
+"""Optional process pool for CPU-bound HTML parsing."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# "thread" parses on the calling scraper thread; "process" ships the HTML to a
+# warm pool of worker processes so parsing is not serialized on the GIL.
+PARSE_MODE = os.environ.get("PARSE_MODE", "thread")
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 2))
+
+T = TypeVar("T")
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _warm_worker() -> None:
+    # Import the parser modules once per worker so the first task does not
+    # pay for bs4/soupsieve imports and selector compilation.
+    import scrapers.google_search  # noqa: F401
+    import scrapers.vendors as vendors
+    import scrapers.websearch  # noqa: F401
+
+    for key in vendors.VENDORS:
+        vendors._compiled(key)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn, not fork: the parent runs Playwright and pool threads that
+            # must not be duplicated into the children.
+            _POOL = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return _POOL
+
+
+def run_parser(parser: Callable[..., T], html: str, *args) -> T:
+    """Return ``parser(html, *args)``, on the process pool in ``process`` mode.
+
+    *parser* must be a module-level function returning plain data (lists of
+    dicts) so only the HTML text and the compact records cross the process
+    boundary. If the pool breaks, parsing falls back to the calling thread.
+    """
+
+    if PARSE_MODE != "process":
+        return parser(html, *args)
+
+    try:
+        return _get_pool().submit(parser, html, *args).result()
+    except BrokenProcessPool:
+        logger.exception("Parse pool broke; parsing %s in-process", parser.__name__)
+        shutdown_parse_pool()
+        return parser(html, *args)
+
+
+def shutdown_parse_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,187 @@
+"""Cache of product preview details (image and price) keyed by product URL."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional
+
+from .canonical import canonical_url
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CACHE_TTL_SECONDS = float(os.environ.get("PREVIEW_CACHE_TTL_SECONDS", 6 * 3600))
+PREVIEW_CACHE_MAX_ENTRIES = int(os.environ.get("PREVIEW_CACHE_MAX_ENTRIES", 2048))
+# An empty PREVIEW_CACHE_DB_PATH keeps the cache in memory only.
+PREVIEW_CACHE_DB_PATH = os.environ.get(
+    "PREVIEW_CACHE_DB_PATH", os.path.join("/tmp", "pricescout_previews.db")
+)
+
+
+class PreviewCache:
+    """In-memory LRU of preview details fronting an optional SQLite table.
+
+    Entries store the image URL, raw price text and ``price_value`` together
+    with the time they were fetched, and expire after ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = PREVIEW_CACHE_TTL_SECONDS,
+        max_entries: int = PREVIEW_CACHE_MAX_ENTRIES,
+        db_path: str | None = PREVIEW_CACHE_DB_PATH,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_path = db_path or None
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, object]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+        if self.db_path:
+            try:
+                self._init_db()
+            except sqlite3.Error:
+                logger.exception("Preview cache database unavailable at %s", self.db_path)
+                self.db_path = None
+
+    def get(self, url: str) -> Optional[Dict[str, object]]:
+        key = canonical_url(url)
+        now = self._clock()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and now - cached[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return dict(cached[1])
+
+        cached = self._read_db(key) if self.db_path else None
+        if cached is not None and now - cached[0] <= self.ttl_seconds:
+            self._remember(key, *cached)
+            with self._lock:
+                self._counters["hits"] += 1
+            return dict(cached[1])
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def set(self, url: str, details: Dict[str, object]) -> None:
+        if not details:
+            return
+
+        key = canonical_url(url)
+        fetched_at = self._clock()
+        self._remember(key, fetched_at, dict(details))
+        with self._lock:
+            self._counters["stores"] += 1
+        if self.db_path:
+            self._write_db(key, fetched_at, details)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM previews")
+            except sqlite3.Error:
+                logger.exception("Failed to clear preview cache")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._counters)
+            stats["memory_entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["stored_entries"] = self._count_db() if self.db_path else None
+        return stats
+
+    def _remember(self, key: str, fetched_at: float, details: Dict[str, object]) -> None:
+        with self._lock:
+            self._entries[key] = (fetched_at, details)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Commits or rolls back like ``with conn:`` and then closes the
+        # connection, which sqlite3's own context manager never does.
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS previews (
+                    url TEXT PRIMARY KEY,
+                    image TEXT,
+                    price TEXT,
+                    price_value REAL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _read_db(self, key: str) -> Optional[tuple[float, Dict[str, object]]]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT image, price, price_value, fetched_at FROM previews WHERE url = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            logger.exception("Failed to read preview cache")
+            return None
+
+        if row is None:
+            return None
+
+        image, price, price_value, fetched_at = row
+        details: Dict[str, object] = {}
+        if image:
+            details["image"] = image
+        if price:
+            details["price"] = price
+            details["price_value"] = price_value
+        return fetched_at, details
+
+    def _write_db(self, key: str, fetched_at: float, details: Dict[str, object]) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO previews (url, image, price, price_value, fetched_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (key, details.get("image"), details.get("price"), details.get("price_value"), fetched_at),
+                )
+                conn.execute(
+                    "DELETE FROM previews WHERE fetched_at < ?", (fetched_at - self.ttl_seconds,)
+                )
+        except sqlite3.Error:
+            logger.exception("Failed to write preview cache")
+
+    def _count_db(self) -> Optional[int]:
+        try:
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM previews").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+
+PREVIEW_CACHE = PreviewCache()
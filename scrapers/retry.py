@@ -0,0 +1,271 @@
+"""Jittered retries and latency-hedged requests for outbound fetches."""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+from .scheduler import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+# Application-level retries for transient failures (connection errors,
+# timeouts, 429 and 5xx gateway answers) with full-jitter exponential backoff.
+FETCH_RETRIES = int(os.environ.get("FETCH_RETRIES", 2))
+FETCH_BACKOFF_BASE_SECONDS = float(os.environ.get("FETCH_BACKOFF_BASE_SECONDS", 0.3))
+FETCH_BACKOFF_MAX_SECONDS = float(os.environ.get("FETCH_BACKOFF_MAX_SECONDS", 3.0))
+# A hedge (second copy of a request) is sent once the first has been in
+# flight for the domain's observed p90 latency. Every request to a domain
+# with enough samples may be hedged, but each hedge actually sent costs one
+# unit of budget, earned at FETCH_HEDGE_BUDGET per request, so hedges add at
+# most ~10% traffic by default; up to FETCH_HEDGE_BURST unspent units are
+# kept for bursts of slow requests. Hedge-eligible requests are raced on a
+# pool of FETCH_HEDGE_WORKERS threads; when it is busy they are sent on the
+# caller's thread instead, so the pool never limits fetch concurrency.
+FETCH_HEDGE = os.environ.get("FETCH_HEDGE", "1").lower() not in {"0", "false", "no", ""}
+FETCH_HEDGE_BUDGET = float(os.environ.get("FETCH_HEDGE_BUDGET", 0.1))
+FETCH_HEDGE_BURST = float(os.environ.get("FETCH_HEDGE_BURST", 10))
+FETCH_HEDGE_MIN_SAMPLES = int(os.environ.get("FETCH_HEDGE_MIN_SAMPLES", 20))
+FETCH_HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("FETCH_HEDGE_MIN_DELAY_SECONDS", 0.05))
+FETCH_HEDGE_WORKERS = int(os.environ.get("FETCH_HEDGE_WORKERS", 64))
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class LatencyTracker:
+    """Recent response latencies per domain."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, domain: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(domain)
+            if samples is None:
+                samples = self._samples[domain] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, domain: str, quantile: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(domain, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def domains(self) -> list[str]:
+        with self._lock:
+            return list(self._samples)
+
+
+class ResilientFetcher:
+    """Send a request with jittered retries and an optional latency hedge."""
+
+    def __init__(
+        self,
+        retries: int = FETCH_RETRIES,
+        backoff_base: float = FETCH_BACKOFF_BASE_SECONDS,
+        backoff_max: float = FETCH_BACKOFF_MAX_SECONDS,
+        hedge: bool = FETCH_HEDGE,
+        hedge_budget: float = FETCH_HEDGE_BUDGET,
+        hedge_burst: float = FETCH_HEDGE_BURST,
+        hedge_min_samples: int = FETCH_HEDGE_MIN_SAMPLES,
+        hedge_workers: int = FETCH_HEDGE_WORKERS,
+        latencies: LatencyTracker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.retries = max(0, retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.hedge_burst = max(1.0, hedge_burst)
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_workers = hedge_workers
+        self.latencies = latencies or LatencyTracker()
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # Starts with one hedge available so a slow domain can be hedged
+        # before the budget has accumulated.
+        self._budget = 1.0
+        self._executor: ThreadPoolExecutor | None = None
+        self._busy_workers = 0
+        self._counters = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+
+    def fetch(
+        self,
+        domain: str,
+        send: Callable[[], requests.Response],
+        acquire: Callable[[], None] | None = None,
+    ) -> requests.Response:
+        """Return ``send()``'s response, retrying transient failures.
+
+        *acquire* (such as a rate-limit wait) runs before every send,
+        hedges included, and is not counted in the domain's latency. The
+        last retryable response is returned (not raised) once retries are
+        exhausted so callers can inspect its status.
+        """
+
+        acquire = acquire or _no_wait
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self._hedged(domain, send, acquire)
+            except TRANSIENT_ERRORS as exc:
+                if last:
+                    raise
+                delay = self._backoff(attempt)
+                logger.info("Transient error for %s (%s); retrying in %.2fs", domain, exc, delay)
+            else:
+                if last or response.status_code not in RETRYABLE_STATUS:
+                    return response
+                delay = max(self._backoff(attempt), _retry_after(response, self.backoff_max))
+                logger.info("%s answered %s; retrying in %.2fs", domain, response.status_code, delay)
+                response.close()
+
+            with self._lock:
+                self._counters["retries"] += 1
+            self._sleep(delay)
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._counters)
+        stats["p90_ms"] = {
+            domain: round(self.latencies.percentile(domain, 0.9) * 1000, 1)
+            for domain in self.latencies.domains()
+        }
+        return stats
+
+    def _backoff(self, attempt: int) -> float:
+        return full_jitter(attempt, self.backoff_base, self.backoff_max)
+
+    def _timed(self, domain: str, send: Callable[[], requests.Response]) -> requests.Response:
+        started = time.perf_counter()
+        response = send()
+        self.latencies.observe(domain, time.perf_counter() - started)
+        return response
+
+    def _acquire_and_send(
+        self, domain: str, send: Callable[[], requests.Response], acquire: Callable[[], None]
+    ) -> requests.Response:
+        acquire()
+        return self._timed(domain, send)
+
+    def _hedged(
+        self, domain: str, send: Callable[[], requests.Response], acquire: Callable[[], None]
+    ) -> requests.Response:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._budget = min(self._budget + self.hedge_budget, self.hedge_burst)
+
+        delay = self.latencies.percentile(domain, 0.9, self.hedge_min_samples) if self.hedge else None
+        acquire()
+        # A blocked send cannot be abandoned, so a request that may need a
+        # hedge runs on the pool while the caller waits for whichever copy
+        # answers first.
+        primary = self._submit(self._timed, domain, send) if delay is not None else None
+        if primary is None:
+            return self._timed(domain, send)
+
+        done, _ = wait([primary], timeout=max(delay, FETCH_HEDGE_MIN_DELAY_SECONDS))
+        if done or not self._spend_hedge():
+            return primary.result()
+
+        backup = self._submit(self._acquire_and_send, domain, send, acquire)
+        if backup is None:
+            self._refund_hedge()
+            return primary.result()
+        with self._lock:
+            self._counters["hedges"] += 1
+
+        pending = {primary, backup}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                if future is backup:
+                    with self._lock:
+                        self._counters["hedge_wins"] += 1
+                return future.result()
+        raise error
+
+    def _spend_hedge(self) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
+
+    def _refund_hedge(self) -> None:
+        with self._lock:
+            self._budget = min(self._budget + 1.0, self.hedge_burst)
+
+    def _submit(self, fn: Callable[..., requests.Response], *args) -> Optional[Future]:
+        """Run *fn* on the hedge pool, or return ``None`` if every worker is busy."""
+
+        with self._lock:
+            if self._busy_workers >= self.hedge_workers:
+                return None
+            self._busy_workers += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.hedge_workers), thread_name_prefix="fetch-hedge"
+                )
+            executor = self._executor
+        future = submit_in_context(executor, fn, *args)
+        future.add_done_callback(self._release_worker)
+        return future
+
+    def _release_worker(self, _future: Future) -> None:
+        with self._lock:
+            self._busy_workers -= 1
+
+
+def full_jitter(attempt: int, base: float, ceiling: float) -> float:
+    """Backoff before retry *attempt* (0-based): uniform up to ``base * 2**attempt``."""
+
+    return random.uniform(0, min(ceiling, base * (2 ** attempt)))
+
+
+def _no_wait() -> None:
+    pass
+
+
+def _close_response(future: Future) -> None:
+    if future.exception() is None:
+        future.result().close()
+
+
+def _retry_after(response: requests.Response, ceiling: float) -> float:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(max(seconds, 0.0), ceiling)
+
+
+FETCHER = ResilientFetcher()
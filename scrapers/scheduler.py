@@ -0,0 +1,282 @@
+"""Per-domain rate limiting and priority ordering for outbound fetches."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Iterator, Mapping
+from urllib.parse import urlparse
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+_PRIORITY_ORDER = {INTERACTIVE: 0, BACKGROUND: 1}
+
+# Requests per second and burst size per domain (matched on the host suffix).
+# Hosts without an entry get RATE_LIMIT_DEFAULT, with one bucket per host.
+RATE_LIMITS: Dict[str, Dict[str, float]] = {
+    "google.com": {"rate": 0.5, "burst": 2},
+    "duckduckgo.com": {"rate": 1, "burst": 3},
+    "mobilesentrix.com": {"rate": 2, "burst": 4},
+    "fixez.com": {"rate": 2, "burst": 4},
+    "laptopscreen.com": {"rate": 2, "burst": 4},
+    "mengtor.com": {"rate": 2, "burst": 4},
+    **json.loads(os.environ.get("RATE_LIMITS") or "{}"),
+}
+RATE_LIMIT_DEFAULT: Dict[str, float] = json.loads(
+    os.environ.get("RATE_LIMIT_DEFAULT") or '{"rate": 5, "burst": 10}'
+)
+# How long a fetch may wait for its turn before it is given up.
+FETCH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("FETCH_QUEUE_TIMEOUT_SECONDS", 20))
+
+_PRIORITY: contextvars.ContextVar[str] = contextvars.ContextVar("fetch_priority", default=BACKGROUND)
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a fetch waited longer than allowed for its domain's turn."""
+
+
+@contextlib.contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Run fetches made in this block (and work submitted via
+    :func:`submit_in_context`) at *priority*."""
+
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+def submit_in_context(executor: Executor, fn: Callable, *args) -> Future:
+    """Submit *fn* so it runs with the caller's fetch priority."""
+
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+class TokenBucket:
+    """Classic token bucket; a non-positive ``rate`` means unlimited."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _DomainQueue:
+    __slots__ = ("bucket", "waiters", "ready", "wakeups", "metrics")
+
+    def __init__(self, bucket: TokenBucket, lock: threading.Lock):
+        self.bucket = bucket
+        self.waiters: list[tuple[int, int]] = []
+        self.ready = threading.Condition(lock)
+        # Futures of coroutines waiting in acquire_async, with their loops.
+        self.wakeups: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    def notify(self) -> None:
+        """Wake every waiter, threads and coroutines alike (lock held)."""
+
+        self.ready.notify_all()
+        wakeups, self.wakeups = self.wakeups, []
+        for loop, future in wakeups:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:  # the waiter's loop has been closed
+                pass
+
+
+class RequestScheduler:
+    """Admit outbound requests per domain through token buckets.
+
+    Callers waiting on the same domain are served in priority order
+    (interactive before background), FIFO within a priority. Time spent
+    queued is recorded per domain and priority.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, Mapping[str, float]] | None = None,
+        default_limit: Mapping[str, float] | None = None,
+        queue_timeout: float = FETCH_QUEUE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = dict(RATE_LIMITS if limits is None else limits)
+        self.default_limit = dict(RATE_LIMIT_DEFAULT if default_limit is None else default_limit)
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._domains: Dict[str, _DomainQueue] = {}
+        self._sequence = itertools.count()
+
+    def domain_for(self, url: str) -> str:
+        host = (urlparse(url).hostname or "").lower()
+        for domain in self.limits:
+            if host == domain or host.endswith(f".{domain}"):
+                return domain
+        return host
+
+    def acquire(self, url: str, timeout: float | None = None) -> float:
+        """Block until a request to *url* may be sent; return the seconds queued."""
+
+        domain = self.domain_for(url)
+        priority = current_priority()
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._lock:
+            queue = self._queue(domain)
+            ticket = (_PRIORITY_ORDER.get(priority, 1), next(self._sequence))
+            heapq.heappush(queue.waiters, ticket)
+            started = self._clock()
+            deadline = started + timeout
+            queued = False
+            try:
+                while True:
+                    now = self._clock()
+                    wait = queue.bucket.take(now) if queue.waiters[0] == ticket else None
+                    if wait == 0:
+                        heapq.heappop(queue.waiters)
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._observe(queue, priority, now - started, True, timed_out=True)
+                        raise RateLimitTimeout(f"Waited {timeout}s for a request slot to {domain}")
+                    queued = True
+                    queue.ready.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                if ticket in queue.waiters:
+                    queue.waiters.remove(ticket)
+                    heapq.heapify(queue.waiters)
+                queue.notify()
+                raise
+            queue.notify()
+            waited = self._clock() - started
+            self._observe(queue, priority, waited, queued)
+        return waited
+
+    async def acquire_async(self, url: str, timeout: float | None = None) -> float:
+        """Awaitable :meth:`acquire` that waits on the event loop, not a thread."""
+
+        domain = self.domain_for(url)
+        priority = current_priority()
+        timeout = self.queue_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queue = self._queue(domain)
+            ticket = (_PRIORITY_ORDER.get(priority, 1), next(self._sequence))
+            heapq.heappush(queue.waiters, ticket)
+            started = self._clock()
+        deadline = started + timeout
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    now = self._clock()
+                    wait = queue.bucket.take(now) if queue.waiters[0] == ticket else None
+                    if wait == 0:
+                        heapq.heappop(queue.waiters)
+                        queue.notify()
+                        waited = now - started
+                        self._observe(queue, priority, waited, queued)
+                        return waited
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._observe(queue, priority, now - started, True, timed_out=True)
+                        raise RateLimitTimeout(f"Waited {timeout}s for a request slot to {domain}")
+                    wakeup = loop.create_future()
+                    queue.wakeups.append((loop, wakeup))
+                queued = True
+                await asyncio.wait({wakeup}, timeout=remaining if wait is None else min(wait, remaining))
+                if not wakeup.done():
+                    with self._lock:
+                        if (loop, wakeup) in queue.wakeups:
+                            queue.wakeups.remove((loop, wakeup))
+        except BaseException:
+            with self._lock:
+                if ticket in queue.waiters:
+                    queue.waiters.remove(ticket)
+                    heapq.heapify(queue.waiters)
+                queue.notify()
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            snapshot = {
+                domain: {
+                    priority: dict(metrics) for priority, metrics in queue.metrics.items()
+                }
+                for domain, queue in self._domains.items()
+            }
+        for priorities in snapshot.values():
+            for metrics in priorities.values():
+                admitted = metrics["requests"] - metrics["timeouts"]
+                wait_seconds = metrics.pop("wait_seconds")
+                metrics["avg_wait_ms"] = round(wait_seconds * 1000 / admitted, 1) if admitted else 0.0
+                metrics["max_wait_ms"] = round(metrics.pop("max_wait_seconds") * 1000, 1)
+        return snapshot
+
+    def _queue(self, domain: str) -> _DomainQueue:
+        queue = self._domains.get(domain)
+        if queue is None:
+            limit = self.limits.get(domain, self.default_limit)
+            bucket = TokenBucket(limit.get("rate", 0), limit.get("burst", 1), self._clock())
+            queue = self._domains[domain] = _DomainQueue(bucket, self._lock)
+        return queue
+
+    @staticmethod
+    def _observe(
+        queue: _DomainQueue, priority: str, waited: float, queued: bool, timed_out: bool = False
+    ) -> None:
+        metrics = queue.metrics.setdefault(
+            priority,
+            {"requests": 0, "queued": 0, "timeouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0},
+        )
+        metrics["requests"] += 1
+        if timed_out:
+            metrics["timeouts"] += 1
+            return
+        metrics["queued"] += int(queued)
+        metrics["wait_seconds"] += waited
+        metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_SCHEDULER: RequestScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide :class:`RequestScheduler`."""
+
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = RequestScheduler()
+        return _SCHEDULER
@@ -0,0 +1,282 @@
+"""Record/replay transport underneath safe_get, render_page and OpenAI calls.
+
+``TRANSPORT_MODE`` selects how outbound traffic is handled:
+
+``live`` (default)
+    Requests go to the network untouched.
+``record``
+    Requests go to the network and every ``200`` answer is also saved to
+    ``TRANSPORT_ARCHIVE``. The HTTP cache is bypassed, so every page is
+    fetched in full rather than served from the cache or revalidated.
+``replay``
+    Answers come from the archive only; nothing touches the network. A
+    request missing from the archive fails like a network error. Latency and
+    errors can be injected per domain with ``TRANSPORT_FAULTS`` so caching,
+    retries, hedging and timeouts can be exercised at scale offline.
+
+The HTTP cache, rate limiter and retry layers all sit above the transport,
+so they behave in replay exactly as they would against real vendors.
+Recording skips the HTTP cache: a fresh cache hit never reaches the
+transport, and an empty ``304`` would overwrite the recorded page. Replays
+use a throwaway HTTP cache in a temporary directory instead of
+``HTTP_CACHE_DIR``, so replayed pages never reach the live cache and every
+replay starts cold.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+TRANSPORT_MODE = os.environ.get("TRANSPORT_MODE", LIVE).lower()
+TRANSPORT_ARCHIVE = os.environ.get("TRANSPORT_ARCHIVE", os.path.join("/tmp", "pricescout_transport"))
+# Faults injected while replaying, per domain (matched on the host suffix;
+# "*" applies to every other host). OpenAI calls use the domain
+# "api.openai.com". ``latency_ms`` is a fixed number, ``"recorded"`` (the
+# latency seen while recording) or ``{"median": ms, "p95": ms}`` for a
+# log-normal distribution; ``error_rate`` is the share of requests that fail
+# with a connection error, or with ``error_status`` when it is set.
+TRANSPORT_FAULTS: Dict[str, Dict[str, object]] = json.loads(os.environ.get("TRANSPORT_FAULTS") or "{}")
+# Seed for the fault injector so replays are repeatable.
+TRANSPORT_SEED = os.environ.get("TRANSPORT_SEED")
+
+CHAT_DOMAIN = "api.openai.com"
+_Z95 = 1.6449
+
+
+class TransportError(requests.RequestException):
+    """A replayed request that is missing from the archive (not retried)."""
+
+
+class InjectedFailure(TransportError, requests.ConnectionError):
+    """A replayed request failed on purpose; retried like a connection error."""
+
+
+class Transport:
+    """Send, record or replay outbound requests according to ``mode``."""
+
+    def __init__(
+        self,
+        mode: str = LIVE,
+        archive: str = TRANSPORT_ARCHIVE,
+        faults: Mapping[str, Mapping[str, object]] | None = None,
+        seed: object = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if mode not in (LIVE, RECORD, REPLAY):
+            raise ValueError(f"Unknown transport mode {mode!r}")
+        self.mode = mode
+        self.archive = archive
+        self.faults = dict(faults or {})
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._counters = {
+            "recorded": 0,
+            "replayed": 0,
+            "misses": 0,
+            "injected_errors": 0,
+            "injected_delay_seconds": 0.0,
+        }
+
+    @property
+    def records(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replays(self) -> bool:
+        return self.mode == REPLAY
+
+    # -- hooks ---------------------------------------------------------------
+
+    def request(
+        self, url: str, params: Mapping[str, object] | None, send: Callable[[], requests.Response]
+    ) -> requests.Response:
+        """Return the HTTP response for a GET of *url* with *params*."""
+
+        if self.mode == LIVE:
+            return send()
+
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        if self.mode == RECORD:
+            started = time.perf_counter()
+            response = send()
+            if response.status_code == 200:
+                self._save(
+                    "http",
+                    full_url,
+                    {
+                        "url": full_url,
+                        "status": response.status_code,
+                        "headers": _recordable_headers(response.headers),
+                        "encoding": response.encoding,
+                        "body": response.text,
+                        "seconds": time.perf_counter() - started,
+                    },
+                )
+            return response
+
+        entry = self._replay("http", full_url, _domain(url))
+        response = requests.Response()
+        response.status_code = entry.get("status_override") or entry["status"]
+        response.url = full_url
+        response.headers.update(entry.get("headers") or {})
+        response.encoding = entry.get("encoding") or "utf-8"
+        response._content = entry["body"].encode(response.encoding)
+        response._content_consumed = True
+        response.reason = "Replayed"
+        return response
+
+    def render(self, url: str, send: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return the rendered HTML for *url*."""
+
+        return self._text("render", url, _domain(url), send)
+
+    def chat(self, model: str, prompt: str, payload: str, send: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return the chat completion for *prompt* and *payload*."""
+
+        key = json.dumps([model, prompt, payload])
+        try:
+            return self._text("chat", key, CHAT_DOMAIN, send)
+        except TransportError:
+            # _call_chat is best effort: a failed completion is ``None``.
+            return None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._counters)
+        stats["mode"] = self.mode
+        stats["injected_delay_seconds"] = round(stats["injected_delay_seconds"], 3)
+        return stats
+
+    # -- internals -----------------------------------------------------------
+
+    def _text(self, kind: str, key: str, domain: str, send: Callable[[], Optional[str]]) -> Optional[str]:
+        if self.mode == LIVE:
+            return send()
+        if self.mode == RECORD:
+            started = time.perf_counter()
+            text = send()
+            if text is not None:
+                self._save(kind, key, {"key": key, "body": text, "seconds": time.perf_counter() - started})
+            return text
+        return self._replay(kind, key, domain)["body"]
+
+    def _replay(self, kind: str, key: str, domain: str) -> Dict[str, object]:
+        entry = self._load(kind, key)
+        if entry is None:
+            self._count("misses")
+            raise TransportError(f"No recorded {kind} response for {key[:200]}")
+
+        fault = self._fault_for(domain)
+        delay = self._delay(fault, entry)
+        if delay > 0:
+            self._count("injected_delay_seconds", delay)
+            self._sleep(delay)
+
+        if self._random.random() < float(fault.get("error_rate", 0)):
+            self._count("injected_errors")
+            status = fault.get("error_status")
+            if not status or kind != "http":
+                raise InjectedFailure(f"Injected failure for {domain}")
+            entry = dict(entry, status_override=int(status))
+
+        self._count("replayed")
+        return entry
+
+    def _fault_for(self, domain: str) -> Mapping[str, object]:
+        host = domain.lower()
+        for suffix, fault in self.faults.items():
+            if suffix != "*" and (host == suffix or host.endswith(f".{suffix}")):
+                return fault
+        return self.faults.get("*", {})
+
+    def _delay(self, fault: Mapping[str, object], entry: Mapping[str, object]) -> float:
+        latency = fault.get("latency_ms")
+        if latency is None:
+            return 0.0
+        if latency == "recorded":
+            return float(entry.get("seconds") or 0.0)
+        if isinstance(latency, Mapping):
+            # Log-normal with the given median and 95th percentile.
+            median = max(float(latency["median"]), 1e-3)
+            p95 = max(float(latency.get("p95", median)), median)
+            sigma = math.log(p95 / median) / _Z95
+            return self._random.lognormvariate(math.log(median), sigma) / 1000
+        return float(latency) / 1000
+
+    def _path(self, kind: str, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.archive, kind, f"{digest}.json.gz")
+
+    def _save(self, kind: str, key: str, entry: Dict[str, object]) -> None:
+        path = self._path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+                json.dump(entry, handle)
+            os.replace(temp_path, path)
+        except OSError:
+            logger.exception("Could not record %s response to %s", kind, path)
+            return
+        self._count("recorded")
+
+    def _load(self, kind: str, key: str) -> Optional[Dict[str, object]]:
+        try:
+            with gzip.open(self._path(kind, key), "rt", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.exception("Unreadable %s recording for %s", kind, key[:200])
+            return None
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+_RECORDED_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "expires", "date", "age")
+
+
+def _recordable_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    # Body encoding headers are dropped because the body is stored decoded.
+    return {name: value for name, value in headers.items() if name.lower() in _RECORDED_HEADERS}
+
+
+_TRANSPORT: Transport | None = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Return the process-wide :class:`Transport` configured from the environment."""
+
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = Transport(TRANSPORT_MODE, TRANSPORT_ARCHIVE, TRANSPORT_FAULTS, TRANSPORT_SEED)
+            if _TRANSPORT.mode != LIVE:
+                logger.warning("Transport in %s mode using %s", _TRANSPORT.mode, _TRANSPORT.archive)
+        return _TRANSPORT
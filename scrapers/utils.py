@@ -1,7 +1,33 @@
 import logging
+import os
 import re
+import threading
+
 import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ProxyError
+from urllib3.util.retry import Retry
+
+from .browser_pool import get_browser_pool
+from .http_cache import get_http_cache
+from .retry import FETCHER
+from .scheduler import RateLimitTimeout, get_scheduler
+from .transport import get_transport
+
+
+def _accepted_encodings():
+    encodings = ["gzip", "deflate"]
+    # urllib3 only decodes brotli bodies when a brotli package is installed.
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encodings.append("br")
+        break
+    return ", ".join(encodings)
+
 
 # Use a full desktop browser header to avoid basic bot blocking
 HEADERS = {
@@ -12,61 +38,211 @@ HEADERS = {
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": _accepted_encodings(),
 }
+REQUEST_TIMEOUT_SECONDS = 10
+# Number of distinct hosts kept in each session's pool, connections kept
+# alive per host, and urllib3-level retries for failed connection attempts.
+# Retries of transient errors and 429/5xx answers, and hedging, happen in
+# scrapers.retry.
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 32))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 8))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 2))
 logger = logging.getLogger(__name__)
 
 
-def safe_get(url, params=None):
-    """Fetch *url* and return the text body, or ``None`` on failure."""
+def _default_parser():
+    # lxml is a C parser and several times faster than the pure-Python
+    # html.parser; use it whenever it is installed.
     try:
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        return resp.text
+        import lxml  # noqa: F401
+    except ImportError:
+        return "html.parser"
+    return "lxml"
+
+
+HTML_PARSER = os.environ.get("HTML_PARSER") or _default_parser()
+# Product cards as matched by the site scrapers' ``li.product-item`` /
+# ``div.item.product`` selectors.
+PRODUCT_ITEM_CLASSES = ("product-item", "product")
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class ScraperUnavailable(RuntimeError):
+    """Raised by a scraper whose source could not be fetched at all.
+
+    Distinguishes an unreachable vendor from a search with no matches so
+    the search circuit breakers only count real failures.
+    """
+
+
+def _build_session(trust_env):
+    session = requests.Session()
+    session.trust_env = trust_env
+    session.headers.update(HEADERS)
+
+    # Only connection setup is retried here: nothing has been sent yet, so
+    # it is safe and fast to retry immediately.
+    retry = Retry(total=HTTP_RETRIES, connect=HTTP_RETRIES, read=0, status=0, other=0, redirect=None)
+    # pool_block caps concurrent connections per host at HTTP_POOL_MAXSIZE
+    # instead of opening (and discarding) extra ones under load.
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(trust_env=True):
+    """Return the shared keep-alive session used for all scraper fetches.
+
+    Sessions are created once per process and shared between threads; the
+    underlying urllib3 connection pools are thread-safe. ``trust_env=False``
+    returns a separate session that ignores environment proxies.
+    """
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(trust_env)
+        if session is None:
+            session = _SESSIONS[trust_env] = _build_session(trust_env)
+        return session
+
+
+def close_sessions():
+    """Close pooled connections; the next fetch opens fresh sessions."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+def _request(url, params=None, headers=None):
+    """GET *url* on the pooled session, retrying once without proxies."""
+    try:
+        return get_session().get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
     except ProxyError:
         logger.warning("Proxy request failed for %s; retrying without environment proxy", url)
-        try:
-            with requests.Session() as session:
-                session.trust_env = False
-                resp = session.get(url, params=params, headers=HEADERS, timeout=10)
-                resp.raise_for_status()
-                return resp.text
-        except Exception:
-            logger.exception("Retry without proxy failed for %s", url)
-            return None
-    except Exception:
+        return get_session(trust_env=False).get(
+            url, params=params, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
+        )
+
+
+def _send(url, params=None, headers=None):
+    return get_transport().request(url, params, lambda: _request(url, params, headers))
+
+
+def _server_or_network_error(exc):
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code >= 500
+    return isinstance(exc, requests.RequestException)
+
+
+def safe_get(url, params=None):
+    """Fetch *url* and return the text body, or ``None`` on failure.
+
+    Responses are served from the on-disk HTTP cache while fresh and
+    revalidated with a conditional GET once stale; if revalidation fails
+    with a network error or a 5xx answer the stale body is served instead
+    (``stale-if-error``). Network requests wait
+    for their domain's turn in the shared :class:`RequestScheduler`, and
+    transient failures are retried (and slow requests hedged) by
+    :data:`scrapers.retry.FETCHER`.
+    """
+    # Recording needs every response in full from the network.
+    cache = get_http_cache() if not get_transport().records else None
+    cache_url = cache.url_for(url, params) if cache else None
+    cached = cache.lookup(cache_url) if cache else None
+    if cached is not None and cache.is_fresh(cached):
+        return cached.body
+
+    try:
+        conditional = cached.conditional_headers() if cached else None
+        resp = FETCHER.fetch(
+            get_scheduler().domain_for(url),
+            lambda: _send(url, params, conditional),
+            acquire=lambda: get_scheduler().acquire(url),
+        )
+        if cached is not None and resp.status_code == 304:
+            cache.revalidated(cache_url, cached, resp.headers)
+            return cached.body
+        resp.raise_for_status()
+    except Exception as exc:
+        if cached is not None and _server_or_network_error(exc):
+            logger.warning("Revalidating %s failed (%s); serving the stale copy", url, exc)
+            return cached.body
         logger.exception("Request failed for %s", url)
         return None
 
+    if cache:
+        try:
+            cache.store(cache_url, resp)
+        except Exception:
+            logger.exception("Failed to cache response for %s", url)
+    return resp.text
 
-def render_page(url, wait_selector=None):
+
+def render_page(url, wait_selector=None, fallback=True):
     """Use Playwright to render *url* and return the HTML content.
 
-    If ``wait_selector`` is provided, the function waits for the selector to
-    appear before returning the page content. If Playwright is unavailable or
-    rendering fails, the function falls back to a static fetch via
-    :func:`safe_get` and returns that HTML instead of ``None``.
+    Pages are rendered on the shared :class:`~scrapers.browser_pool.BrowserPool`
+    so Chromium stays warm between scraper calls. If ``wait_selector`` is
+    provided, the function waits for the selector to appear before returning
+    the page content. If Playwright is unavailable or rendering fails, the
+    function falls back to a static fetch via :func:`safe_get` and returns
+    that HTML instead of ``None``; with ``fallback=False`` it returns
+    ``None`` instead, for callers that plan their own static attempt.
+    Renders are rate limited per domain like static fetches; a render that
+    cannot get a slot in time returns ``None``.
     """
     try:
-        from playwright.sync_api import sync_playwright
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, timeout=15000)
-            if wait_selector:
-                try:
-                    page.wait_for_selector(wait_selector, timeout=5000)
-                except Exception:
-                    logger.warning("Selector %s not found for %s", wait_selector, url)
-            content = page.content()
-            browser.close()
-            return content
+        get_scheduler().acquire(url)
+    except RateLimitTimeout:
+        logger.warning("Rate limit queue timed out for %s", url)
+        return None
+
+    try:
+        return get_transport().render(url, lambda: get_browser_pool().render(url, wait_selector))
     except Exception:
         logger.exception("Playwright failed for %s", url)
+        if not fallback:
+            return None
         logger.info("Falling back to static fetch for %s", url)
         return safe_get(url)
 
 
+def make_soup(html, parse_only=None):
+    """Parse *html* with the configured :data:`HTML_PARSER` backend.
+
+    ``parse_only`` (see :func:`strainer`) restricts the tree to the matching
+    elements and their descendants, so pages can be parsed down to just the
+    product cards or ``<meta>`` tags a scraper reads. Selectors that target
+    elements inside the kept subtrees keep working unchanged.
+    """
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+
+def strainer(names, classes=None):
+    """Return a :class:`SoupStrainer` for tags in *names* with any of *classes*."""
+    if not classes:
+        return SoupStrainer(names)
+
+    wanted = frozenset(classes)
+
+    def has_class(value):
+        if not value:
+            return False
+        values = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(values)
+
+    return SoupStrainer(names, class_=has_class)
+
+
 def parse_price(text):
     """Extract a numeric price from *text*.
 
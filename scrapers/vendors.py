@@ -0,0 +1,391 @@
+"""Declarative scraper engine for catalogue-search vendor sites.
+
+Each vendor is described by a :class:`VendorSpec`; :func:`scrape_vendor`
+fetches its search page and :func:`parse_vendor_items` extracts the product
+cards. Adding a vendor means adding a spec to :data:`VENDORS`.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import quote_plus, urljoin, urlparse
+
+import soupsieve
+from bs4 import Tag
+
+from .fetch_strategy import FETCH_STRATEGY, RENDERED, STATIC, FetchStrategy
+from .parse_pool import run_parser
+from .utils import PRODUCT_ITEM_CLASSES, ScraperUnavailable, make_soup, parse_price, strainer
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/100"
+OUT_OF_STOCK_TEXT = "out of stock"
+
+Fetcher = Callable[..., Optional[str]]
+AsyncFetcher = Callable[..., Awaitable[Optional[str]]]
+QueryMatcher = Callable[[str], Callable[[str], bool]]
+
+
+def normalize_tokens(text: str) -> set[str]:
+    """Tokenize *text* into normalized words for fuzzy matching.
+
+    Tokens shorter than three characters are ignored. For plural words we also
+    add a singular variant to improve matching between query and title.
+    """
+
+    tokens: set[str] = set()
+    for token in re.split(r"\W+", text.lower()):
+        if len(token) < 3:
+            continue
+
+        tokens.add(token)
+
+        if token.endswith("es") and len(token) > 4:
+            tokens.add(token[:-2])
+        elif token.endswith("s") and len(token) > 3:
+            tokens.add(token[:-1])
+
+    return tokens
+
+
+def token_matcher(query: str) -> Callable[[str], bool]:
+    """Return a predicate telling whether a title closely matches *query*.
+
+    At least ~70% of the query tokens (minimum one) must appear in the product
+    title. This keeps results relevant for multi-word searches such as console
+    accessory kits while staying resilient to pluralization differences. The
+    query is tokenized once, not once per product card.
+    """
+
+    tokens = normalize_tokens(query)
+    if not tokens:
+        return lambda _title: True
+
+    # Require longer/more distinctive tokens to be present to avoid loosely
+    # related accessories (e.g., power boards for a power supply search).
+    mandatory_tokens = {token for token in tokens if len(token) >= 6}
+    required_matches = max(1, (len(tokens) * 7 + 9) // 10)  # ceil(0.7 * len)
+
+    def matches(title: str) -> bool:
+        title_tokens = normalize_tokens(title)
+        if mandatory_tokens and not mandatory_tokens.issubset(title_tokens):
+            return False
+
+        hits = sum(1 for token in tokens if token in title_tokens)
+        return hits >= required_matches or hits / len(tokens) >= 0.75
+
+    return matches
+
+
+@dataclass(frozen=True)
+class VendorSpec:
+    """How to search one vendor and read its product cards.
+
+    Selector tuples are tried in order and the first one that matches wins,
+    mirroring ``select_one(a) or select_one(b)``. ``stock_selector`` marks an
+    out-of-stock card; without it the card text is scanned for
+    "out of stock". ``strategy`` is ``"adaptive"`` (learned per domain, see
+    :mod:`scrapers.fetch_strategy`), ``"rendered"``, ``"static"`` or
+    ``"rendered_then_static"`` (static fetch when rendering yields no items).
+    """
+
+    key: str
+    name: str
+    base: str
+    search_path: str
+    wait_selector: str = "li.product-item"
+    item_selectors: tuple[str, ...] = ("li.product-item", "div.product-item")
+    item_classes: tuple[str, ...] = ("product-item",)
+    link_selectors: tuple[str, ...] = ("a.product-item-link", "a")
+    price_selectors: tuple[str, ...] = ("span.price",)
+    image_selectors: tuple[str, ...] = ("img",)
+    stock_selector: str | None = None
+    strategy: str = "adaptive"
+    match_filter: QueryMatcher | None = None
+
+    def search_url(self, query: str) -> str:
+        return f"{self.base}{self.search_path.format(query=quote_plus(query))}"
+
+
+_MAGENTO_ITEMS = ("li.product-item, li.item.product.product-item", "div.product-item, div.item.product")
+_MAGENTO_PRICES = ("span.price", "span[data-price]")
+
+VENDORS: Dict[str, VendorSpec] = {
+    spec.key: spec
+    for spec in (
+        VendorSpec(
+            key="mobilesentrix",
+            name="MobileSentrix",
+            base="https://www.mobilesentrix.com",
+            search_path="/catalogsearch/result/?q={query}",
+            item_selectors=_MAGENTO_ITEMS,
+            item_classes=PRODUCT_ITEM_CLASSES,
+            price_selectors=_MAGENTO_PRICES,
+        ),
+        VendorSpec(
+            key="fixez",
+            name="Fixez",
+            base="https://www.fixez.com",
+            search_path="/catalogsearch/result/?q={query}",
+            item_selectors=_MAGENTO_ITEMS,
+            item_classes=PRODUCT_ITEM_CLASSES,
+            price_selectors=_MAGENTO_PRICES,
+            match_filter=token_matcher,
+        ),
+        VendorSpec(
+            key="laptopscreen",
+            name="Laptopscreen",
+            base="https://www.laptopscreen.com",
+            search_path="/search?q={query}",
+        ),
+        VendorSpec(
+            key="mengtor",
+            name="Mengtor",
+            base="https://www.mengtor.com",
+            search_path="/search?q={query}",
+        ),
+    )
+}
+
+_TAG_NAME = re.compile(r"^[a-zA-Z][\w-]*")
+
+
+class _Selector:
+    """A selector compiled once, with the tag names it can possibly match.
+
+    Checking ``tag.name`` first skips the soupsieve match for most elements
+    during the single per-card walk.
+    """
+
+    __slots__ = ("pattern", "names")
+
+    def __init__(self, css: str):
+        self.pattern = soupsieve.compile(css)
+        names = set()
+        for part in css.split(","):
+            part = part.strip()
+            match = _TAG_NAME.match(part)
+            if not match or re.search(r"[\s>+~]", part):
+                names = None
+                break
+            names.add(match.group(0).lower())
+        self.names = frozenset(names) if names is not None else None
+
+    def matches(self, tag: Tag) -> bool:
+        return (self.names is None or tag.name in self.names) and self.pattern.match(tag)
+
+
+class _CompiledSpec:
+    __slots__ = ("items", "fields", "stock", "strainer")
+
+    def __init__(self, spec: VendorSpec):
+        self.items = [_Selector(css) for css in spec.item_selectors]
+        self.fields = {
+            "link": [_Selector(css) for css in spec.link_selectors],
+            "price": [_Selector(css) for css in spec.price_selectors],
+            "image": [_Selector(css) for css in spec.image_selectors],
+        }
+        self.stock = _Selector(spec.stock_selector) if spec.stock_selector else None
+        self.strainer = strainer(["li", "div"], spec.item_classes)
+
+
+@lru_cache(maxsize=None)
+def _compiled(key: str) -> _CompiledSpec:
+    return _CompiledSpec(VENDORS[key])
+
+
+def _extract(item: Tag, compiled: _CompiledSpec) -> tuple[Dict[str, Tag], bool]:
+    """Walk *item* once, returning the best tag per field and the stock flag."""
+
+    found: Dict[str, Tag] = {}
+    ranks: Dict[str, int] = {}
+    out_of_stock = False
+    for node in item.descendants:
+        if not isinstance(node, Tag):
+            if compiled.stock is None and not out_of_stock and OUT_OF_STOCK_TEXT in node.lower():
+                out_of_stock = True
+            continue
+
+        for field, selectors in compiled.fields.items():
+            best = ranks.get(field, len(selectors))
+            for rank in range(best):
+                if selectors[rank].matches(node):
+                    found[field] = node
+                    ranks[field] = rank
+                    break
+        if compiled.stock is not None and not out_of_stock and compiled.stock.matches(node):
+            out_of_stock = True
+
+    return found, not out_of_stock
+
+
+def parse_vendor_items(html: str, key: str, query: str) -> List[Dict[str, object]]:
+    """Return the product cards in a search page of vendor *key*."""
+
+    return parse_vendor_page(html, key, query)[1]
+
+
+def parse_vendor_page(html: str, key: str, query: str) -> tuple[int, List[Dict[str, object]]]:
+    """Return the number of product cards on the page and the matching offers.
+
+    The card count tells a page that lists products (even if none match the
+    title filter) from one that did not render its catalogue.
+    """
+
+    spec = VENDORS[key]
+    compiled = _compiled(key)
+    soup = make_soup(html, compiled.strainer)
+    tags = [node for node in soup.descendants if isinstance(node, Tag)]
+    items: List[Tag] = []
+    for selector in compiled.items:
+        items = [tag for tag in tags if selector.matches(tag)]
+        if items:
+            break
+    if not items:
+        return 0, []
+
+    matches = spec.match_filter(query) if spec.match_filter else None
+    results = []
+    for item in items:
+        found, in_stock = _extract(item, compiled)
+        link_tag = found.get("link")
+        if link_tag is None:
+            logger.warning("%s: missing link tag, skipping item", spec.name)
+            continue
+
+        title = link_tag.get_text(strip=True) or query
+        if matches is not None and not matches(title):
+            continue
+
+        price_tag = found.get("price")
+        raw_price = price_tag.get_text() if price_tag is not None else None
+        image_tag = found.get("image")
+        results.append(
+            {
+                "title": title,
+                "price": parse_price(raw_price) if raw_price else 0.0,
+                "in_stock": in_stock,
+                "source": spec.name,
+                "link": urljoin(spec.base, link_tag.get("href", "")),
+                "image": (
+                    urljoin(spec.base, image_tag["src"])
+                    if image_tag is not None and image_tag.has_attr("src")
+                    else PLACEHOLDER_IMAGE
+                ),
+            }
+        )
+
+    return len(items), results
+
+
+def scrape_vendor(
+    spec: VendorSpec,
+    query: str,
+    render: Fetcher | None = None,
+    fetch: Fetcher | None = None,
+    strategy: FetchStrategy | None = None,
+) -> List[Dict[str, object]]:
+    """Search *spec*'s site for *query* following its fetch strategy.
+
+    ``render`` and ``fetch`` default to :func:`scrapers.utils.render_page`
+    (without its static fallback, which the plan provides) and
+    :func:`scrapers.utils.safe_get`; ``strategy`` orders the attempts and
+    records their outcome (default :data:`FETCH_STRATEGY`). Raises
+    :class:`ScraperUnavailable` when no attempt returned a page.
+    """
+
+    from . import utils
+
+    render = render or partial(utils.render_page, fallback=False)
+    fetch = fetch or utils.safe_get
+    strategy = strategy or FETCH_STRATEGY
+    url = spec.search_url(query)
+    domain = urlparse(spec.base).hostname or spec.key
+
+    plan = strategy.plan(domain, spec.strategy)
+    fetched = False
+    for index, path in enumerate(plan):
+        started = time.perf_counter()
+        html = fetch(url) if path == STATIC else render(url, spec.wait_selector)
+        fetched = fetched or bool(html)
+        cards, parsed = run_parser(parse_vendor_page, html, spec.key, query) if html else (0, [])
+        strategy.record(
+            domain,
+            path,
+            cards > 0,
+            time.perf_counter() - started,
+            fallback=path == RENDERED and index > 0,
+        )
+        if cards:
+            return parsed
+        if index + 1 < len(plan):
+            logger.info("%s: %s fetch found no items for %s; trying %s", spec.name, path, query, plan[index + 1])
+
+    if not fetched:
+        raise ScraperUnavailable(f"{spec.name}: no page could be fetched for {query!r}")
+    logger.warning("%s: no product items found for %s", spec.name, query)
+    return []
+
+
+async def scrape_vendor_async(
+    spec: VendorSpec,
+    query: str,
+    render: AsyncFetcher | None = None,
+    fetch: AsyncFetcher | None = None,
+    strategy: FetchStrategy | None = None,
+) -> List[Dict[str, object]]:
+    """Coroutine version of :func:`scrape_vendor` for the async engine.
+
+    ``render`` and ``fetch`` default to :func:`scrapers.aio.render` (without
+    its static fallback) and :func:`scrapers.aio.fetch_text`.
+    """
+
+    from . import aio
+
+    render = render or partial(aio.render, fallback=False)
+    fetch = fetch or aio.fetch_text
+    strategy = strategy or FETCH_STRATEGY
+    url = spec.search_url(query)
+    domain = urlparse(spec.base).hostname or spec.key
+
+    plan = strategy.plan(domain, spec.strategy)
+    fetched = False
+    for index, path in enumerate(plan):
+        started = time.perf_counter()
+        html = await (fetch(url) if path == STATIC else render(url, spec.wait_selector))
+        fetched = fetched or bool(html)
+        cards, parsed = await aio.parse(parse_vendor_page, html, spec.key, query) if html else (0, [])
+        strategy.record(
+            domain,
+            path,
+            cards > 0,
+            time.perf_counter() - started,
+            fallback=path == RENDERED and index > 0,
+        )
+        if cards:
+            return parsed
+        if index + 1 < len(plan):
+            logger.info("%s: %s fetch found no items for %s; trying %s", spec.name, path, query, plan[index + 1])
+
+    if not fetched:
+        raise ScraperUnavailable(f"{spec.name}: no page could be fetched for {query!r}")
+    logger.warning("%s: no product items found for %s", spec.name, query)
+    return []
+
+
+def vendor_scraper(key: str) -> Callable[[str], List[Dict[str, object]]]:
+    """Return a ``scraper(query)`` callable for vendor *key*."""
+
+    spec = VENDORS[key]
+
+    def scrape(query: str) -> List[Dict[str, object]]:
+        return scrape_vendor(spec, query)
+
+    scrape.__name__ = f"scrape_{key}"
+    return scrape
@@ -2,20 +2,37 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import logging
+import os
 import re
-from typing import Dict, Iterable, List
-from urllib.parse import parse_qs, unquote, urlparse
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 
-from scrapers.utils import parse_price, safe_get
+from scrapers import aio
+from scrapers.canonical import dedupe_key, unwrap_redirect
+from scrapers.parse_pool import run_parser
+from scrapers.preview_cache import PREVIEW_CACHE
+from scrapers.utils import ScraperUnavailable, make_soup, parse_price, safe_get, strainer
 
 logger = logging.getLogger(__name__)
 
 SEARCH_URL = "https://duckduckgo.com/html/"
 MAX_RESULTS = 10
 MAX_PREVIEW_FETCHES = 5
+# Preview pages are fetched concurrently on a shared pool, at most
+# PREVIEW_PER_DOMAIN_LIMIT at a time per domain. Previews still running when
+# the time budget runs out are skipped.
+PREVIEW_WORKERS = int(os.environ.get("PREVIEW_WORKERS", 8))
+PREVIEW_PER_DOMAIN_LIMIT = int(os.environ.get("PREVIEW_PER_DOMAIN_LIMIT", 2))
+PREVIEW_TIME_BUDGET_SECONDS = float(os.environ.get("PREVIEW_TIME_BUDGET_SECONDS", 8))
 PRIORITY_PREVIEW_DOMAINS = (
     "amazon.com",
     "www.amazon.com",
@@ -34,6 +51,8 @@ PRIORITY_PREVIEW_DOMAINS = (
     "www.gamersrepair.com",
     "mobilesentrix.com",
 )
+RESULT_BLOCKS = strainer("div", ["result"])
+HEAD_TAGS = strainer(["meta", "link"])
 
 
 def _domain_for(url: str) -> str:
@@ -44,30 +63,35 @@ def _domain_for(url: str) -> str:
         return "Web"
 
 
-def _resolve_link(href: str) -> str:
-    """Return the destination URL for DuckDuckGo redirect links."""
+class _PreviewDocument:
+    """Product page parsed only as far as the preview selectors need.
 
-    if not href:
-        return ""
+    ``<meta>``/``<link>`` selectors (Open Graph images, microdata prices) are
+    answered from a tree holding just those tags; the full page is parsed
+    only when a body selector or the text fallback is needed.
+    """
 
-    try:
-        parsed = urlparse(href)
-    except Exception:  # pragma: no cover - defensive
-        return href
+    def __init__(self, html: str):
+        self._html = html
+        self._head = make_soup(html, HEAD_TAGS)
+        self._full: BeautifulSoup | None = None
 
-    # DuckDuckGo wraps outbound links with /l/?uddg=<encoded>
-    if parsed.netloc.endswith("duckduckgo.com") and parsed.path.startswith("/l/"):
-        try:
-            params = parse_qs(parsed.query)
-            target = params.get("uddg", [href])[0]
-            return unquote(target)
-        except Exception:  # pragma: no cover - defensive
-            return href
+    @property
+    def full(self) -> BeautifulSoup:
+        if self._full is None:
+            self._full = make_soup(self._html)
+        return self._full
 
-    return href
+    def select_one(self, selector: str):
+        if selector.startswith(("meta", "link")):
+            return self._head.select_one(selector)
+        return self.full.select_one(selector)
 
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        return self.full.get_text(separator, strip=strip)
 
-def _extract_price_text(soup: BeautifulSoup, domain: str) -> str | None:
+
+def _extract_price_text(soup: BeautifulSoup | _PreviewDocument, domain: str) -> str | None:
     """Return a price string for the given ``domain`` if present."""
 
     domain = domain.lower()
@@ -149,13 +173,27 @@ def _extract_price_text(soup: BeautifulSoup, domain: str) -> str | None:
 
 
 def _preview_details_for(url: str) -> Dict[str, object]:
-    """Fetch lightweight preview details such as image and price for ``url``."""
+    """Fetch lightweight preview details such as image and price for ``url``.
+
+    Details are served from :data:`PREVIEW_CACHE` when the same product page
+    was previewed recently.
+    """
+
+    cached = PREVIEW_CACHE.get(url)
+    if cached is not None:
+        return cached
 
     html = safe_get(url)
     if not html:
         return {}
 
-    soup = BeautifulSoup(html, "html.parser")
+    details = run_parser(_parse_preview, html, url)
+    PREVIEW_CACHE.set(url, details)
+    return details
+
+
+def _parse_preview(html: str, url: str) -> Dict[str, object]:
+    soup = _PreviewDocument(html)
     details: Dict[str, object] = {}
 
     image_selectors = [
@@ -191,6 +229,152 @@ def _preview_details_for(url: str) -> Dict[str, object]:
     return details
 
 
+_PREVIEW_EXECUTOR: ThreadPoolExecutor | None = None
+_PREVIEW_LOCK = threading.Lock()
+
+
+def _preview_executor() -> ThreadPoolExecutor:
+    global _PREVIEW_EXECUTOR
+    with _PREVIEW_LOCK:
+        if _PREVIEW_EXECUTOR is None:
+            _PREVIEW_EXECUTOR = ThreadPoolExecutor(
+                max_workers=PREVIEW_WORKERS, thread_name_prefix="websearch-preview"
+            )
+        return _PREVIEW_EXECUTOR
+
+
+_PreviewJob = Tuple[Future, str, float, contextvars.Context]
+
+
+class _PreviewDispatcher:
+    """Hand preview fetches to the shared pool, at most ``limit`` per domain.
+
+    Links beyond a domain's limit wait in a per-domain queue, not in a pool
+    thread, so a domain with many links never holds more than ``limit``
+    workers and other domains' previews (from any search) are not stuck
+    behind it. Each finished fetch submits the next queued link for its
+    domain.
+    """
+
+    def __init__(self, limit: int = PREVIEW_PER_DOMAIN_LIMIT):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._queued: Dict[str, Deque[_PreviewJob]] = {}
+
+    def submit(self, url: str, domain: str, deadline: float) -> Future:
+        future: Future = Future()
+        job = (future, url, deadline, contextvars.copy_context())
+        with self._lock:
+            start = self._active.get(domain, 0) < self.limit
+            if start:
+                self._active[domain] = self._active.get(domain, 0) + 1
+            else:
+                self._queued.setdefault(domain, deque()).append(job)
+        if start:
+            self._start(domain, job)
+        return future
+
+    def _start(self, domain: str, job: _PreviewJob) -> None:
+        try:
+            _preview_executor().submit(self._run, domain, job)
+        except RuntimeError:  # pragma: no cover - pool shut down at exit
+            job[0].cancel()
+            self._finished(domain)
+
+    def _run(self, domain: str, job: _PreviewJob) -> None:
+        future, url, deadline, context = job
+        try:
+            # Jobs cancelled by an expired budget are dropped here.
+            if future.set_running_or_notify_cancel():
+                try:
+                    details = {} if time.monotonic() >= deadline else context.run(_preview_details_for, url)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(details)
+        finally:
+            self._finished(domain)
+
+    def _finished(self, domain: str) -> None:
+        with self._lock:
+            queue = self._queued.get(domain)
+            job = queue.popleft() if queue else None
+            if queue is not None and not queue:
+                del self._queued[domain]
+            if job is None:
+                self._active[domain] -= 1
+                if not self._active[domain]:
+                    del self._active[domain]
+        if job is not None:
+            self._start(domain, job)
+
+
+_PREVIEW_DISPATCHER = _PreviewDispatcher()
+
+
+def _fetch_previews(links: Dict[int, str]) -> Dict[int, Dict[str, object]]:
+    """Fetch previews for ``{result index: url}`` concurrently within budget."""
+
+    deadline = time.monotonic() + PREVIEW_TIME_BUDGET_SECONDS
+    futures = {
+        _PREVIEW_DISPATCHER.submit(url, _domain_for(url).lower(), deadline): index for index, url in links.items()
+    }
+
+    previews: Dict[int, Dict[str, object]] = {}
+    pending = set(futures)
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                previews[futures[future]] = future.result()
+            except Exception:  # pragma: no cover - defensive logging
+                logger.exception("Preview fetch failed")
+
+    for future in pending:
+        future.cancel()
+    if pending:
+        logger.info("Skipped %d previews after %ss budget", len(pending), PREVIEW_TIME_BUDGET_SECONDS)
+
+    return previews
+
+
+async def _preview_details_async(url: str) -> Dict[str, object]:
+    cached = PREVIEW_CACHE.get(url)
+    if cached is not None:
+        return cached
+
+    html = await aio.fetch_text(url)
+    if not html:
+        return {}
+
+    details = await aio.parse(_parse_preview, html, url)
+    PREVIEW_CACHE.set(url, details)
+    return details
+
+
+async def _fetch_previews_async(links: Dict[int, str]) -> Dict[int, Dict[str, object]]:
+    """Coroutine version of :func:`_fetch_previews` (per-domain limits come from :mod:`scrapers.aio`)."""
+
+    tasks = {asyncio.ensure_future(_preview_details_async(url)): index for index, url in links.items()}
+    done, pending = await asyncio.wait(tasks, timeout=PREVIEW_TIME_BUDGET_SECONDS)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.info("Skipped %d previews after %ss budget", len(pending), PREVIEW_TIME_BUDGET_SECONDS)
+
+    previews: Dict[int, Dict[str, object]] = {}
+    for task in done:
+        if task.exception() is not None:
+            logger.error("Preview fetch failed", exc_info=task.exception())
+            continue
+        previews[tasks[task]] = task.result()
+    return previews
+
+
 def _preview_image_for(url: str) -> str | None:
     """Return only the preview image URL for ``url`` for backward-compatibility."""
 
@@ -212,7 +396,7 @@ def _is_repair_guide(title: str, snippet: str | None) -> bool:
 
 
 def _parse_results(html: str, query: str) -> List[Dict[str, object]]:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, RESULT_BLOCKS)
     results: List[Dict[str, object]] = []
     allow_guides = "guide" in query.lower()
 
@@ -221,7 +405,7 @@ def _parse_results(html: str, query: str) -> List[Dict[str, object]]:
         if not link_el:
             continue
 
-        href = _resolve_link(link_el.get("href"))
+        href = unwrap_redirect(link_el.get("href") or "")
         source = _domain_for(href)
         if not href or source.endswith("duckduckgo.com"):
             continue
@@ -266,20 +450,58 @@ def scrape_websearch(query: str) -> Iterable[Dict[str, object]]:
 
     html = safe_get(SEARCH_URL, params={"q": query, "kl": "us-en"})
     if not html:
-        logger.warning("Web search did not return HTML for query '%s'", query)
+        raise ScraperUnavailable(f"Web search did not return HTML for query '{query}'")
+
+    results = run_parser(_parse_results, html, query)
+    links = _preview_links(results)
+    previews = _fetch_previews(links) if links else {}
+    return _apply_previews(results, previews)
+
+
+async def scrape_websearch_async(query: str) -> List[Dict[str, object]]:
+    """Coroutine version of :func:`scrape_websearch`; previews are coroutines too."""
+
+    if not query.strip():
         return []
 
-    results = _parse_results(html, query)
+    html = await aio.fetch_text(SEARCH_URL, params={"q": query, "kl": "us-en"})
+    if not html:
+        raise ScraperUnavailable(f"Web search did not return HTML for query '{query}'")
+
+    results = await aio.parse(_parse_results, html, query)
+    links = _preview_links(results)
+    previews = await _fetch_previews_async(links) if links else {}
+    return _apply_previews(results, previews)
+
 
+def _preview_links(results: List[Dict[str, object]]) -> Dict[int, str]:
+    """Pick the results worth a preview fetch, as ``{result index: url}``.
+
+    Later listings of an already chosen product are skipped; search
+    deduplication keeps the first one.
+    """
+
+    links: Dict[int, str] = {}
+    chosen = set()
     for index, item in enumerate(results):
         domain = item.get("source", "").lower()
         should_preview = index < MAX_PREVIEW_FETCHES or any(
             domain.endswith(prioritized) for prioritized in PRIORITY_PREVIEW_DOMAINS
         )
-        if not should_preview:
-            continue
+        key = dedupe_key(item["link"])
+        if should_preview and key not in chosen:
+            chosen.add(key)
+            links[index] = item["link"]
+    return links
 
-        preview = _preview_details_for(item["link"])
+
+def _apply_previews(
+    results: List[Dict[str, object]], previews: Dict[int, Dict[str, object]]
+) -> List[Dict[str, object]]:
+    for index, item in enumerate(results):
+        preview = previews.get(index)
+        if not preview:
+            continue
 
         if preview.get("image") and not item.get("image"):
             item["image"] = preview["image"]
@@ -2,21 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
 import logging
+import os
+import queue
 import re
-from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
 from difflib import SequenceMatcher
-from typing import Callable, Dict, Iterable, List
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List
 
 from openai_search import rewrite_query_with_vendors, search_openai, summarize_offers_with_openai
-from scrapers.fixez import scrape_fixez
-from scrapers.google_search import scrape_google_search
-from scrapers.mobilesentrix import scrape_mobilesentrix
-from scrapers.websearch import scrape_websearch
+from scraper_health import ScraperHealth
+from scrapers import aio
+from scrapers.fixez import scrape_fixez, scrape_fixez_async
+from scrapers.google_search import scrape_google_search, scrape_google_search_async
+from scrapers.mobilesentrix import scrape_mobilesentrix, scrape_mobilesentrix_async
+from scrapers.scheduler import submit_in_context
+from scrapers.utils import ScraperUnavailable
+from scrapers.websearch import scrape_websearch, scrape_websearch_async
+from search_cache import SearchCache
+from metrics import counter, histogram
+from offers import DedupeIndex, Offer
+from singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 Scraper = Callable[[str], Iterable[Dict[str, object]]]
+AsyncScraper = Callable[[str], Awaitable[Iterable[Dict[str, object]]]]
+ScraperCall = tuple[str, Scraper, str]
 
 PRIORITY_VENDORS = ("mobilesentrix", "fixez", "amazon", "ebay")
 CLEANING_KEYWORDS = {
@@ -63,6 +81,9 @@ REPAIR_KEYWORDS = {
     "logic",
 }
 MIN_WORDING_MATCH = 0.80
+# Normalized titles kept by _normalized_title; vendors repeat titles across
+# variants and searches.
+TITLE_CACHE_SIZE = int(os.environ.get("TITLE_CACHE_SIZE", 4096))
 
 
 SCRAPER_SOURCES: List[tuple[str, Scraper]] = [
@@ -72,78 +93,428 @@ SCRAPER_SOURCES: List[tuple[str, Scraper]] = [
     ("Web", scrape_websearch),
 ]
 
-MAX_SCRAPER_WORKERS = 4
-SCRAPER_TIMEOUT_SECONDS = 25
+# Coroutine versions of the scrapers above, used by the async engine.
+# Scrapers without one run on the scrapers.aio thread pool instead.
+ASYNC_SCRAPERS: Dict[Scraper, AsyncScraper] = {
+    scrape_mobilesentrix: scrape_mobilesentrix_async,
+    scrape_fixez: scrape_fixez_async,
+    scrape_google_search: scrape_google_search_async,
+    scrape_websearch: scrape_websearch_async,
+}
+
+# Which query variants each scraper receives: "primary" (the clean rewritten
+# query), "boosted" (vendor-augmented variants) or "all". Site scrapers only
+# search their own catalogue, so vendor names in the query just add noise;
+# web scrapers get the boosted variants, minus those naming a vendor that a
+# site scraper already covers. Scrapers missing from the table get "all".
+# Overridable with a JSON object in the SCRAPER_ROUTES environment variable.
+SCRAPER_ROUTES: Dict[str, str] = {
+    "MobileSentrix": "primary",
+    "Fixez": "primary",
+    "Google": "boosted",
+    "Web": "boosted",
+    **json.loads(os.environ.get("SCRAPER_ROUTES") or "{}"),
+}
 
+MAX_SCRAPER_WORKERS = 4
+# Upper bound for a scraper call; each scraper's actual timeout is derived
+# from its recent latency by SCRAPER_HEALTH.
+SCRAPER_TIMEOUT_SECONDS = float(os.environ.get("SCRAPER_TIMEOUT_MAX_SECONDS", 25))
+
+# "shared" submits every (variant, scraper) pair to one long-lived pool under
+# a single request deadline; "per-variant" runs variants one after another,
+# each with its own short-lived pool and SCRAPER_TIMEOUT_SECONDS budget;
+# "async" runs search_products_async on the scrapers.aio event loop, with
+# every scraper call and preview fetch as a coroutine.
+SEARCH_ENGINE_MODE = os.environ.get("SEARCH_ENGINE_MODE", "shared")
+SEARCH_WORKER_POOL_SIZE = int(os.environ.get("SEARCH_WORKER_POOL_SIZE", 8))
+SEARCH_DEADLINE_SECONDS = float(os.environ.get("SEARCH_DEADLINE_SECONDS", 30))
+
+SEARCH_COALESCE_TIMEOUT_SECONDS = 150
+
+SEARCH_CACHE = SearchCache(decode=Offer.from_mapping)
+SEARCH_FLIGHTS = SingleFlight()
+SCRAPER_FLIGHTS = SingleFlight()
+SCRAPER_HEALTH = ScraperHealth(max_seconds=SCRAPER_TIMEOUT_SECONDS)
+
+SEARCH_SECONDS = histogram("pricescout_search_duration_seconds", "search_products latency, cache hits included.")
+SEARCH_STAGE_SECONDS = histogram(
+    "pricescout_search_stage_seconds", "Time spent in each search pipeline stage.", ("stage",)
+)
+SCRAPER_SECONDS = histogram(
+    "pricescout_scraper_duration_seconds", "Scraper call latency by outcome.", ("scraper", "outcome")
+)
+VARIANT_SECONDS = histogram(
+    "pricescout_variant_duration_seconds",
+    "Time until every scraper call for a query variant finished or was abandoned.",
+    ("variant",),
+)
+SCRAPER_ITEMS = counter("pricescout_scraper_items", "Offers returned by each scraper.", ("scraper",))
+SCRAPER_SKIPS = counter("pricescout_scraper_skips", "Scraper calls skipped by an open circuit breaker.", ("scraper",))
+DUPLICATE_OFFERS = counter("pricescout_duplicate_offers", "Offers merged into an earlier listing of the same product.")
+
+
+def _call_scraper(name: str, scraper: Scraper, query: str) -> List[Offer]:
+    if not SCRAPER_HEALTH.allow(name):
+        SCRAPER_SKIPS.inc(scraper=name)
+        logger.info("Skipping %s for '%s': circuit breaker is %s", name, query, SCRAPER_HEALTH.state_of(name))
+        return []
 
-def _call_scraper(name: str, scraper: Scraper, query: str) -> List[Dict[str, object]]:
+    # Concurrent searches asking the same scraper for the same variant share
+    # one outbound request, but each gets its own offers to score.
+    key = (name, _cache_key(query))
     try:
-        return list(scraper(query))
+        items = SCRAPER_FLIGHTS.do(
+            key,
+            lambda: _timed_scrape(name, scraper, query),
+            timeout=SCRAPER_HEALTH.timeout_for(name),
+        )
+        return [Offer.from_mapping(item, vendor=name) for item in items]
+    except TimeoutError:
+        logger.warning("Timed out waiting for in-flight %s scrape of '%s'", name, query)
+        return []
+    except ScraperUnavailable as exc:
+        logger.warning("%s unavailable: %s", name, exc)
+        return []
     except Exception:  # pragma: no cover - defensive logging
         logger.exception("Error scraping %s", name)
         return []
 
 
-def _run_scrapers(query: str) -> List[Dict[str, object]]:
-    results: List[Dict[str, object]] = []
-    max_workers = min(MAX_SCRAPER_WORKERS, len(SCRAPER_SOURCES))
+def _timed_scrape(name: str, scraper: Scraper, query: str) -> List[Dict[str, object]]:
+    started = time.monotonic()
+    try:
+        results = list(scraper(query))
+    except Exception:
+        _observe_scrape(name, started, None)
+        raise
+    _observe_scrape(name, started, results)
+    return results
+
+
+def _observe_scrape(name: str, started: float, results: List[Dict[str, object]] | None) -> None:
+    elapsed = time.monotonic() - started
+    ok = results is not None
+    SCRAPER_HEALTH.record(name, elapsed, ok=ok)
+    SCRAPER_SECONDS.observe(elapsed, scraper=name, outcome="ok" if ok else "error")
+    if ok:
+        SCRAPER_ITEMS.inc(len(results), scraper=name)
+
+
+def _completed_by_deadline(futures: Dict[Future, tuple[str, str, float]]) -> Iterator[Future]:
+    """Yield futures as they finish, abandoning each at its own deadline.
+
+    *futures* maps each future to ``(scraper, variant, deadline)``.
+    Futures finishing together are yielded in submission order. Abandoned
+    futures are cancelled if they have not started yet.
+    """
+
+    order = {future: position for position, future in enumerate(futures)}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            expired = {future for future in pending if futures[future][2] <= now and not future.done()}
+            for future in expired:
+                name, variant, _deadline = futures[future]
+                future.cancel()
+                logger.warning("Abandoned scraper %s for '%s' after its timeout", name, variant)
+            pending -= expired
+            if not pending:
+                break
+
+            next_deadline = min(futures[future][2] for future in pending)
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+            yield from sorted(done, key=order.__getitem__)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _run_scrapers(query: str, sources: List[tuple[str, Scraper]] | None = None) -> List[Offer]:
+    sources = SCRAPER_SOURCES if sources is None else sources
+    results: List[Offer] = []
+    if not sources:
+        return results
+
+    max_workers = min(MAX_SCRAPER_WORKERS, len(sources))
+    started = time.monotonic()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(_call_scraper, name, scraper, query): name
-            for name, scraper in SCRAPER_SOURCES
+            submit_in_context(executor, _call_scraper, name, scraper, query): (
+                name,
+                query,
+                started + min(SCRAPER_TIMEOUT_SECONDS, SCRAPER_HEALTH.timeout_for(name)),
+            )
+            for name, scraper in sources
         }
 
-        try:
-            for future in as_completed(futures, timeout=SCRAPER_TIMEOUT_SECONDS):
-                name = futures[future]
-                scraper_results = future.result()
-                logger.info("%s returned %d items", name, len(scraper_results))
-                results.extend(scraper_results)
-        except TimeoutError:
-            logger.warning("Timed out waiting for scrapers after %ss", SCRAPER_TIMEOUT_SECONDS)
-        finally:
-            for future, name in futures.items():
-                if not future.done():
-                    future.cancel()
-                    logger.warning("Cancelled scraper %s after timeout", name)
+        for future in _completed_by_deadline(futures):
+            name = futures[future][0]
+            scraper_results = future.result()
+            logger.info("%s returned %d items", name, len(scraper_results))
+            results.extend(scraper_results)
 
     return results
 
 
-def _deduplicate_results(results: List[Dict[str, object]]) -> List[Dict[str, object]]:
-    seen_links = set()
-    deduped: List[Dict[str, object]] = []
+_SHARED_EXECUTOR: ThreadPoolExecutor | None = None
+_SHARED_EXECUTOR_LOCK = threading.Lock()
 
-    for item in results:
-        link = str(item.get("link", "")).strip()
-        title = str(item.get("title", "")).strip()
 
-        normalized = link.rstrip("/").lower() if link else ""
-        key = normalized or title.lower()
+def _shared_executor() -> ThreadPoolExecutor:
+    global _SHARED_EXECUTOR
+    with _SHARED_EXECUTOR_LOCK:
+        if _SHARED_EXECUTOR is None:
+            _SHARED_EXECUTOR = ThreadPoolExecutor(
+                max_workers=SEARCH_WORKER_POOL_SIZE, thread_name_prefix="search-worker"
+            )
+        return _SHARED_EXECUTOR
 
-        if not key or key in seen_links:
-            continue
 
-        seen_links.add(key)
-        deduped.append(item)
+def _route_queries(primary: str, boosted: List[str]) -> List[ScraperCall]:
+    """Pair each scraper with the query variants it should receive.
+
+    See ``SCRAPER_ROUTES`` for the routing rules. Calls are ordered by
+    variant (primary first), then by ``SCRAPER_SOURCES`` order.
+    """
+
+    covered_vendors = [
+        name.lower() for name, _scraper in SCRAPER_SOURCES if SCRAPER_ROUTES.get(name) == "primary"
+    ]
+    web_variants = [
+        variant
+        for variant in boosted
+        if not any(vendor in variant.lower() for vendor in covered_vendors)
+    ]
+
+    routed: Dict[str, List[str]] = {}
+    for name, _scraper in SCRAPER_SOURCES:
+        route = SCRAPER_ROUTES.get(name, "all")
+        if route == "primary":
+            variants = [primary]
+        elif route == "boosted":
+            variants = web_variants or [primary]
+        else:
+            variants = [primary, *boosted]
+        routed[name] = list(dict.fromkeys(variants))
+
+    ordered_variants = list(dict.fromkeys([primary, *boosted]))
+    return [
+        (name, scraper, variant)
+        for variant in ordered_variants
+        for name, scraper in SCRAPER_SOURCES
+        if variant in routed[name]
+    ]
+
+
+def _scraper_calls(query: str) -> List[ScraperCall]:
+    with SEARCH_STAGE_SECONDS.time(stage="rewrite"):
+        rewritten = rewrite_query_with_vendors(query)
+    primary = rewritten.get("primary", query)
+    return _route_queries(primary, list(rewritten.get("boosted", [])))
+
+
+def _iter_scraper_results(
+    calls: List[ScraperCall],
+) -> Iterator[tuple[int, str, str, List[Offer]]]:
+    """Yield ``(index, scraper, variant, items)`` as scraper calls finish.
+
+    Every routed call is submitted to the shared pool; ``index`` is the
+    call's position in *calls*. Each call is abandoned after its scraper's
+    latency-derived timeout (see :class:`scraper_health.ScraperHealth`) and
+    iteration stops at ``SEARCH_DEADLINE_SECONDS``; abandoned work is
+    cancelled if it has not started yet.
+    """
 
-    return deduped
+    started = time.monotonic()
+    deadline = started + SEARCH_DEADLINE_SECONDS
+    executor = _shared_executor()
+    variants = _VariantTimer(calls, started)
+    indexes: Dict[Future, int] = {}
+    futures: Dict[Future, tuple[str, str, float]] = {}
+    for index, (name, scraper, variant) in enumerate(calls):
+        future = submit_in_context(executor, _call_scraper, name, scraper, variant)
+        indexes[future] = index
+        futures[future] = (name, variant, min(deadline, started + SCRAPER_HEALTH.timeout_for(name)))
+
+    finished = 0
+    for future in _completed_by_deadline(futures):
+        name, variant, _deadline = futures[future]
+        items = future.result()
+        finished += 1
+        variants.finished(variant)
+        logger.info("%s returned %d items for '%s'", name, len(items), variant)
+        yield indexes[future], name, variant, items
+
+    variants.close()
+    if finished < len(futures):
+        logger.warning("Search finished with %d of %d scraper calls completed", finished, len(futures))
+
+
+class _VariantTimer:
+    """Observe VARIANT_SECONDS once every call for a variant kind is done."""
+
+    def __init__(self, calls: List[ScraperCall], started: float):
+        self.started = started
+        self.primary = calls[0][2] if calls else ""
+        self.outstanding: Dict[str, int] = {}
+        for _name, _scraper, variant in calls:
+            kind = _variant_kind(variant, self.primary)
+            self.outstanding[kind] = self.outstanding.get(kind, 0) + 1
+
+    def finished(self, variant: str) -> None:
+        kind = _variant_kind(variant, self.primary)
+        self.outstanding[kind] -= 1
+        if not self.outstanding[kind]:
+            VARIANT_SECONDS.observe(time.monotonic() - self.started, variant=kind)
+
+    def close(self) -> None:
+        # Variants with abandoned calls end at the search deadline.
+        for kind, remaining in self.outstanding.items():
+            if remaining:
+                VARIANT_SECONDS.observe(time.monotonic() - self.started, variant=kind)
+
+
+def _variant_kind(variant: str, primary: str) -> str:
+    # Variants are free text; label metrics by kind to bound cardinality.
+    return "primary" if variant == primary else "boosted"
+
+
+def _run_all_scrapers(calls: List[ScraperCall]) -> List[Offer]:
+    """Run every routed scraper call on the shared pool under one deadline."""
+
+    completed: Dict[int, List[Offer]] = {}
+    for index, name, variant, items in _iter_scraper_results(calls):
+        completed[index] = items
+        _report_progress(name, variant, items)
+    return _in_call_order(completed)
+
+
+def _in_call_order(completed: Dict[int, List[Offer]]) -> List[Offer]:
+    # Flatten in submission order so deduplication keeps the same entries no
+    # matter which vendor answered first.
+    results: List[Offer] = []
+    for index in sorted(completed):
+        results.extend(completed[index])
+    return results
 
 
-def _price_sort_key(item: Dict[str, object]) -> float:
-    for key in ("price_value", "price"):
-        value = item.get(key)
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            continue
+async def _call_scraper_async(name: str, scraper: Scraper, query: str) -> List[Offer]:
+    if not SCRAPER_HEALTH.allow(name):
+        SCRAPER_SKIPS.inc(scraper=name)
+        logger.info("Skipping %s for '%s': circuit breaker is %s", name, query, SCRAPER_HEALTH.state_of(name))
+        return []
+
+    key = (name, _cache_key(query))
+    try:
+        items = await SCRAPER_FLIGHTS.do_async(
+            key,
+            lambda: _timed_scrape_async(name, scraper, query),
+            timeout=SCRAPER_HEALTH.timeout_for(name),
+        )
+        return [Offer.from_mapping(item, vendor=name) for item in items]
+    except TimeoutError:
+        logger.warning("Timed out waiting for in-flight %s scrape of '%s'", name, query)
+        return []
+    except ScraperUnavailable as exc:
+        logger.warning("%s unavailable: %s", name, exc)
+        return []
+    except Exception:  # pragma: no cover - defensive logging
+        logger.exception("Error scraping %s", name)
+        return []
+
+
+async def _timed_scrape_async(name: str, scraper: Scraper, query: str) -> List[Dict[str, object]]:
+    native = ASYNC_SCRAPERS.get(scraper)
+    if native is None:
+        return await aio.run_blocking(_timed_scrape, name, scraper, query)
+
+    started = time.monotonic()
+    try:
+        results = list(await native(query))
+    except Exception:
+        _observe_scrape(name, started, None)
+        raise
+    _observe_scrape(name, started, results)
+    return results
+
+
+async def _iter_scraper_results_async(
+    calls: List[ScraperCall],
+) -> AsyncIterator[tuple[int, str, str, List[Offer]]]:
+    """Coroutine version of :func:`_iter_scraper_results`.
+
+    Each call is a task on the running loop, cancelled at its scraper's
+    timeout or at ``SEARCH_DEADLINE_SECONDS``.
+    """
+
+    started = time.monotonic()
+    deadline = started + SEARCH_DEADLINE_SECONDS
+    variants = _VariantTimer(calls, started)
+    tasks: Dict[asyncio.Task, tuple[int, str, str, float]] = {}
+    for index, (name, scraper, variant) in enumerate(calls):
+        task = asyncio.ensure_future(_call_scraper_async(name, scraper, variant))
+        tasks[task] = (index, name, variant, min(deadline, started + SCRAPER_HEALTH.timeout_for(name)))
+
+    finished = 0
+    pending = set(tasks)
+    try:
+        while pending:
+            now = time.monotonic()
+            expired = {task for task in pending if tasks[task][3] <= now and not task.done()}
+            for task in expired:
+                task.cancel()
+                logger.warning("Abandoned scraper %s for '%s' after its timeout", tasks[task][1], tasks[task][2])
+            pending -= expired
+            if not pending:
+                break
+
+            next_deadline = min(tasks[task][3] for task in pending)
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, next_deadline - now), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=lambda task: tasks[task][0]):
+                index, name, variant, _deadline = tasks[task]
+                items = task.result()
+                finished += 1
+                variants.finished(variant)
+                logger.info("%s returned %d items for '%s'", name, len(items), variant)
+                yield index, name, variant, items
+    finally:
+        for task in pending:
+            task.cancel()
+
+    variants.close()
+    if finished < len(tasks):
+        logger.warning("Search finished with %d of %d scraper calls completed", finished, len(tasks))
+
+
+async def _run_all_scrapers_async(calls: List[ScraperCall]) -> List[Offer]:
+    completed: Dict[int, List[Offer]] = {}
+    async for index, name, variant, items in _iter_scraper_results_async(calls):
+        completed[index] = items
+        _report_progress(name, variant, items)
+    return _in_call_order(completed)
+
+
+def _deduplicate_results(results: Iterable[Dict[str, object]]) -> List[Offer]:
+    index = DedupeIndex()
+    for item in results:
+        index.add(Offer.from_mapping(item))
+    DUPLICATE_OFFERS.inc(index.merged)
+    return index.offers()
+
 
-    return float("inf")
+def _price_sort_key(item: Offer | Dict[str, object]) -> float:
+    if isinstance(item, Offer):
+        return item.sort_price
+    return Offer.from_mapping(item).sort_price
 
 
-def _sort_results_by_priority(results: List[Dict[str, object]]) -> List[Dict[str, object]]:
-    def priority_index(item: Dict[str, object]) -> tuple[int, int]:
-        source = str(item.get("source", "")).lower()
+def _sort_results_by_priority(results: List[Offer]) -> List[Offer]:
+    def priority_index(item: Offer) -> tuple[int, int]:
+        source = str(item.source or "").lower()
         for index, vendor in enumerate(PRIORITY_VENDORS):
             if vendor in source:
                 return 0, index
@@ -152,27 +523,70 @@ def _sort_results_by_priority(results: List[Dict[str, object]]) -> List[Dict[str
     return sorted(results, key=lambda item: (*priority_index(item), _price_sort_key(item)))
 
 
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9\s]+")
+
+
 def _normalize_text(value: str) -> str:
-    return re.sub(r"[^a-z0-9\s]+", " ", value.lower()).strip()
+    return _NON_ALPHANUMERIC.sub(" ", value.lower()).strip()
 
 
-def _wording_match_score(query: str, result: Dict[str, object]) -> float:
-    normalized_query = _normalize_text(query)
-    normalized_title = _normalize_text(str(result.get("title", "")))
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _normalized_title(title: str) -> tuple[str, frozenset[str]]:
+    normalized = _normalize_text(title)
+    return normalized, frozenset(normalized.split())
+
+
+def _cache_key(query: str) -> str:
+    return " ".join(_normalize_text(query).split())
 
-    if not normalized_query or not normalized_title:
-        return 0.0
 
-    query_tokens = {token for token in normalized_query.split() if token}
-    title_tokens = {token for token in normalized_title.split() if token}
+class _WordingScorer:
+    """Score result titles against one query.
 
-    token_coverage = (
-        len(query_tokens & title_tokens) / len(query_tokens)
-        if query_tokens
-        else 0.0
-    )
-    sequence_ratio = SequenceMatcher(None, normalized_query, normalized_title).ratio()
-    return max(token_coverage, sequence_ratio)
+    A title scores the better of its query token coverage and its
+    ``SequenceMatcher`` ratio against the query. The query is normalized
+    once, and the ratio is only computed when its cheap upper bounds
+    (``real_quick_ratio``, then ``quick_ratio``) show it could raise the
+    score to at least ``threshold``.
+    """
+
+    def __init__(self, query: str, threshold: float = 0.0):
+        self.query = _normalize_text(query)
+        self.tokens = frozenset(self.query.split())
+        self.threshold = threshold
+        # The query stays seq1 and each title is set as seq2, so the b2j index
+        # is rebuilt per title. Swapping the sides would index the query once,
+        # but ratio() is not symmetric (longest-match ties are broken by
+        # position in seq1, and autojunk only looks at seq2), so scores and the
+        # set of results passing MIN_WORDING_MATCH would change. Titles are
+        # short; indexing one costs about as much as quick_ratio's pass over it.
+        self._matcher = SequenceMatcher(None, self.query, "")
+
+    def score(self, title: str) -> float | None:
+        """Return the score of *title*, or ``None`` when it is below ``threshold``."""
+
+        normalized, tokens = _normalized_title(title)
+        score = 0.0
+        if self.query and normalized:
+            coverage = len(self.tokens & tokens) / len(self.tokens)
+            score = max(coverage, self._ratio_above(normalized, coverage))
+        return score if score >= self.threshold else None
+
+    def score_batch(self, titles: Iterable[str]) -> List[float | None]:
+        return [self.score(title) for title in titles]
+
+    def _ratio_above(self, title: str, coverage: float) -> float:
+        # Same formula as SequenceMatcher.real_quick_ratio().
+        bound = 2.0 * min(len(self.query), len(title)) / (len(self.query) + len(title))
+        if bound <= coverage or bound < self.threshold:
+            return 0.0
+
+        matcher = self._matcher
+        matcher.set_seq2(title)
+        bound = matcher.quick_ratio()
+        if bound <= coverage or bound < self.threshold:
+            return 0.0
+        return matcher.ratio()
 
 
 def _is_supported_category(query: str) -> bool:
@@ -182,33 +596,36 @@ def _is_supported_category(query: str) -> bool:
     return bool(query_tokens & category_tokens)
 
 
-def _filter_results_for_category_and_match(
-    query: str, results: List[Dict[str, object]]
-) -> List[Dict[str, object]]:
-    filtered: List[Dict[str, object]] = []
+def _filter_results_for_category_and_match(query: str, results: Iterable[Dict[str, object]]) -> List[Offer]:
+    filtered: List[Offer] = []
+    results = list(results)
+    scorer = _WordingScorer(query, MIN_WORDING_MATCH)
+    scores = scorer.score_batch(str(item.get("title", "")) for item in results)
 
-    for item in results:
-        score = _wording_match_score(query, item)
-        if score < MIN_WORDING_MATCH:
+    for item, score in zip(results, scores):
+        if score is None:
             continue
 
-        enriched = dict(item)
-        enriched["match_score"] = round(score, 3)
-        filtered.append(enriched)
+        # Offers belong to a single search (see _call_scraper), so the score
+        # is set in place.
+        offer = Offer.from_mapping(item)
+        offer.match_score = round(score, 3)
+        filtered.append(offer)
 
     return filtered
 
 
-def _sort_results_by_price(results: List[Dict[str, object]]) -> List[Dict[str, object]]:
+def _sort_results_by_price(results: List[Offer]) -> List[Offer]:
     return sorted(results, key=_price_sort_key)
 
 
-def search_products(query: str) -> List[Dict[str, object]]:
+def search_products(query: str) -> List[Offer]:
     """Return search results for *query*.
 
     All vendor scrapers are queried to provide real product listings from the
     supported sites. This avoids fabricated AI responses and ensures we always
-    return the concrete offers we can scrape.
+    return the concrete offers we can scrape. Results are
+    :class:`offers.Offer` records; :func:`offers.as_dicts` serializes them.
     """
 
     if not query.strip():
@@ -217,21 +634,182 @@ def search_products(query: str) -> List[Dict[str, object]]:
     if not _is_supported_category(query):
         return []
 
-    rewritten = rewrite_query_with_vendors(query)
-    queries = [rewritten.get("primary", query)] + list(rewritten.get("boosted", []))
+    if SEARCH_ENGINE_MODE == "async":
+        return aio.run_sync(search_products_async(query))
+
+    key = _cache_key(query)
+    with SEARCH_SECONDS.time():
+        return SEARCH_CACHE.get_or_compute(key, lambda: _search_coalesced(key, query))
+
+
+async def search_products_async(query: str) -> List[Offer]:
+    """Coroutine version of :func:`search_products`.
+
+    Every scraper call and preview fetch for the search runs as a coroutine
+    on the running loop; blocking steps (query rewrite, OpenAI ranking,
+    renders and parsing) are handed to the :mod:`scrapers.aio` thread pool.
+    Shares the search cache, coalescing and circuit breakers with the
+    thread-pool engine.
+    """
+
+    if not query.strip() or not _is_supported_category(query):
+        return []
+
+    key = _cache_key(query)
+    with SEARCH_SECONDS.time():
+        return await SEARCH_CACHE.get_or_compute_async(key, lambda: _search_coalesced_async(key, query))
 
-    results: List[Dict[str, object]] = []
-    for variant in queries:
-        results.extend(_run_scrapers(variant))
 
-    deduped = _deduplicate_results(results)
+async def _search_coalesced_async(key: str, query: str) -> List[Offer]:
+    try:
+        return await SEARCH_FLIGHTS.do_async(
+            key, lambda: _search_uncached_async(query), timeout=SEARCH_COALESCE_TIMEOUT_SECONDS
+        )
+    except TimeoutError:
+        logger.warning("Timed out waiting for in-flight search for '%s'", query)
+        return []
+
+
+async def _search_uncached_async(query: str) -> List[Offer]:
+    calls = await aio.run_blocking(_scraper_calls, query)
+    with SEARCH_STAGE_SECONDS.time(stage="scrape"):
+        results = await _run_all_scrapers_async(calls)
+    return await aio.run_blocking(_rank_results, query, results)
+
+
+def _search_coalesced(key: str, query: str) -> List[Offer]:
+    try:
+        return SEARCH_FLIGHTS.do(
+            key, lambda: _search_uncached(query), timeout=SEARCH_COALESCE_TIMEOUT_SECONDS
+        )
+    except TimeoutError:
+        logger.warning("Timed out waiting for in-flight search for '%s'", query)
+        return []
+
+
+def _search_uncached(query: str) -> List[Offer]:
+    calls = _scraper_calls(query)
+
+    if SEARCH_ENGINE_MODE == "per-variant":
+        by_variant: Dict[str, List[tuple[str, Scraper]]] = {}
+        for name, scraper, variant in calls:
+            by_variant.setdefault(variant, []).append((name, scraper))
+
+        results: List[Offer] = []
+        primary = calls[0][2] if calls else ""
+        for variant, sources in by_variant.items():
+            with VARIANT_SECONDS.time(variant=_variant_kind(variant, primary)):
+                results.extend(_run_scrapers(variant, sources))
+    else:
+        with SEARCH_STAGE_SECONDS.time(stage="scrape"):
+            results = _run_all_scrapers(calls)
+
+    return _rank_results(query, results)
+
+
+def _rank_results(query: str, results: List[Offer]) -> List[Offer]:
+    stage = SEARCH_STAGE_SECONDS.time
+    with stage(stage="dedupe"):
+        deduped = _deduplicate_results(results)
 
     if not deduped:
         logger.info("Scrapers returned no results for '%s'; falling back to OpenAI", query)
-        ai_offers = search_openai(query)
-        deduped = _deduplicate_results(ai_offers)
+        with stage(stage="openai_fallback"):
+            ai_offers = [Offer.from_mapping(item, vendor="OpenAI") for item in search_openai(query)]
+            deduped = _deduplicate_results(ai_offers)
+
+    with stage(stage="priority_sort"):
+        prioritized = _sort_results_by_priority(deduped)
+    with stage(stage="summarize"):
+        summarized = summarize_offers_with_openai(query, prioritized)
+    with stage(stage="filter"):
+        filtered = _filter_results_for_category_and_match(query, summarized)
+    with stage(stage="price_sort"):
+        return _sort_results_by_price(filtered)
+
+
+class _StreamProgress:
+    """Turn a search's finished scraper calls into ``results`` events.
+
+    Only offers not seen earlier in the stream that clear
+    ``MIN_WORDING_MATCH`` are emitted. Reports arriving after
+    :meth:`close` (from a background refresh that inherited the stream's
+    context) are dropped.
+    """
 
-    prioritized = _sort_results_by_priority(deduped)
-    summarized = summarize_offers_with_openai(query, prioritized)
-    filtered = _filter_results_for_category_and_match(query, summarized)
-    return _sort_results_by_price(filtered)
+    def __init__(self, query: str, emit: Callable[[Dict[str, object]], None]):
+        self.query = query
+        self._emit = emit
+        self._seen = DedupeIndex()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def report(self, name: str, variant: str, items: List[Offer]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            fresh = [item for item in items if self._seen.add(item)]
+            matched = _sort_results_by_price(_filter_results_for_category_and_match(self.query, fresh))
+            if matched:
+                self._emit({"event": "results", "scraper": name, "variant": variant, "results": matched})
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+
+
+# Set while a streamed search runs, so the scrape it leads reports progress.
+_SEARCH_PROGRESS: contextvars.ContextVar[_StreamProgress | None] = contextvars.ContextVar(
+    "search_progress", default=None
+)
+
+
+def _report_progress(name: str, variant: str, items: List[Offer]) -> None:
+    progress = _SEARCH_PROGRESS.get()
+    if progress is not None:
+        progress.report(name, variant, items)
+
+
+def stream_search_events(query: str) -> Iterator[Dict[str, object]]:
+    """Yield search progress events for *query*.
+
+    The search runs through :func:`search_products`, so it shares the
+    cache (stale entries are served while they revalidate), coalescing
+    with concurrent searches, ``SEARCH_ENGINE_MODE`` and metrics. When this
+    stream leads a new scrape in the ``shared`` or ``async`` engine, a
+    ``results`` event is emitted each time a scraper finishes, carrying
+    only offers not seen earlier in the stream that clear
+    ``MIN_WORDING_MATCH``. A closing ``final`` event carries the ranked
+    list :func:`search_products` returned; cached and in-flight searches
+    emit only that event.
+    """
+
+    if not query.strip() or not _is_supported_category(query):
+        yield {"event": "final", "results": [], "count": 0}
+        return
+
+    events: "queue.Queue[object]" = queue.Queue()
+    progress = _StreamProgress(query, events.put)
+
+    def run() -> None:
+        _SEARCH_PROGRESS.set(progress)
+        try:
+            outcome: object = search_products(query)
+        except BaseException as exc:  # re-raised in the streaming thread
+            outcome = exc
+        progress.close()
+        events.put(outcome)
+
+    # The search runs on its own thread so events can be yielded while it
+    # is in flight; it finishes (and is cached) even if the client leaves.
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), name="search-stream", daemon=True).start()
+    while True:
+        item = events.get()
+        if isinstance(item, BaseException):
+            raise item
+        if isinstance(item, dict):
+            yield item
+            continue
+        yield {"event": "final", "results": item, "count": len(item)}
+        return
@@ -0,0 +1,312 @@
+"""TTL + LRU cache for search results with an optional SQLite tier."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", 900))
+SEARCH_CACHE_STALE_SECONDS = float(os.environ.get("SEARCH_CACHE_STALE_SECONDS", 3600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 256))
+SEARCH_CACHE_MAX_BYTES = int(os.environ.get("SEARCH_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+SEARCH_CACHE_DB_PATH = os.environ.get("SEARCH_CACHE_DB_PATH") or None
+
+Results = List[Dict[str, object]]
+
+
+def _encode(value: Any) -> Any:
+    # Records such as offers.Offer serialize themselves.
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if callable(to_dict) else str(value)
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "size")
+
+    def __init__(self, value: Results, stored_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.size = size
+
+
+class SearchCache:
+    """Cache search results by normalized query.
+
+    Entries are fresh for ``ttl_seconds``. For a further ``stale_seconds``
+    they are still served immediately while a background thread recomputes
+    them (stale-while-revalidate). Memory is bounded by entry count and by
+    the JSON size of the cached results, evicting least recently used
+    entries first. When ``db_path`` is set, entries are also written to
+    SQLite so they survive restarts; *decode*, when given, rebuilds each
+    result read back from SQLite.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS,
+        stale_seconds: float = SEARCH_CACHE_STALE_SECONDS,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+        db_path: str | None = SEARCH_CACHE_DB_PATH,
+        clock: Callable[[], float] = time.time,
+        decode: Callable[[Mapping[str, object]], object] | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self._clock = clock
+        self._decode = decode
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0}
+        if self.db_path:
+            self._init_db()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], Results]) -> Results:
+        """Return the cached results for *key*, computing them on a miss."""
+
+        if not self.enabled:
+            return compute()
+
+        entry = self._lookup(key)
+        age = self._clock() - entry.stored_at if entry else None
+
+        if entry and age <= self.ttl_seconds:
+            self._count("hits")
+            return list(entry.value)
+
+        if entry and age <= self.ttl_seconds + self.stale_seconds:
+            self._count("stale_hits")
+            self._refresh_in_background(key, compute)
+            return list(entry.value)
+
+        self._count("misses")
+        value = compute()
+        self.set(key, value)
+        return value
+
+    async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[Results]]) -> Results:
+        """Coroutine version of :meth:`get_or_compute`; refreshes run as tasks."""
+
+        if not self.enabled:
+            return await compute()
+
+        entry = await self._in_thread(self._lookup, key)
+        age = self._clock() - entry.stored_at if entry else None
+
+        if entry and age <= self.ttl_seconds:
+            self._count("hits")
+            return list(entry.value)
+
+        if entry and age <= self.ttl_seconds + self.stale_seconds:
+            self._count("stale_hits")
+            if self._start_refresh(key):
+                task = asyncio.get_running_loop().create_task(self._refresh_async(key, compute))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return list(entry.value)
+
+        self._count("misses")
+        value = await compute()
+        await self._in_thread(self.set, key, value)
+        return value
+
+    def get(self, key: str) -> Optional[Results]:
+        """Return fresh cached results for *key* without computing anything."""
+
+        if not self.enabled:
+            return None
+
+        entry = self._lookup(key)
+        if entry is None or self._clock() - entry.stored_at > self.ttl_seconds:
+            return None
+
+        self._count("hits")
+        return list(entry.value)
+
+    def set(self, key: str, value: Results) -> None:
+        # Empty results usually mean every vendor failed; caching them would
+        # hide a transient outage for the whole TTL.
+        if not self.enabled or not value:
+            return
+
+        payload = json.dumps(value, default=_encode)
+        stored_at = self._clock()
+        self._store_in_memory(key, _Entry(list(value), stored_at, len(payload)))
+        if self.db_path:
+            self._write_db(key, payload, stored_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM search_cache")
+            except sqlite3.Error:
+                logger.exception("Failed to clear persistent search cache")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 3) if lookups else 0.0
+        stats["persistent"] = bool(self.db_path)
+        return stats
+
+    async def _in_thread(self, func: Callable[..., Any], *args: Any) -> Any:
+        # SQLite reads and writes would block the event loop; the in-memory
+        # tier alone is cheap enough to use directly.
+        if self.db_path:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.db_path:
+            return None
+
+        entry = self._read_db(key)
+        if entry is not None:
+            self._store_in_memory(key, entry)
+        return entry
+
+    def _store_in_memory(self, key: str, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters["evictions"] += 1
+
+    def _start_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._counters["refreshes"] += 1
+            return True
+
+    async def _refresh_async(self, key: str, compute: Callable[[], Awaitable[Results]]) -> None:
+        try:
+            value = await compute()
+            await self._in_thread(self.set, key, value)
+        except Exception:
+            logger.exception("Background refresh failed for '%s'", key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Results]) -> None:
+        if not self._start_refresh(key):
+            return
+
+        def refresh() -> None:
+            try:
+                self.set(key, compute())
+            except Exception:
+                logger.exception("Background refresh failed for '%s'", key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-cache-refresh", daemon=True).start()
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Commits or rolls back like ``with conn:`` and then closes the
+        # connection, which sqlite3's own context manager never does.
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _read_db(self, key: str) -> Optional[_Entry]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            logger.exception("Failed to read persistent search cache")
+            return None
+
+        if not row:
+            return None
+
+        payload, stored_at = row
+        if self._clock() - stored_at > self.ttl_seconds + self.stale_seconds:
+            return None
+        value = json.loads(payload)
+        if self._decode is not None:
+            value = [self._decode(item) for item in value]
+        return _Entry(value, stored_at, len(payload))
+
+    def _write_db(self, key: str, payload: str, stored_at: float) -> None:
+        expired_before = stored_at - (self.ttl_seconds + self.stale_seconds)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, payload, stored_at),
+                )
+                conn.execute("DELETE FROM search_cache WHERE stored_at < ?", (expired_before,))
+        except sqlite3.Error:
+            logger.exception("Failed to write persistent search cache")
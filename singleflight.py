@@ -0,0 +1,99 @@
+"""Coalesce concurrent calls for the same key into one shared computation."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time.
+
+    The first caller for a key (the leader) runs ``fn``; callers arriving
+    while it is in flight wait for the leader and receive the same result, or
+    the same exception if the computation failed. Waiters give up with
+    :class:`TimeoutError` after ``timeout`` seconds; the leader itself is
+    never interrupted. :meth:`do_async` does the same for coroutines running
+    on one event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[tuple, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._counters = {"leaders": 0, "coalesced": 0, "timeouts": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: float | None = None) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["leaders"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as exc:
+                call.error = exc
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key!r}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: float | None = None) -> T:
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[task_key] = loop.create_task(fn())
+                task.add_done_callback(lambda _task: self._forget(task_key))
+                self._counters["leaders"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        # Shielded so a caller being cancelled does not cancel the shared work.
+        if leader:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except TimeoutError:
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key!r}") from None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls) + len(self._tasks)
+        return stats
+
+    def _forget(self, task_key: tuple) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
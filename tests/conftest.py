@@ -1,5 +1,11 @@
 import os
 import sys
+import tempfile
 
 # Ensure the project root is on the import path for scraper modules
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+# Keep scraper responses and previews cached on disk out of the shared /tmp
+# caches.
+os.environ.setdefault("HTTP_CACHE_DIR", tempfile.mkdtemp(prefix="pricescout-http-cache-"))
+os.environ.setdefault("PREVIEW_CACHE_DB_PATH", "")
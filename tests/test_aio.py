@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from scrapers import aio, utils
+from scrapers.scheduler import INTERACTIVE, RequestScheduler, current_priority, request_priority
+
+
+def test_fetch_text_without_httpx_uses_safe_get_off_the_loop(monkeypatch):
+    calls = []
+
+    def fake_safe_get(url, params=None):
+        calls.append((url, params, threading.current_thread().name, current_priority()))
+        return "<html></html>"
+
+    monkeypatch.setattr(aio, "httpx", None)
+    monkeypatch.setattr(utils, "safe_get", fake_safe_get)
+
+    async def main():
+        with request_priority(INTERACTIVE):
+            return await aio.fetch_text("https://shop.test/s", {"q": "lcd"})
+
+    assert asyncio.run(main()) == "<html></html>"
+    url, params, thread_name, priority = calls[0]
+    assert (url, params, priority) == ("https://shop.test/s", {"q": "lcd"}, INTERACTIVE)
+    assert thread_name.startswith("aio-blocking")
+
+
+def test_fetches_are_limited_per_domain(monkeypatch):
+    monkeypatch.setattr(aio, "httpx", None)
+    monkeypatch.setattr(aio, "AIO_DOMAIN_CONCURRENCY", 2)
+    in_flight = {"a.test": 0, "b.test": 0}
+    peaks = {"a.test": 0, "b.test": 0}
+    lock = threading.Lock()
+
+    def fake_safe_get(url, params=None):
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            peaks[host] = max(peaks[host], in_flight[host])
+        time.sleep(0.05)
+        with lock:
+            in_flight[host] -= 1
+        return url
+
+    monkeypatch.setattr(utils, "safe_get", fake_safe_get)
+
+    async def main():
+        urls = [f"https://{host}/{index}" for host in in_flight for index in range(6)]
+        return await asyncio.gather(*(aio.fetch_text(url) for url in urls))
+
+    assert len(asyncio.run(main())) == 12
+    assert peaks == {"a.test": 2, "b.test": 2}
+
+
+def test_run_sync_runs_on_background_loop():
+    async def where():
+        return threading.current_thread().name
+
+    assert aio.run_sync(where()) == "aio-loop"
+
+
+class _FakePool:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.urls = []
+
+    def submit(self, url, wait_selector=None):
+        self.urls.append(url)
+        future = Future()
+        if self.fail:
+            future.set_exception(RuntimeError("browser crashed"))
+        else:
+            threading.Timer(0.05, future.set_result, args=(f"<html>{url}</html>",)).start()
+        return future
+
+
+def _no_blocking(*_args):
+    raise AssertionError("render held a blocking thread")
+
+
+def test_render_awaits_pool_pages_without_blocking_threads(monkeypatch):
+    pool = _FakePool()
+    monkeypatch.setattr(aio, "get_browser_pool", lambda: pool)
+    monkeypatch.setattr(aio, "get_scheduler", lambda: RequestScheduler(default_limit={"rate": 0}))
+    monkeypatch.setattr(aio, "run_blocking", _no_blocking)
+
+    async def main():
+        return await asyncio.gather(*(aio.render(f"https://shop.test/{index}") for index in range(3)))
+
+    assert asyncio.run(main()) == [f"<html>https://shop.test/{index}</html>" for index in range(3)]
+
+
+def test_failed_render_falls_back_to_static_fetch(monkeypatch):
+    monkeypatch.setattr(aio, "get_browser_pool", lambda: _FakePool(fail=True))
+    monkeypatch.setattr(aio, "get_scheduler", lambda: RequestScheduler(default_limit={"rate": 0}))
+    monkeypatch.setattr(aio, "httpx", None)
+    monkeypatch.setattr(utils, "safe_get", lambda url, params=None: "<html>static</html>")
+
+    assert asyncio.run(aio.render("https://shop.test/p")) == "<html>static</html>"
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks import run as bench
+
+
+@pytest.mark.parametrize("name", sorted(bench.PARSERS))
+def test_every_recorded_fixture_still_parses(name):
+    fixture, parse = bench.PARSERS[name]
+
+    items = parse(bench.load_fixture(fixture))
+
+    assert items and all(items)
+
+
+def test_fixture_for_routes_search_hosts_and_previews():
+    assert bench.fixture_for("https://www.fixez.com/catalogsearch/result/?q=x") == "fixez.html"
+    assert bench.fixture_for("https://duckduckgo.com/html/") == "duckduckgo.html"
+    assert bench.fixture_for("https://www.amazon.com/dp/B0") == "preview_amazon.html"
+    assert bench.fixture_for("https://parts.example.net/p/1") == "preview_generic.html"
+
+
+def test_offline_search_runs_without_network():
+    with bench.offline():
+        results = bench.bench_search(iterations=1, sizes=(10,))
+
+    assert results["fixtures"]["results"] >= 1
+    assert results["offers_10"]["iterations"] == 1
+
+
+def test_compare_reports_relative_change():
+    baseline = {"meta": {"commit": "a"}, "search": {"offers_10": {"median_ms": 10.0, "iterations": 3}}}
+    current = {"meta": {"commit": "b"}, "search": {"offers_10": {"median_ms": 12.0, "iterations": 3}}}
+
+    lines = bench.compare(baseline, current)
+
+    assert len(lines) == 1
+    assert lines[0].startswith("search.offers_10.median_ms")
+    assert lines[0].endswith("(+20.0%)")
@@ -0,0 +1,226 @@
+import asyncio
+import threading
+
+import pytest
+
+import playwright.async_api as playwright_async
+
+from scrapers.browser_pool import RENDER_PROFILES, BrowserPool, profile_for
+
+SUBRESOURCES = [
+    ("document", "https://shop.example.com/search", 1000),
+    ("script", "https://shop.example.com/app.js", 400),
+    ("image", "https://shop.example.com/a.jpg", 5000),
+    ("font", "https://shop.example.com/a.woff2", 3000),
+    ("script", "https://www.googletagmanager.com/gtm.js", 2000),
+]
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url, page):
+        self.request = type("Request", (), {"resource_type": resource_type, "url": url})()
+        self.page = page
+
+    async def abort(self):
+        self.page.aborted.append(self.request.url)
+
+    async def continue_(self):
+        self.page.loaded.append(self.request.url)
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = None
+        self.wait_until = None
+        self.handlers = {}
+        self.aborted = []
+        self.loaded = []
+
+    async def route(self, pattern, handler):
+        self.handlers["route"] = handler
+
+    def on(self, event, callback):
+        self.handlers[event] = callback
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        if "crash" in url:
+            self.context.browser.connected = False
+            raise RuntimeError("target closed")
+        browser = self.context.browser
+        browser.loading += 1
+        browser.peak_loading = max(browser.peak_loading, browser.loading)
+        if "slow" in url:
+            await asyncio.sleep(0.2)
+        browser.loading -= 1
+        self.url = url
+        self.wait_until = wait_until
+        self.context.pages.append(self)
+        for resource_type, resource_url, size in SUBRESOURCES:
+            if "route" in self.handlers:
+                await self.handlers["route"](FakeRoute(resource_type, resource_url, self))
+                if resource_url in self.aborted:
+                    continue
+            self.handlers["response"](type("Response", (), {"headers": {"content-length": str(size)}})())
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        return None
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.pages = []
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+        self.loading = 0
+        self.peak_loading = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    launched = []
+
+    class Chromium:
+        async def launch(self, headless=True):
+            browser = FakeBrowser()
+            launched.append(browser)
+            return browser
+
+    class Manager:
+        async def __aenter__(self):
+            return type("Playwright", (), {"chromium": Chromium()})()
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    monkeypatch.setattr(playwright_async, "async_playwright", Manager)
+    return launched
+
+
+def test_pool_reuses_browser_and_recycles_contexts(fake_playwright):
+    pool = BrowserPool(size=1, max_uses=2)
+    try:
+        pages = [pool.render(f"https://example.com/{index}") for index in range(3)]
+    finally:
+        pool.shutdown()
+
+    assert pages[2] == "<html>https://example.com/2</html>"
+    assert len(fake_playwright) == 1
+    contexts = fake_playwright[0].contexts
+    assert len(contexts) == 2
+    assert contexts[0].closed
+
+
+def test_pool_relaunches_browser_after_crash(fake_playwright):
+    pool = BrowserPool(size=1, max_uses=10)
+    try:
+        with pytest.raises(RuntimeError):
+            pool.render("https://example.com/crash")
+        assert pool.render("https://example.com/ok") == "<html>https://example.com/ok</html>"
+    finally:
+        pool.shutdown()
+
+    assert len(fake_playwright) == 2
+
+
+def test_renders_overlap_on_one_browser(fake_playwright):
+    pool = BrowserPool(size=1, pages_per_browser=2)
+    pages = []
+
+    def render(index):
+        pages.append(pool.render(f"https://example.com/slow/{index}"))
+
+    try:
+        threads = [threading.Thread(target=render, args=(index,)) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        pool.shutdown()
+
+    assert len(pages) == 2
+    assert len(fake_playwright) == 1
+    assert fake_playwright[0].peak_loading == 2
+
+
+def test_renders_beyond_page_limit_wait_their_turn(fake_playwright):
+    pool = BrowserPool(size=1, pages_per_browser=1)
+    futures = [pool.submit(f"https://example.com/slow/{index}") for index in range(3)]
+    try:
+        pages = [future.result(timeout=5) for future in futures]
+    finally:
+        pool.shutdown()
+
+    assert pages[2] == "<html>https://example.com/slow/2</html>"
+    assert fake_playwright[0].peak_loading == 1
+
+
+def test_pool_rejects_jobs_after_shutdown(fake_playwright):
+    pool = BrowserPool(size=1)
+    pool.shutdown()
+
+    with pytest.raises(RuntimeError):
+        pool.render("https://example.com")
+
+
+def test_lightweight_profile_blocks_assets_and_records_traffic(fake_playwright):
+    pool = BrowserPool(size=1)
+    try:
+        pool.render("https://shop.example.com/search", "li.product-item", profile=RENDER_PROFILES["lightweight"])
+        pool.render("https://shop.example.com/search", profile=RENDER_PROFILES["full"])
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    light, full = fake_playwright[0].contexts[0].pages
+    assert light.wait_until == "domcontentloaded"
+    assert light.aborted == [
+        "https://shop.example.com/a.jpg",
+        "https://shop.example.com/a.woff2",
+        "https://www.googletagmanager.com/gtm.js",
+    ]
+    assert full.wait_until == "load"
+    assert full.aborted == []
+    assert stats["lightweight"]["bytes"] == 1400
+    assert stats["lightweight"]["blocked_requests"] == 3
+    assert stats["full"]["bytes"] == 11400
+    assert stats["full"]["renders"] == 1
+
+
+def test_profile_for_matches_vendor_domains(monkeypatch):
+    import scrapers.browser_pool as browser_pool
+
+    monkeypatch.setattr(browser_pool, "RENDER_PROFILE", "full")
+
+    assert profile_for("https://www.fixez.com/catalogsearch/result/?q=x").name == "lightweight"
+    assert profile_for("https://example.org/").name == "full"
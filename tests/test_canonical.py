@@ -0,0 +1,54 @@
+from scrapers.canonical import canonical_url, dedupe_key, unwrap_redirect
+
+
+def test_amazon_links_reduce_to_asin():
+    variants = [
+        "https://www.amazon.com/Replacement-Screen-iPhone/dp/B09ABCDEF1/ref=sr_1_3?keywords=screen&qid=1",
+        "http://amazon.com/gp/product/B09ABCDEF1?tag=affiliate-20",
+        "https://m.amazon.com/dp/b09abcdef1/",
+    ]
+
+    assert canonical_url(variants[0]) == "https://www.amazon.com/dp/B09ABCDEF1"
+    assert len({dedupe_key(url) for url in variants}) == 1
+
+
+def test_ebay_links_reduce_to_item_id():
+    assert canonical_url("https://www.ebay.com/itm/iPhone-13-Screen/265012345678?hash=item3db&_trkparms=x") == (
+        "https://www.ebay.com/itm/265012345678"
+    )
+    assert dedupe_key("https://m.ebay.com/itm/265012345678") == dedupe_key("https://ebay.com/itm/265012345678/")
+
+
+def test_storefront_links_reduce_to_product_slug():
+    assert canonical_url("https://fixez.com/collections/iphone/products/iphone-13-screen?variant=42&utm_source=g") == (
+        "https://fixez.com/products/iphone-13-screen?variant=42"
+    )
+    assert dedupe_key("https://www.mobilesentrix.com/replacement-parts/apple/iphone-13-lcd.html?sku=1") == dedupe_key(
+        "http://mobilesentrix.com/iphone-13-lcd.html"
+    )
+
+
+def test_generic_links_drop_tracking_but_keep_other_parameters():
+    assert canonical_url("HTTP://Shop.Example/p/1/?utm_campaign=x&color=red&fbclid=y#top") == (
+        "https://shop.example/p/1?color=red"
+    )
+    assert dedupe_key("https://shop.example/p/1?color=red") != dedupe_key("https://shop.example/p/1?color=blue")
+
+
+def test_redirect_links_are_unwrapped():
+    wrapped = "https://duckduckgo.com/l/?uddg=https%3A%2F%2Fwww.ebay.com%2Fitm%2F265012345678&rut=abc"
+
+    assert unwrap_redirect(wrapped) == "https://www.ebay.com/itm/265012345678"
+    assert unwrap_redirect("https://www.google.com/url?q=https://shop.example/p&sa=U") == "https://shop.example/p"
+    assert dedupe_key("//" + wrapped.split("//", 1)[1]) == dedupe_key("https://www.ebay.com/itm/265012345678")
+
+
+def test_identity_keeps_path_and_query_case():
+    assert dedupe_key("HTTPS://WWW.Shop.Example/p/ABC?id=X1") == dedupe_key("https://shop.example/p/ABC?id=X1")
+    assert dedupe_key("https://shop.example/p/ABC") != dedupe_key("https://shop.example/p/abc")
+    assert dedupe_key("https://shop.example/p?id=X1") != dedupe_key("https://shop.example/p?id=x1")
+
+
+def test_links_without_host_drop_fragment():
+    assert canonical_url("/products/screen?id=1#reviews") == "/products/screen?id=1"
+    assert canonical_url("#top") == ""
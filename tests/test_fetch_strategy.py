@@ -0,0 +1,65 @@
+from scrapers import vendors
+from scrapers.fetch_strategy import RENDERED, STATIC, FetchStrategy
+
+
+CARD_PAGE = """
+<ul><li class="product-item"><a class="product-item-link" href="/lcd">LCD</a></li></ul>
+"""
+
+
+def test_fixed_strategies_are_not_learned():
+    strategy = FetchStrategy()
+
+    assert strategy.plan("a.example", "static") == [STATIC]
+    assert strategy.plan("a.example", "rendered_then_static") == [RENDERED, STATIC]
+    assert strategy.stats() == {}
+
+
+def test_prefers_static_after_enough_successes():
+    strategy = FetchStrategy(window=5, min_samples=3, success_rate=0.8, reprobe_every=0)
+
+    assert strategy.plan("a.example", "adaptive") == [RENDERED, STATIC]
+    for _ in range(3):
+        strategy.record("a.example", STATIC, True, 0.1)
+
+    assert strategy.plan("a.example", "adaptive") == [STATIC, RENDERED]
+
+    # Failures within the window push the domain back to rendering first.
+    strategy.record("a.example", STATIC, False, 0.1)
+    strategy.record("a.example", STATIC, False, 0.1)
+    assert strategy.plan("a.example", "adaptive") == [RENDERED, STATIC]
+
+
+def test_reprobes_static_periodically():
+    strategy = FetchStrategy(reprobe_every=3)
+
+    plans = [strategy.plan("a.example", "adaptive")[0] for _ in range(6)]
+
+    assert plans == [RENDERED, RENDERED, STATIC, RENDERED, RENDERED, STATIC]
+
+
+def test_scrape_vendor_learns_to_skip_rendering(monkeypatch):
+    spec = vendors.VendorSpec(key="acme-adaptive", name="Acme", base="https://acme.example", search_path="/s?q={query}")
+    monkeypatch.setitem(vendors.VENDORS, spec.key, spec)
+    strategy = FetchStrategy(min_samples=2, reprobe_every=0)
+    calls = []
+
+    def fake_render(url, wait_selector=None):
+        calls.append(RENDERED)
+        return "<html></html>"
+
+    def fake_fetch(url, params=None):
+        calls.append(STATIC)
+        return CARD_PAGE
+
+    for _ in range(3):
+        assert len(vendors.scrape_vendor(spec, "lcd", render=fake_render, fetch=fake_fetch, strategy=strategy)) == 1
+
+    assert calls == [RENDERED, STATIC, RENDERED, STATIC, STATIC]
+    stats = strategy.stats()["acme.example"]
+    assert stats["preferred"] == STATIC
+    assert stats["static_success_rate"] == 1.0
+    assert stats["render_attempts"] == 2
+    assert stats["render_successes"] == 0
+    assert stats["renders_avoided"] == 1
+    assert stats["render_fallback_rate"] == 0.0
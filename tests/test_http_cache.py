@@ -0,0 +1,170 @@
+import pytest
+import requests
+
+import scrapers.http_cache as http_cache
+import scrapers.transport as transport
+import scrapers.utils as utils
+from scrapers.http_cache import HttpCache
+from scrapers.retry import ResilientFetcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, text="", status_code=200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code), response=self)
+
+
+def test_fresh_responses_are_served_from_disk(tmp_path):
+    clock = FakeClock()
+    cache = HttpCache(str(tmp_path), min_ttls={}, clock=clock)
+    cache.store("https://shop.test/a", FakeResponse("<html>a</html>", headers={"Cache-Control": "max-age=60"}))
+
+    entry = cache.lookup("https://shop.test/a")
+    assert entry.body == "<html>a</html>"
+    assert cache.is_fresh(entry)
+
+    clock.now += 120
+    assert not cache.is_fresh(cache.lookup("https://shop.test/a"))
+
+
+def test_no_store_and_unvalidated_responses_are_skipped(tmp_path):
+    cache = HttpCache(str(tmp_path), min_ttls={"shop.test": 600}, clock=FakeClock())
+    cache.store("https://shop.test/private", FakeResponse("x", headers={"Cache-Control": "no-store"}))
+    cache.store("https://other.test/plain", FakeResponse("x"))
+
+    assert cache.lookup("https://shop.test/private") is None
+    assert cache.lookup("https://other.test/plain") is None
+
+
+def test_domain_min_ttl_overrides_short_max_age(tmp_path):
+    cache = HttpCache(str(tmp_path), min_ttls={"shop.test": 600}, clock=FakeClock())
+    cache.store("https://www.shop.test/p", FakeResponse("x", headers={"Cache-Control": "max-age=0"}))
+
+    assert cache.is_fresh(cache.lookup("https://www.shop.test/p"))
+
+
+def test_most_specific_min_ttl_wins(tmp_path):
+    clock = FakeClock()
+    cache = HttpCache(str(tmp_path), min_ttls={"shop.test": 600, "api.shop.test": 10}, clock=clock)
+    cache.store("https://api.shop.test/p", FakeResponse("x", headers={"Cache-Control": "max-age=0"}))
+
+    clock.now += 60
+    assert not cache.is_fresh(cache.lookup("https://api.shop.test/p"))
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    clock = FakeClock()
+    cache = HttpCache(str(tmp_path), max_bytes=60, min_ttls={}, clock=clock)
+    headers = {"Cache-Control": "max-age=60"}
+    cache.store("https://shop.test/1", FakeResponse("a" * 20, headers=headers))
+    clock.now += 1
+    cache.store("https://shop.test/2", FakeResponse("b" * 20, headers=headers))
+    clock.now += 1
+    cache.lookup("https://shop.test/1")
+    clock.now += 1
+    cache.store("https://shop.test/3", FakeResponse("c" * 20, headers=headers))
+
+    assert cache.lookup("https://shop.test/2") is None
+    assert cache.lookup("https://shop.test/1") is not None
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_safe_get_revalidates_stale_entries(tmp_path, monkeypatch):
+    clock = FakeClock()
+    cache = HttpCache(str(tmp_path), min_ttls={}, clock=clock)
+    monkeypatch.setattr(utils, "get_http_cache", lambda: cache)
+
+    sent_headers = []
+    responses = [
+        FakeResponse("<html>v1</html>", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}),
+        FakeResponse("", status_code=304, headers={"Cache-Control": "max-age=60"}),
+    ]
+
+    def fake_request(url, params=None, headers=None):
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(utils, "_request", fake_request)
+
+    assert utils.safe_get("https://shop.test/item") == "<html>v1</html>"
+    assert utils.safe_get("https://shop.test/item") == "<html>v1</html>"
+    assert utils.safe_get("https://shop.test/item") == "<html>v1</html>"
+
+    assert sent_headers == [None, {"If-None-Match": '"v1"'}]
+    assert cache.stats()["revalidated"] == 1
+
+
+@pytest.mark.parametrize(
+    "failure, served",
+    [
+        (requests.ConnectionError("connection reset"), "<html>v1</html>"),
+        (FakeResponse("", status_code=503), "<html>v1</html>"),
+        (FakeResponse("", status_code=404), None),
+    ],
+)
+def test_safe_get_serves_stale_entry_when_revalidation_fails(tmp_path, monkeypatch, failure, served):
+    cache = HttpCache(str(tmp_path), min_ttls={}, clock=FakeClock())
+    monkeypatch.setattr(utils, "get_http_cache", lambda: cache)
+    monkeypatch.setattr(utils, "FETCHER", ResilientFetcher(retries=0, hedge=False))
+    responses = [FakeResponse("<html>v1</html>", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}), failure]
+
+    def fake_request(url, params=None, headers=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(utils, "_request", fake_request)
+
+    assert utils.safe_get("https://shop.test/item") == "<html>v1</html>"
+    assert utils.safe_get("https://shop.test/item") == served
+
+
+def test_sqlite_connections_are_closed(tmp_path, monkeypatch):
+    import sqlite3
+
+    opened = []
+    real_connect = sqlite3.connect
+
+    class TrackedConnection(sqlite3.Connection):
+        def close(self):
+            opened.remove(self)
+            super().close()
+
+    def connect(path):
+        conn = real_connect(path, factory=TrackedConnection)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(http_cache.sqlite3, "connect", connect)
+    cache = HttpCache(str(tmp_path), min_ttls={}, clock=FakeClock())
+    cache.store("https://shop.test/a", FakeResponse("a", headers={"Cache-Control": "max-age=60"}))
+    cache.lookup("https://shop.test/a")
+    cache.stats()
+
+    assert opened == []
+
+
+def test_replay_uses_its_own_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_DIR", str(tmp_path / "live"))
+    monkeypatch.setattr(http_cache, "_CACHE", None)
+    monkeypatch.setattr(transport, "_TRANSPORT", transport.Transport(transport.REPLAY, str(tmp_path / "archive")))
+
+    cache = http_cache.get_http_cache()
+
+    assert cache.directory != str(tmp_path / "live")
+    assert not (tmp_path / "live").exists()
+    assert not (tmp_path / "archive").exists()
@@ -0,0 +1,56 @@
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_total_per_label_set():
+    counter = Counter("items", "Items seen.", ("scraper",))
+    counter.inc(scraper="Fixez")
+    counter.inc(3, scraper="Fixez")
+    counter.inc(scraper='We"b')
+
+    assert counter.value(scraper="Fixez") == 4
+    assert counter.samples() == [
+        'items_total{scraper="Fixez"} 4',
+        'items_total{scraper="We\\"b"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        histogram.observe(value, stage="dedupe")
+
+    assert histogram.count(stage="dedupe") == 4
+    assert histogram.samples() == [
+        'latency_seconds_bucket{stage="dedupe",le="0.1"} 1',
+        'latency_seconds_bucket{stage="dedupe",le="1"} 3',
+        'latency_seconds_bucket{stage="dedupe",le="+Inf"} 4',
+        'latency_seconds_sum{stage="dedupe"} 3.05',
+        'latency_seconds_count{stage="dedupe"} 4',
+    ]
+
+
+def test_histogram_timer_observes_on_error():
+    histogram = Histogram("work_seconds", "Work.")
+
+    try:
+        with histogram.time():
+            raise ValueError("boom")
+    except ValueError:
+        pass
+
+    assert histogram.count() == 1
+
+
+def test_registry_renders_headers_and_replaces_by_name():
+    registry = Registry()
+    registry.register(Counter("calls", "Old."))
+    registry.register(Gauge("queue", "Queue depth.", lambda: {("google.com",): 2}, ("domain",)))
+    registry.register(Counter("calls", "Calls made."))
+
+    assert registry.render() == (
+        "# HELP calls Calls made.\n"
+        "# TYPE calls counter\n"
+        "# HELP queue Queue depth.\n"
+        "# TYPE queue gauge\n"
+        'queue{domain="google.com"} 2\n'
+    )
@@ -15,7 +15,8 @@ SAMPLE_HTML = """
 def test_mobilesentrix_falls_back_to_static_fetch(monkeypatch):
     calls = {"render": 0, "safe": 0}
 
-    def fake_render(url, wait_selector=None):
+    def fake_render(url, wait_selector=None, fallback=True):
+        assert not fallback  # the scrape plan does the static fetch itself
         calls["render"] += 1
         return "<html></html>"  # No items found in rendered version
 
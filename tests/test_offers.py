@@ -0,0 +1,103 @@
+import json
+import math
+
+import openai_search
+from offers import DedupeIndex, Offer, as_dicts, normalize_price
+from search_cache import SearchCache
+
+
+def test_from_mapping_normalizes_price_once():
+    offer = Offer.from_mapping(
+        {"title": "iPhone 13 Screen", "price": "$1,299.00", "link": "https://Shop.example/p/1/", "snippet": "OEM"},
+        vendor="Web",
+    )
+
+    assert offer.price_value == 1299.0
+    assert offer.price == "$1,299.00"
+    assert offer.canonical_link == "https://shop.example/p/1"
+    assert offer.vendor == "Web"
+    assert offer["snippet"] == "OEM"
+    assert Offer.from_mapping(offer) is offer
+
+
+def test_unknown_price_sorts_last():
+    assert normalize_price(None, "Visit site") is None
+    assert normalize_price(None, 12) == 12.0
+    assert normalize_price("bad", "$5") == 5.0
+    assert Offer.from_mapping({"title": "x", "price": None}).sort_price == math.inf
+
+
+def test_offer_reads_like_a_dict_and_serializes():
+    offer = Offer.from_mapping({"title": "Battery", "price": 20, "source": "Fixez", "link": "https://f/1"})
+    offer.match_score = 0.9
+
+    assert offer.get("source") == "Fixez"
+    assert offer.get("missing", "default") == "default"
+    assert "vendor" not in offer
+    assert offer == {
+        "title": "Battery",
+        "price": 20,
+        "price_value": 20.0,
+        "in_stock": None,
+        "source": "Fixez",
+        "link": "https://f/1",
+        "image": None,
+        "match_score": 0.9,
+    }
+    assert json.loads(json.dumps(as_dicts([offer])))[0]["match_score"] == 0.9
+
+
+def test_summarize_reuses_input_offers(monkeypatch):
+    offers = [
+        Offer.from_mapping({"title": "A", "price": 30, "link": "https://a/1"}),
+        Offer.from_mapping({"title": "B", "price": 10, "link": "https://b/1"}),
+    ]
+    monkeypatch.setattr(
+        openai_search,
+        "_call_chat",
+        lambda _prompt, payload: json.dumps(sorted(json.loads(payload)["offers"], key=lambda o: o["price"])),
+    )
+
+    summarized = openai_search.summarize_offers_with_openai("screen", offers)
+
+    assert summarized[0] is offers[1]
+    assert summarized[1] is offers[0]
+
+
+def test_search_cache_round_trips_offers_through_sqlite(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    offer = Offer.from_mapping({"title": "Screen", "price": "$5", "link": "https://x/1"}, vendor="Web")
+    SearchCache(db_path=db_path).set("screen", [offer])
+
+    restarted = SearchCache(db_path=db_path, decode=Offer.from_mapping)
+    cached = restarted.get("screen")
+
+    assert isinstance(cached[0], Offer)
+    assert cached[0].price_value == 5.0
+    assert cached[0].vendor == "Web"
+
+
+def test_dedupe_index_merges_duplicate_listings():
+    index = DedupeIndex()
+    first = Offer.from_mapping(
+        {"title": "iPhone 13 Screen", "price": None, "source": "www.amazon.com", "link": "https://www.amazon.com/dp/B09ABCDEF1"}
+    )
+    duplicate = Offer.from_mapping(
+        {
+            "title": "Screen for iPhone 13",
+            "price": "$39.99",
+            "source": "Amazon",
+            "image": "https://img/1.jpg",
+            "snippet": "OEM",
+            "link": "http://amazon.com/gp/product/B09ABCDEF1?tag=x",
+        }
+    )
+
+    assert index.add(first)
+    assert not index.add(duplicate)
+    assert index.offers() == [first]
+    assert index.merged == 1
+    assert first.title == "iPhone 13 Screen"
+    assert first.price_value == 39.99
+    assert first.image == "https://img/1.jpg"
+    assert first["snippet"] == "OEM"
@@ -0,0 +1,38 @@
+import os
+
+from scrapers import mobilesentrix, parse_pool
+
+
+SAMPLE_HTML = """
+<ul>
+  <li class="product-item">
+    <a class="product-item-link" href="/iphone-13-pro-lcd">iPhone 13 Pro LCD</a>
+    <span class="price">$99.99</span>
+  </li>
+</ul>
+"""
+
+
+def test_thread_mode_parses_inline(monkeypatch):
+    monkeypatch.setattr(parse_pool, "PARSE_MODE", "thread")
+
+    assert parse_pool.run_parser(lambda html, suffix: html + suffix, "<a>", "</a>") == "<a></a>"
+    assert parse_pool._POOL is None
+
+
+def test_process_mode_matches_inline_results(monkeypatch):
+    monkeypatch.setattr(parse_pool, "PARSE_MODE", "process")
+    monkeypatch.setattr(parse_pool, "PARSE_WORKERS", 1)
+
+    try:
+        pooled = parse_pool.run_parser(mobilesentrix._parse_items, SAMPLE_HTML, "iphone 13 pro lcd")
+        worker_pid = parse_pool.run_parser(_worker_pid, "")
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+    assert pooled == mobilesentrix._parse_items(SAMPLE_HTML, "iphone 13 pro lcd")
+    assert worker_pid != os.getpid()
+
+
+def _worker_pid(_html):
+    return os.getpid()
@@ -0,0 +1,57 @@
+from scrapers import websearch
+from scrapers.preview_cache import PreviewCache, canonical_url
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_canonical_url_strips_tracking_and_fragments():
+    assert canonical_url("HTTPS://Www.Amazon.com/dp/B01/?tag=abc&utm_source=x&th=1#reviews") == (
+        "https://www.amazon.com/dp/B01?th=1"
+    )
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PreviewCache(ttl_seconds=60, db_path="", clock=clock)
+    cache.set("https://shop.test/item", {"image": "https://cdn.test/a.jpg"})
+
+    assert cache.get("https://shop.test/item/?utm_medium=email") == {"image": "https://cdn.test/a.jpg"}
+    clock.now += 61
+    assert cache.get("https://shop.test/item") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    db_path = str(tmp_path / "previews.db")
+    PreviewCache(db_path=db_path).set(
+        "https://shop.test/item", {"price": "$9.99", "price_value": 9.99}
+    )
+
+    fresh = PreviewCache(db_path=db_path)
+    assert fresh.get("https://shop.test/item") == {"price": "$9.99", "price_value": 9.99}
+    assert fresh.stats()["stored_entries"] == 1
+
+
+def test_preview_details_skip_network_on_cache_hit(monkeypatch):
+    cache = PreviewCache(db_path="")
+    monkeypatch.setattr(websearch, "PREVIEW_CACHE", cache)
+    fetches = []
+
+    def fake_safe_get(url):
+        fetches.append(url)
+        return '<html><head><meta property="og:image" content="https://cdn.test/p.jpg" /></head></html>'
+
+    monkeypatch.setattr(websearch, "safe_get", fake_safe_get)
+
+    first = websearch._preview_details_for("https://shop.test/p")
+    second = websearch._preview_details_for("https://shop.test/p?utm_campaign=x")
+
+    assert first == second == {"image": "https://cdn.test/p.jpg"}
+    assert fetches == ["https://shop.test/p"]
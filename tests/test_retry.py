@@ -0,0 +1,183 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from scrapers.retry import LatencyTracker, ResilientFetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text="ok", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _fetcher(**kwargs):
+    sleeps = []
+    kwargs.setdefault("hedge", False)
+    fetcher = ResilientFetcher(sleep=sleeps.append, **kwargs)
+    return fetcher, sleeps
+
+
+def test_retries_transient_errors_with_jittered_backoff():
+    fetcher, sleeps = _fetcher(retries=2, backoff_base=0.2, backoff_max=1.0)
+    outcomes = [requests.ConnectionError("reset"), requests.Timeout("slow"), FakeResponse(text="done")]
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert fetcher.fetch("example.com", send).text == "done"
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.2
+    assert 0 <= sleeps[1] <= 0.4
+    assert fetcher.stats()["retries"] == 2
+
+
+def test_honours_retry_after_and_returns_last_status():
+    fetcher, sleeps = _fetcher(retries=1, backoff_max=5.0)
+    responses = [FakeResponse(503, headers={"Retry-After": "2"}), FakeResponse(503)]
+
+    response = fetcher.fetch("example.com", lambda: responses.pop(0))
+
+    assert response.status_code == 503
+    assert sleeps[0] >= 2.0
+
+
+def test_does_not_retry_client_errors():
+    fetcher, sleeps = _fetcher(retries=3)
+
+    assert fetcher.fetch("example.com", lambda: FakeResponse(404)).status_code == 404
+    assert sleeps == []
+
+
+def test_non_transient_errors_propagate():
+    fetcher, _sleeps = _fetcher(retries=3)
+
+    def send():
+        raise requests.exceptions.InvalidURL("bad")
+
+    with pytest.raises(requests.exceptions.InvalidURL):
+        fetcher.fetch("example.com", send)
+
+
+def _slow_then_fast():
+    calls = []
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            calls.append(time.monotonic())
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return FakeResponse(text="slow")
+        return FakeResponse(text="fast")
+
+    return send, calls
+
+
+def test_hedges_after_observed_p90():
+    latencies = LatencyTracker()
+    for _ in range(10):
+        latencies.observe("example.com", 0.02)
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_min_samples=10, latencies=latencies)
+    send, calls = _slow_then_fast()
+
+    started = time.monotonic()
+    response = fetcher.fetch("example.com", send)
+
+    assert response.text == "fast"
+    assert time.monotonic() - started < 0.4
+    assert len(calls) == 2
+    stats = fetcher.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedge_budget_limits_extra_requests():
+    latencies = LatencyTracker()
+    for _ in range(10):
+        latencies.observe("example.com", 0.02)
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_budget=0.0, hedge_min_samples=10, latencies=latencies)
+
+    fetcher.fetch("example.com", _slow_then_fast()[0])
+    send, calls = _slow_then_fast()
+    assert fetcher.fetch("example.com", send).text == "slow"
+
+    assert len(calls) == 1
+    assert fetcher.stats()["hedges"] == 1
+
+
+def test_no_hedge_without_enough_samples():
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_min_samples=10)
+    send, calls = _slow_then_fast()
+
+    assert fetcher.fetch("example.com", send).text == "slow"
+    assert len(calls) == 1
+
+
+def test_rate_limit_wait_is_not_counted_as_latency():
+    fetcher, _sleeps = _fetcher()
+
+    fetcher.fetch("example.com", lambda: FakeResponse(), acquire=lambda: time.sleep(0.2))
+
+    assert fetcher.latencies.percentile("example.com", 0.9) < 0.1
+
+
+def _fast_domain():
+    latencies = LatencyTracker()
+    for _ in range(10):
+        latencies.observe("example.com", 0.02)
+    return latencies
+
+
+def test_concurrent_slow_requests_are_all_hedged():
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_budget=1.0, hedge_min_samples=10, latencies=_fast_domain())
+    sends = [_slow_then_fast() for _ in range(3)]
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda send=send: results.append(fetcher.fetch("example.com", send)))
+        for send, _calls in sends
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.text for response in results] == ["fast"] * 3
+    assert time.monotonic() - started < 0.4
+    assert fetcher.stats()["hedges"] == 3
+
+
+def test_budget_is_only_spent_on_hedges_sent():
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_budget=0.0, hedge_min_samples=10, latencies=_fast_domain())
+
+    # Requests answering before the p90 delay leave the budget untouched.
+    for _ in range(3):
+        fetcher.fetch("example.com", lambda: FakeResponse())
+    assert fetcher.fetch("example.com", _slow_then_fast()[0]).text == "fast"
+    assert fetcher.stats()["hedges"] == 1
+
+
+def test_requests_run_on_callers_thread_when_hedge_pool_is_busy():
+    fetcher, _sleeps = _fetcher(hedge=True, hedge_min_samples=10, hedge_workers=0, latencies=_fast_domain())
+    threads = []
+
+    def send():
+        threads.append(threading.current_thread())
+        return FakeResponse()
+
+    fetcher.fetch("example.com", send)
+
+    assert threads == [threading.current_thread()]
@@ -80,3 +80,62 @@ def test_api_search_endpoint_requires_query(tmp_path):
     response = client.get("/api/search")
     assert response.status_code == 400
     assert "Missing query" in response.get_json()["error"]
+
+
+def test_api_search_stream_emits_server_sent_events(tmp_path, monkeypatch):
+    app = load_app_with_temp_db(tmp_path)
+    client = app.test_client()
+
+    events = [
+        {"event": "results", "scraper": "Fixez", "variant": "screen repair kit", "results": [{"title": "kit"}]},
+        {"event": "final", "results": [{"title": "kit"}], "count": 1},
+    ]
+    monkeypatch.setattr("app.stream_search_events", lambda query: iter([dict(event) for event in events]))
+
+    response = client.get("/api/search/stream?q=screen repair kit")
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    body = response.get_data(as_text=True)
+    assert body.index("event: results") < body.index("event: final")
+    assert '"count": 1' in body
+    assert '"query": "screen repair kit"' in body
+
+
+def test_api_search_stream_requires_query(tmp_path):
+    app = load_app_with_temp_db(tmp_path)
+    client = app.test_client()
+
+    response = client.get("/api/search/stream")
+    assert response.status_code == 400
+
+
+def test_admin_scrapers_reports_breaker_state(tmp_path):
+    app = load_app_with_temp_db(tmp_path)
+    client = app.test_client()
+
+    response = client.get("/api/admin/scrapers")
+
+    assert response.status_code == 200
+    scrapers = response.get_json()["scrapers"]
+    assert {"MobileSentrix", "Fixez", "Google", "Web"} <= set(scrapers)
+    assert scrapers["Fixez"]["state"] == "closed"
+    assert "timeout_seconds" in scrapers["Fixez"]
+
+
+def test_metrics_endpoint_exports_request_histograms(tmp_path):
+    app = load_app_with_temp_db(tmp_path)
+    client = app.test_client()
+
+    client.get("/api/storefronts")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    body = response.get_data(as_text=True)
+    assert (
+        'pricescout_http_request_duration_seconds_count{endpoint="/api/storefronts",method="GET",status="200"} 1'
+        in body
+    )
+    assert 'pricescout_scraper_breaker_state{scraper="Fixez"} 0' in body
+    assert "/metrics" not in body
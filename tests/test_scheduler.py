@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapers.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitTimeout,
+    RequestScheduler,
+    TokenBucket,
+    current_priority,
+    request_priority,
+    submit_in_context,
+)
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2, now=0.0)
+
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+
+def test_limits_match_domain_suffix_and_share_a_bucket():
+    scheduler = RequestScheduler(limits={"example.com": {"rate": 1, "burst": 1}}, default_limit={"rate": 0})
+
+    assert scheduler.domain_for("https://www.example.com/a") == "example.com"
+    assert scheduler.domain_for("https://other.org/a") == "other.org"
+
+    scheduler.acquire("https://www.example.com/a")
+    with pytest.raises(RateLimitTimeout):
+        scheduler.acquire("https://shop.example.com/b", timeout=0.05)
+    # Unlimited hosts never wait.
+    assert scheduler.acquire("https://other.org/a") < 0.05
+
+    stats = scheduler.stats()["example.com"][BACKGROUND]
+    assert stats["requests"] == 2
+    assert stats["timeouts"] == 1
+
+
+def test_interactive_requests_jump_the_queue():
+    scheduler = RequestScheduler(limits={"example.com": {"rate": 10, "burst": 1}})
+    scheduler.acquire("https://example.com/warmup")
+    order = []
+
+    def fetch(priority, label):
+        with request_priority(priority):
+            scheduler.acquire("https://example.com/")
+        order.append(label)
+
+    background = [threading.Thread(target=fetch, args=(BACKGROUND, f"bg{i}")) for i in range(2)]
+    for thread in background:
+        thread.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=fetch, args=(INTERACTIVE, "interactive"))
+    interactive.start()
+    for thread in (*background, interactive):
+        thread.join(timeout=2)
+
+    assert order[0] == "interactive"
+    stats = scheduler.stats()["example.com"]
+    assert stats[INTERACTIVE]["queued"] == 1
+    assert stats[INTERACTIVE]["max_wait_ms"] > 0
+    assert stats[BACKGROUND]["requests"] == 3
+
+
+def test_priority_follows_work_into_executors():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(current_priority).result() == BACKGROUND
+        with request_priority(INTERACTIVE):
+            assert submit_in_context(executor, current_priority).result() == INTERACTIVE
+
+
+def test_async_acquire_waits_on_the_event_loop():
+    scheduler = RequestScheduler(limits={"example.com": {"rate": 20, "burst": 1}})
+    threads = set()
+
+    async def fetch(index):
+        await scheduler.acquire_async(f"https://example.com/{index}")
+        threads.add(threading.current_thread())
+
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(*(fetch(index) for index in range(4)))
+        return time.monotonic() - started
+
+    # One token up front, then one every 50ms.
+    assert asyncio.run(main()) >= 0.14
+    assert threads == {threading.current_thread()}
+    stats = scheduler.stats()["example.com"][BACKGROUND]
+    assert stats["requests"] == 4
+    assert stats["queued"] == 3
+
+
+def test_async_acquire_queues_behind_threads_and_times_out():
+    scheduler = RequestScheduler(limits={"example.com": {"rate": 1, "burst": 1}})
+    scheduler.acquire("https://example.com/")
+
+    with pytest.raises(RateLimitTimeout):
+        asyncio.run(scheduler.acquire_async("https://example.com/", timeout=0.05))
+    # The abandoned ticket does not block later callers.
+    assert scheduler.acquire("https://example.com/", timeout=1.5) > 0.5
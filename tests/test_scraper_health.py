@@ -0,0 +1,120 @@
+from scraper_health import CLOSED, HALF_OPEN, OPEN, ScraperHealth
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _health(**kwargs):
+    clock = FakeClock()
+    defaults = dict(min_samples=5, floor_seconds=1, max_seconds=20, open_seconds=30, clock=clock)
+    defaults.update(kwargs)
+    return ScraperHealth(**defaults), clock
+
+
+def test_timeout_follows_observed_latency():
+    health, _clock = _health(percentile=0.9, multiplier=2)
+
+    assert health.timeout_for("Fixez") == 20
+    for seconds in (1.0, 1.5, 2.0, 2.5, 3.0):
+        health.record("Fixez", seconds, ok=True)
+
+    assert health.timeout_for("Fixez") == 6.0
+
+    # A call slower than the derived timeout counts as a failure.
+    health.record("Fixez", 7.0, ok=True)
+    stats = health.stats()["Fixez"]
+    assert stats["timeouts"] == 1
+    assert stats["failures"] == 1
+
+
+def test_breaker_opens_on_error_rate_and_recovers_through_probe():
+    health, clock = _health(min_calls=4, error_rate=0.5, consecutive_failures=10)
+
+    for ok in (True, False, True, False):
+        health.record("Google", 0.5, ok=ok)
+
+    assert health.state_of("Google") == OPEN
+    assert not health.allow("Google")
+
+    clock.now = 31
+    assert health.allow("Google")
+    assert health.state_of("Google") == HALF_OPEN
+    # Only one probe at a time.
+    assert not health.allow("Google")
+
+    health.record("Google", 0.5, ok=True)
+    assert health.state_of("Google") == CLOSED
+    assert health.allow("Google")
+
+
+def test_failed_probe_reopens_breaker():
+    health, clock = _health(consecutive_failures=2)
+
+    health.record("Web", 0.5, ok=False)
+    health.record("Web", 0.5, ok=False)
+    assert health.state_of("Web") == OPEN
+
+    clock.now = 31
+    assert health.allow("Web")
+    health.record("Web", 0.5, ok=False)
+
+    assert health.state_of("Web") == OPEN
+    stats = health.stats()["Web"]
+    assert stats["opened"] == 2
+    assert stats["retry_in_seconds"] == 30
+
+
+def test_lost_probe_is_replaced_after_timeout():
+    health, clock = _health(consecutive_failures=1)
+    health.record("Web", 0.5, ok=False)
+
+    clock.now = 31
+    assert health.allow("Web")
+    clock.now = 40
+    assert not health.allow("Web")
+    clock.now = 52
+    assert health.allow("Web")
+
+
+def test_stats_include_named_scrapers_without_calls():
+    health, _clock = _health()
+
+    stats = health.stats(["MobileSentrix"])
+
+    assert stats["MobileSentrix"]["state"] == CLOSED
+    assert stats["MobileSentrix"]["p95_ms"] is None
+
+
+def test_timeout_catches_up_when_latency_steps_up():
+    health, _clock = _health(multiplier=2, consecutive_failures=3, min_calls=4)
+    for _ in range(10):
+        health.record("Fixez", 1.0, ok=True)
+    assert health.timeout_for("Fixez") == 2.0
+
+    # The vendor now answers in 3s: the first slow call times out, but its
+    # duration raises the timeout instead of every later call failing too.
+    for _ in range(10):
+        health.record("Fixez", 3.0, ok=True)
+
+    stats = health.stats()["Fixez"]
+    assert stats["state"] == CLOSED
+    assert stats["timeouts"] == 1
+    assert stats["p95_ms"] == 3000.0
+    assert health.timeout_for("Fixez") == 6.0
+
+
+def test_timed_out_durations_are_capped():
+    health, _clock = _health(consecutive_failures=10)
+    for _ in range(5):
+        health.record("Web", 1.0, ok=True)
+
+    health.record("Web", 300.0, ok=False)
+    health.record("Web", 0.1, ok=False)
+
+    assert health.stats()["Web"]["p95_ms"] == 20000.0
+    assert health.timeout_for("Web") == 20
@@ -1,3 +1,9 @@
+import asyncio
+import random
+import threading
+import time
+from difflib import SequenceMatcher
+
 import pytest
 
 import search
@@ -6,7 +12,11 @@ import search
 @pytest.fixture(autouse=True)
 def restore_scrapers(monkeypatch):
     original_sources = list(search.SCRAPER_SOURCES)
+    search.SEARCH_CACHE.clear()
+    search.SCRAPER_HEALTH.reset()
     yield
+    search.SEARCH_CACHE.clear()
+    search.SCRAPER_HEALTH.reset()
     monkeypatch.setattr(search, "SCRAPER_SOURCES", original_sources, raising=False)
 
 
@@ -107,3 +117,334 @@ def test_search_products_falls_back_to_openai_when_scrapers_empty(monkeypatch):
     results = search.search_products("iphone battery replacement")
     assert len(results) == 1
     assert results[0]["source"] == "OpenAI"
+
+
+def test_search_products_serves_repeat_queries_from_cache(monkeypatch):
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+
+    calls: list[str] = []
+
+    def fake_scraper(query):
+        calls.append(query)
+        return [{"title": "iphone 13 screen replacement", "price": 30, "source": "Fixez", "link": "https://f/1"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Fake", fake_scraper)])
+
+    first = search.search_products("iPhone 13 screen replacement")
+    second = search.search_products("iphone 13  screen replacement!")
+
+    assert first == second
+    assert len(calls) == 1
+    assert search.SEARCH_CACHE.stats()["hits"] == 1
+
+
+def test_search_products_returns_partial_results_at_deadline(monkeypatch):
+    monkeypatch.setattr(
+        search,
+        "rewrite_query_with_vendors",
+        lambda q: {"primary": q, "boosted": [f"{q} Amazon"]},
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    monkeypatch.setattr(search, "SEARCH_DEADLINE_SECONDS", 0.2)
+
+    release = threading.Event()
+
+    def fast_scraper(query):
+        return [{"title": "ipad battery replacement", "price": 25, "source": "Fast", "link": f"https://f/{query}"}]
+
+    def slow_scraper(_query):
+        release.wait(2)
+        return [{"title": "ipad battery replacement", "price": 5, "source": "Slow", "link": "https://s/1"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Fast", fast_scraper), ("Slow", slow_scraper)])
+
+    started = time.monotonic()
+    try:
+        results = search.search_products("ipad battery replacement")
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 1.5
+    assert {item["source"] for item in results} == {"Fast"}
+    assert len(results) == 2
+
+
+def test_stream_search_events_emits_incremental_then_final(monkeypatch):
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+
+    def scraper_one(_query):
+        return [
+            {"title": "galaxy s21 screen replacement", "price": 60, "source": "A", "link": "https://a/1"},
+            {"title": "phone stand", "price": 5, "source": "A", "link": "https://a/2"},
+        ]
+
+    def scraper_two(_query):
+        return [
+            {"title": "galaxy s21 screen replacement", "price": 60, "source": "A", "link": "https://a/1/"},
+            {"title": "galaxy s21 screen replacement oem", "price": 45, "source": "B", "link": "https://b/1"},
+        ]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("One", scraper_one), ("Two", scraper_two)])
+
+    events = list(search.stream_search_events("galaxy s21 screen replacement"))
+
+    incremental = [event for event in events if event["event"] == "results"]
+    streamed_links = [item["link"] for event in incremental for item in event["results"]]
+    assert sorted(streamed_links) == ["https://a/1", "https://b/1"]
+
+    final = events[-1]
+    assert final["event"] == "final"
+    assert [item["price"] for item in final["results"]] == [45, 60]
+    assert search.search_products("galaxy s21 screen replacement") == final["results"]
+
+
+def test_stream_joins_in_flight_search_instead_of_scraping_again(monkeypatch):
+    monkeypatch.setattr(search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []})
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_scraper(_query):
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return [{"title": "galaxy s21 screen replacement", "price": 60, "source": "A", "link": "https://a/1"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Slow", slow_scraper)])
+    query = "galaxy s21 screen replacement"
+    leader = threading.Thread(target=search.search_products, args=(query,))
+    leader.start()
+    assert started.wait(2)
+
+    events = []
+    stream = threading.Thread(target=lambda: events.extend(search.stream_search_events(query)))
+    stream.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join(2)
+    stream.join(2)
+
+    assert len(calls) == 1
+    assert [event["event"] for event in events] == ["final"]
+    assert events[0]["count"] == 1
+
+
+def test_stream_serves_stale_results_while_revalidating(monkeypatch):
+    monkeypatch.setattr(search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []})
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    refreshed = threading.Event()
+
+    def scraper(_query):
+        refreshed.set()
+        return []
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Only", scraper)])
+    query = "galaxy s21 screen replacement"
+    stale = [search.Offer.from_mapping({"title": query, "price": 10, "link": "https://a/1"})]
+    search.SEARCH_CACHE.set(search._cache_key(query), stale)
+    now = time.time() + search.SEARCH_CACHE.ttl_seconds + 1
+    monkeypatch.setattr(search.SEARCH_CACHE, "_clock", lambda: now)
+
+    events = list(search.stream_search_events(query))
+
+    assert events == [{"event": "final", "results": stale, "count": 1}]
+    assert refreshed.wait(2)
+
+
+def test_route_queries_sends_boosted_variants_only_to_web_scrapers(monkeypatch):
+    sources = [(name, lambda _q: []) for name in ("MobileSentrix", "Fixez", "Google", "Web")]
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", sources)
+
+    calls = search._route_queries(
+        "ipad screen",
+        ["ipad screen MobileSentrix", "ipad screen Amazon", "ipad screen Ebay", "ipad screen Fixez"],
+    )
+    routed = {(name, variant) for name, _scraper, variant in calls}
+
+    assert routed == {
+        ("MobileSentrix", "ipad screen"),
+        ("Fixez", "ipad screen"),
+        ("Google", "ipad screen Amazon"),
+        ("Google", "ipad screen Ebay"),
+        ("Web", "ipad screen Amazon"),
+        ("Web", "ipad screen Ebay"),
+    }
+
+
+def test_route_queries_falls_back_to_primary_without_boosted_variants(monkeypatch):
+    sources = [(name, lambda _q: []) for name in ("MobileSentrix", "Web", "Custom")]
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", sources)
+    monkeypatch.setitem(search.SCRAPER_ROUTES, "Custom", "all")
+
+    calls = search._route_queries("ipad screen", [])
+
+    assert [(name, variant) for name, _scraper, variant in calls] == [
+        ("MobileSentrix", "ipad screen"),
+        ("Web", "ipad screen"),
+        ("Custom", "ipad screen"),
+    ]
+
+
+def test_open_circuit_breaker_skips_failing_scraper(monkeypatch):
+    monkeypatch.setattr(search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []})
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    monkeypatch.setattr(search, "search_openai", lambda _q: [])
+    calls = {"Down": 0}
+
+    def down_scraper(_query):
+        calls["Down"] += 1
+        raise search.ScraperUnavailable("connection refused")
+
+    def healthy_scraper(query):
+        return [{"title": query, "price": 10, "source": "Up", "link": f"https://up/{query}"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Down", down_scraper), ("Up", healthy_scraper)])
+
+    for index in range(search.SCRAPER_HEALTH.consecutive_failures + 2):
+        search.search_products(f"iphone {index} screen replacement")
+
+    assert calls["Down"] == search.SCRAPER_HEALTH.consecutive_failures
+    stats = search.SCRAPER_HEALTH.stats()
+    assert stats["Down"]["state"] == "open"
+    assert stats["Down"]["skipped"] == 2
+    assert stats["Up"]["state"] == "closed"
+
+
+def test_search_products_records_stage_and_scraper_metrics(monkeypatch):
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(
+        search,
+        "SCRAPER_SOURCES",
+        [("Metered", lambda _q: [{"title": "lcd screen", "price": 5, "source": "A", "link": "https://a/1"}])],
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    stages = ("rewrite", "dedupe", "priority_sort", "summarize", "filter", "price_sort")
+    before = {stage: search.SEARCH_STAGE_SECONDS.count(stage=stage) for stage in stages}
+    items_before = search.SCRAPER_ITEMS.value(scraper="Metered")
+
+    search.search_products("lcd screen")
+
+    for stage in stages:
+        assert search.SEARCH_STAGE_SECONDS.count(stage=stage) == before[stage] + 1
+    assert search.SCRAPER_SECONDS.count(scraper="Metered", outcome="ok") >= 1
+    assert search.SCRAPER_ITEMS.value(scraper="Metered") == items_before + 1
+    assert search.VARIANT_SECONDS.count(variant="primary") >= 1
+
+
+def test_search_products_async_runs_native_and_threaded_scrapers(monkeypatch):
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+
+    def threaded_scraper(_query):
+        return [{"title": "lcd screen replacement", "price": 30, "source": "Thread", "link": "https://t/1"}]
+
+    def native_scraper(_query):
+        raise AssertionError("the coroutine version should be used")
+
+    async def native_scraper_async(_query):
+        await asyncio.sleep(0.01)
+        return [{"title": "lcd screen replacement", "price": 20, "source": "Coro", "link": "https://c/1"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Thread", threaded_scraper), ("Coro", native_scraper)])
+    monkeypatch.setitem(search.ASYNC_SCRAPERS, native_scraper, native_scraper_async)
+
+    results = asyncio.run(search.search_products_async("lcd screen replacement"))
+
+    assert [item["source"] for item in results] == ["Coro", "Thread"]
+
+
+def test_async_engine_serves_many_concurrent_searches_without_threads(monkeypatch):
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+
+    def slow_scraper(_query):
+        raise AssertionError("the coroutine version should be used")
+
+    async def slow_scraper_async(query):
+        await asyncio.sleep(0.2)
+        return [{"title": query, "price": 10, "source": "Slow", "link": f"https://s/{query}"}]
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Slow", slow_scraper)])
+    monkeypatch.setitem(search.ASYNC_SCRAPERS, slow_scraper, slow_scraper_async)
+
+    async def many():
+        queries = [f"iphone {index} screen" for index in range(100)]
+        return await asyncio.gather(*(search.search_products_async(query) for query in queries))
+
+    started = time.monotonic()
+    results = asyncio.run(many())
+
+    assert time.monotonic() - started < 2
+    assert all(len(found) == 1 for found in results)
+
+
+def test_async_mode_keeps_caller_priority_and_abandons_slow_scrapers(monkeypatch):
+    from scrapers.scheduler import INTERACTIVE, current_priority, request_priority
+
+    monkeypatch.setattr(search, "SEARCH_ENGINE_MODE", "async")
+    monkeypatch.setattr(search, "SEARCH_DEADLINE_SECONDS", 0.2)
+    monkeypatch.setattr(
+        search, "rewrite_query_with_vendors", lambda q: {"primary": q, "boosted": []}
+    )
+    monkeypatch.setattr(search, "summarize_offers_with_openai", lambda _q, offers: offers)
+    priorities = []
+
+    def fast_scraper(query):
+        priorities.append(current_priority())
+        return [{"title": query, "price": 10, "source": "Fast", "link": "https://f/1"}]
+
+    def slow_scraper(_query):
+        raise AssertionError("the coroutine version should be used")
+
+    async def slow_scraper_async(_query):
+        await asyncio.sleep(5)
+        return []
+
+    monkeypatch.setattr(search, "SCRAPER_SOURCES", [("Fast", fast_scraper), ("Slow", slow_scraper)])
+    monkeypatch.setitem(search.ASYNC_SCRAPERS, slow_scraper, slow_scraper_async)
+
+    started = time.monotonic()
+    with request_priority(INTERACTIVE):
+        results = search.search_products("ipad battery replacement")
+
+    assert time.monotonic() - started < 1.5
+    assert [item["source"] for item in results] == ["Fast"]
+    assert priorities == [INTERACTIVE]
+
+
+def _reference_score(query, title):
+    normalized_query = search._normalize_text(query)
+    normalized_title = search._normalize_text(title)
+    if not normalized_query or not normalized_title:
+        return 0.0
+    query_tokens = set(normalized_query.split())
+    coverage = len(query_tokens & set(normalized_title.split())) / len(query_tokens)
+    return max(coverage, SequenceMatcher(None, normalized_query, normalized_title).ratio())
+
+
+def test_wording_scorer_matches_full_scoring_at_threshold():
+    words = ["iphone", "13", "pro", "screen", "replacement", "oled", "battery", "kit", "case", "usb-c", "Max!"]
+    rng = random.Random(7)
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 7))) for _ in range(2000)]
+    titles += ["iphone 13 screen replacement", "iphone 13 screen replacment", "", "!!!"]
+
+    for query in ("iphone 13 screen replacement", "battery kit", "usb c"):
+        scorer = search._WordingScorer(query, search.MIN_WORDING_MATCH)
+        for title, score in zip(titles, scorer.score_batch(titles)):
+            expected = _reference_score(query, title)
+            if expected >= search.MIN_WORDING_MATCH:
+                assert score == expected
+            else:
+                assert score is None
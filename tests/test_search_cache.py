@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+from search_cache import SearchCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_entries_are_served_without_recomputing():
+    cache = SearchCache(ttl_seconds=60, stale_seconds=0, clock=FakeClock())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [{"title": "screen"}]
+
+    assert cache.get_or_compute("screen", compute) == [{"title": "screen"}]
+    assert cache.get_or_compute("screen", compute) == [{"title": "screen"}]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing():
+    clock = FakeClock()
+    cache = SearchCache(ttl_seconds=60, stale_seconds=600, clock=clock)
+    cache.set("screen", [{"title": "old"}])
+    clock.now += 120
+
+    refreshed = threading.Event()
+
+    def compute():
+        refreshed.set()
+        return [{"title": "new"}]
+
+    assert cache.get_or_compute("screen", compute) == [{"title": "old"}]
+    assert refreshed.wait(2)
+    for _ in range(100):
+        if not cache._refreshing:
+            break
+        threading.Event().wait(0.01)
+    assert cache.get_or_compute("screen", compute) == [{"title": "new"}]
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_lru_eviction_respects_entry_and_byte_limits():
+    cache = SearchCache(ttl_seconds=60, max_entries=2, max_bytes=10_000, clock=FakeClock())
+    cache.set("a", [{"title": "a"}])
+    cache.set("b", [{"title": "b"}])
+    cache.get_or_compute("a", lambda: [])
+    cache.set("c", [{"title": "c"}])
+
+    assert set(cache._entries) == {"a", "c"}
+
+    small = SearchCache(ttl_seconds=60, max_bytes=20, clock=FakeClock())
+    small.set("a", [{"title": "a"}])
+    small.set("b", [{"title": "b"}])
+    assert list(small._entries) == ["b"]
+    assert small.stats()["evictions"] == 1
+
+
+def test_persistent_tier_survives_new_instances(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    SearchCache(ttl_seconds=60, db_path=db_path).set("screen", [{"title": "screen", "price": 5.0}])
+
+    restarted = SearchCache(ttl_seconds=60, db_path=db_path)
+    assert restarted.get_or_compute("screen", lambda: []) == [{"title": "screen", "price": 5.0}]
+    assert restarted.stats()["hits"] == 1
+
+
+def test_async_lookups_do_sqlite_io_off_the_event_loop(tmp_path, monkeypatch):
+    cache = SearchCache(ttl_seconds=60, stale_seconds=0, db_path=str(tmp_path / "cache.db"), clock=FakeClock())
+    io_threads = []
+    for name in ("_read_db", "_write_db"):
+        original = getattr(cache, name)
+
+        def tracked(*args, _original=original):
+            io_threads.append(threading.current_thread())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, tracked)
+
+    async def compute():
+        return [{"title": "screen"}]
+
+    async def main():
+        return await cache.get_or_compute_async("screen", compute), threading.current_thread()
+
+    results, loop_thread = asyncio.run(main())
+
+    assert results == [{"title": "screen"}]
+    assert len(io_threads) == 2
+    assert loop_thread not in io_threads
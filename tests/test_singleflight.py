@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def _run_concurrently(flight, fn, count, timeout=None):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = flight.do("key", fn, timeout=timeout)
+        except Exception as exc:  # noqa: BLE001 - captured for assertions
+            errors[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return ["shared"]
+
+    threads, results, errors = _run_concurrently(flight, compute, 5)
+    while flight.stats()["coalesced"] < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [["shared"]] * 5
+    assert errors == [None] * 5
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(2)
+        raise ValueError("vendor down")
+
+    threads, _results, errors = _run_concurrently(flight, compute, 3)
+    while flight.stats()["coalesced"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_waiters_time_out_without_interrupting_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", lambda: release.wait(2)))
+    leader.start()
+    while flight.stats()["in_flight"] == 0:
+        threading.Event().wait(0.01)
+
+    with pytest.raises(TimeoutError):
+        flight.do("key", lambda: None, timeout=0.05)
+
+    release.set()
+    leader.join()
+    assert flight.stats()["timeouts"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_callers_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do_async("key", compute) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+
+    assert results == ["value"] * 5
+    assert calls == [1]
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "timeouts": 0, "in_flight": 0}
@@ -0,0 +1,127 @@
+import pytest
+import requests
+
+import scrapers.utils as utils
+from scrapers.transport import RECORD, REPLAY, InjectedFailure, Transport, TransportError
+
+
+def _response(text="<html>ok</html>", status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update({"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"})
+    response.encoding = "utf-8"
+    response._content = text.encode("utf-8")
+    return response
+
+
+def test_records_then_replays_http_responses(tmp_path):
+    recorder = Transport(RECORD, str(tmp_path))
+    recorder.request("https://shop.test/search", {"q": "lcd"}, lambda: _response("<p>lcd</p>"))
+    recorder.request("https://shop.test/broken", None, lambda: _response(status=500))
+
+    replayer = Transport(REPLAY, str(tmp_path))
+    replayed = replayer.request("https://shop.test/search", {"q": "lcd"}, lambda: pytest.fail("went live"))
+
+    assert replayed.status_code == 200
+    assert replayed.text == "<p>lcd</p>"
+    assert replayed.headers["content-type"].startswith("text/html")
+    assert "Content-Encoding" not in replayed.headers
+    replayed.close()
+    with pytest.raises(TransportError):
+        replayer.request("https://shop.test/broken", None, lambda: pytest.fail("went live"))
+    assert recorder.stats()["recorded"] == 1
+    assert replayer.stats()["misses"] == 1
+
+
+def test_replays_renders_and_chat(tmp_path):
+    recorder = Transport(RECORD, str(tmp_path))
+    recorder.render("https://shop.test/p/1", lambda: "<html>rendered</html>")
+    recorder.chat("gpt", "system", '{"query": "lcd"}', lambda: '{"primary": "lcd"}')
+
+    replayer = Transport(REPLAY, str(tmp_path))
+
+    assert replayer.render("https://shop.test/p/1", lambda: None) == "<html>rendered</html>"
+    assert replayer.chat("gpt", "system", '{"query": "lcd"}', lambda: None) == '{"primary": "lcd"}'
+    assert replayer.chat("gpt", "system", '{"query": "other"}', lambda: "live") is None
+
+
+def test_injects_latency_and_errors_per_domain(tmp_path):
+    recorder = Transport(RECORD, str(tmp_path))
+    for host in ("www.fixez.com", "www.google.com"):
+        recorder.request(f"https://{host}/", None, _response)
+
+    sleeps = []
+    faults = {
+        "fixez.com": {"latency_ms": 250, "error_rate": 1.0, "error_status": 503},
+        "*": {"latency_ms": {"median": 100, "p95": 400}},
+    }
+    replayer = Transport(REPLAY, str(tmp_path), faults=faults, seed=7, sleep=sleeps.append)
+
+    assert replayer.request("https://www.fixez.com/", None, _response).status_code == 503
+    assert sleeps == [0.25]
+    for _ in range(200):
+        assert replayer.request("https://www.google.com/", None, _response).status_code == 200
+    delays = sorted(sleeps[1:])
+    assert 0.07 < delays[100] < 0.14
+    assert delays[190] > delays[100] * 2
+    assert replayer.stats()["injected_errors"] == 1
+
+    failing = Transport(REPLAY, str(tmp_path), faults={"google.com": {"error_rate": 1.0}})
+    with pytest.raises(InjectedFailure):
+        failing.request("https://www.google.com/", None, _response)
+
+
+def test_safe_get_replays_through_retry_and_scheduler_layers(tmp_path, monkeypatch):
+    Transport(RECORD, str(tmp_path)).request("https://parts.test/item", None, lambda: _response("<p>item</p>"))
+    replayer = Transport(REPLAY, str(tmp_path))
+    monkeypatch.setattr(utils, "get_transport", lambda: replayer)
+    monkeypatch.setattr(utils, "get_http_cache", lambda: None)
+
+    assert utils.safe_get("https://parts.test/item") == "<p>item</p>"
+    assert utils.safe_get("https://parts.test/missing") is None
+    # A missing recording is not a transient error, so it is not retried.
+    assert replayer.stats()["misses"] == 1
+
+
+def test_recording_through_safe_get_bypasses_http_cache(tmp_path, monkeypatch):
+    from scrapers.http_cache import HttpCache
+
+    cache = HttpCache(str(tmp_path / "cache"), min_ttls={})
+    monkeypatch.setattr(utils, "get_http_cache", lambda: cache)
+    sent_headers = []
+    responses = [
+        _response("<p>v1</p>"),
+        _response("<p>v2</p>"),
+    ]
+    for response in responses:
+        response.headers.update({"ETag": '"v1"', "Cache-Control": "max-age=600"})
+
+    def fake_request(url, params=None, headers=None):
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    recorder = Transport(RECORD, str(tmp_path / "archive"))
+    monkeypatch.setattr(utils, "_request", fake_request)
+    monkeypatch.setattr(utils, "get_transport", lambda: recorder)
+    assert utils.safe_get("https://parts.test/item") == "<p>v1</p>"
+    assert utils.safe_get("https://parts.test/item") == "<p>v2</p>"
+    # No fresh-cache shortcut and no conditional request while recording.
+    assert sent_headers == [None, None]
+
+    replayer = Transport(REPLAY, str(tmp_path / "archive"))
+    monkeypatch.setattr(utils, "get_transport", lambda: replayer)
+    monkeypatch.setattr(utils, "get_http_cache", lambda: None)
+    assert utils.safe_get("https://parts.test/item") == "<p>v2</p>"
+
+
+def test_record_skips_not_modified_responses(tmp_path):
+    recorder = Transport(RECORD, str(tmp_path))
+    recorder.request("https://shop.test/p", None, lambda: _response("<p>full</p>"))
+    recorder.request("https://shop.test/p", None, lambda: _response("", status=304))
+
+    replayer = Transport(REPLAY, str(tmp_path))
+    replayed = replayer.request("https://shop.test/p", None, lambda: pytest.fail("went live"))
+
+    assert replayed.status_code == 200
+    assert replayed.text == "<p>full</p>"
+    assert recorder.stats()["recorded"] == 1
@@ -1,6 +1,6 @@
 import pytest
 import scrapers.utils as utils
-import playwright.sync_api as playwright_sync
+import playwright.async_api as playwright_async
 from requests.exceptions import ProxyError
 
 from scrapers.utils import parse_price
@@ -18,47 +18,86 @@ def test_parse_price_malformed():
 def test_render_page_fallback(monkeypatch):
     """If Playwright fails, render_page should fall back to safe_get."""
 
-    def fake_sync_playwright():
+    def fake_async_playwright():
         class Dummy:
-            def __enter__(self):
+            async def __aenter__(self):
                 raise RuntimeError("boom")
 
-            def __exit__(self, exc_type, exc, tb):
+            async def __aexit__(self, exc_type, exc, tb):
                 pass
 
         return Dummy()
 
-    monkeypatch.setattr(playwright_sync, "sync_playwright", fake_sync_playwright)
+    monkeypatch.setattr(playwright_async, "async_playwright", fake_async_playwright)
     monkeypatch.setattr(utils, "safe_get", lambda url, params=None: "<html>fallback</html>")
 
     assert utils.render_page("https://example.com") == "<html>fallback</html>"
 
 
+def test_render_page_without_fallback_returns_none(monkeypatch):
+    class FailingPool:
+        def render(self, url, wait_selector=None):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(utils, "get_browser_pool", lambda: FailingPool())
+    monkeypatch.setattr(utils, "safe_get", lambda url, params=None: pytest.fail("fell back to safe_get"))
+
+    assert utils.render_page("https://example.com", fallback=False) is None
+
+
 def test_safe_get_retries_without_proxy(monkeypatch):
     class DummyResponse:
         text = "<html>ok</html>"
+        status_code = 200
+        headers = {}
 
         def raise_for_status(self):
             return None
 
-    def fake_requests_get(*_args, **_kwargs):
-        raise ProxyError("proxy blocked")
-
     class DummySession:
         def __init__(self):
             self.trust_env = True
+            self.headers = {}
 
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
+        def mount(self, prefix, adapter):
+            pass
 
         def get(self, *_args, **_kwargs):
-            assert self.trust_env is False
+            if self.trust_env:
+                raise ProxyError("proxy blocked")
             return DummyResponse()
 
-    monkeypatch.setattr(utils.requests, "get", fake_requests_get)
     monkeypatch.setattr(utils.requests, "Session", DummySession)
+    monkeypatch.setattr(utils, "_SESSIONS", {})
 
     assert utils.safe_get("https://example.com") == "<html>ok</html>"
+
+
+def test_get_session_reuses_pooled_session(monkeypatch):
+    monkeypatch.setattr(utils, "_SESSIONS", {})
+
+    session = utils.get_session()
+    adapter = session.get_adapter("https://example.com")
+
+    assert utils.get_session() is session
+    assert utils.get_session(trust_env=False) is not session
+    assert adapter._pool_maxsize == utils.HTTP_POOL_MAXSIZE
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+def test_make_soup_with_strainer_keeps_product_cards_only():
+    html = """
+    <html><body>
+      <nav class="menu"><a href="/home">Home</a></nav>
+      <ul>
+        <li class="item product product-item"><a class="product-item-link" href="/a">A</a></li>
+      </ul>
+      <div class="item product"><a href="/b">B</a></div>
+    </body></html>
+    """
+
+    soup = utils.make_soup(html, utils.strainer(["li", "div"], utils.PRODUCT_ITEM_CLASSES))
+
+    assert soup.select_one("nav") is None
+    assert [tag.get_text() for tag in soup.select("li.item.product.product-item")] == ["A"]
+    assert [tag.get_text() for tag in soup.select("div.item.product")] == ["B"]
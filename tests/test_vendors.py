@@ -0,0 +1,118 @@
+from scrapers import vendors
+
+
+PAGE = """
+<ol>
+  <li class="product-item">
+    <a class="product-item-photo" href="/photo"><img src="/img/a.jpg" /></a>
+    <a class="product-item-link" href="/iphone-12-screen">iPhone 12 Screen</a>
+    <span class="price">$45.00</span>
+  </li>
+  <li class="product-item">
+    <a href="/iphone-12-battery">iPhone 12 Battery</a>
+    <div class="stock"><span>Out of</span> <b>Stock</b></div>
+    <p>Currently <em>out of stock</em></p>
+  </li>
+</ol>
+"""
+
+
+def _spec(key, **overrides):
+    fields = dict(key=key, name="Acme", base="https://acme.example", search_path="/s?q={query}")
+    fields.update(overrides)
+    return vendors.VendorSpec(**fields)
+
+
+def test_spec_only_vendor_parses_cards(monkeypatch):
+    monkeypatch.setitem(vendors.VENDORS, "acme", _spec("acme"))
+
+    results = vendors.parse_vendor_items(PAGE, "acme", "iphone 12")
+
+    assert [item["title"] for item in results] == ["iPhone 12 Screen", "iPhone 12 Battery"]
+    first, second = results
+    # The preferred link selector wins over an earlier plain anchor.
+    assert first["link"] == "https://acme.example/iphone-12-screen"
+    assert first["price"] == 45.0
+    assert first["image"] == "https://acme.example/img/a.jpg"
+    assert first["in_stock"] is True
+    assert second["price"] == 0.0
+    assert second["image"] == vendors.PLACEHOLDER_IMAGE
+    assert second["in_stock"] is False
+
+
+def test_stock_selector_replaces_text_scan(monkeypatch):
+    monkeypatch.setitem(vendors.VENDORS, "acme-stock", _spec("acme-stock", stock_selector="div.stock"))
+
+    results = vendors.parse_vendor_items(
+        PAGE.replace('class="stock"', 'class="availability"'), "acme-stock", "iphone"
+    )
+
+    assert [item["in_stock"] for item in results] == [True, True]
+
+
+def test_match_filter_drops_unrelated_cards(monkeypatch):
+    monkeypatch.setitem(
+        vendors.VENDORS, "acme-match", _spec("acme-match", match_filter=vendors.token_matcher)
+    )
+
+    results = vendors.parse_vendor_items(PAGE, "acme-match", "iphone battery")
+
+    assert [item["title"] for item in results] == ["iPhone 12 Battery"]
+
+
+def test_static_strategy_never_renders(monkeypatch):
+    spec = _spec("acme-static", strategy="static")
+    monkeypatch.setitem(vendors.VENDORS, spec.key, spec)
+    urls = []
+
+    def fake_fetch(url, params=None):
+        urls.append(url)
+        return PAGE
+
+    def fail_render(url, wait_selector=None):
+        raise AssertionError("static vendors must not render")
+
+    results = vendors.scrape_vendor(spec, "iphone 12", render=fail_render, fetch=fake_fetch)
+
+    assert urls == ["https://acme.example/s?q=iphone+12"]
+    assert len(results) == 2
+
+
+def test_rendered_strategy_does_not_fall_back(monkeypatch):
+    spec = _spec("acme-rendered", strategy="rendered")
+    monkeypatch.setitem(vendors.VENDORS, spec.key, spec)
+
+    def fail_fetch(url, params=None):
+        raise AssertionError("rendered-only vendors must not fetch statically")
+
+    results = vendors.scrape_vendor(spec, "lcd", render=lambda url, wait=None: "<html></html>", fetch=fail_fetch)
+
+    assert results == []
+
+
+def test_failed_render_leaves_the_static_attempt_to_the_plan(monkeypatch):
+    import scrapers.utils as utils
+
+    spec = _spec("acme-fallback", strategy="rendered_then_static")
+    monkeypatch.setitem(vendors.VENDORS, spec.key, spec)
+    urls = []
+
+    class FailingPool:
+        def render(self, url, wait_selector=None):
+            raise RuntimeError("browser crashed")
+
+    def fake_safe_get(url, params=None):
+        urls.append(url)
+        return PAGE
+
+    monkeypatch.setattr(utils, "get_browser_pool", lambda: FailingPool())
+    monkeypatch.setattr(utils, "safe_get", fake_safe_get)
+    strategy = vendors.FetchStrategy()
+
+    results = vendors.scrape_vendor(spec, "iphone 12", strategy=strategy)
+
+    assert len(results) == 2
+    assert urls == ["https://acme.example/s?q=iphone+12"]
+    stats = strategy.stats()["acme.example"]
+    assert stats["render_attempts"] == 1
+    assert stats["render_successes"] == 0
@@ -1,3 +1,8 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from scrapers import websearch
 
 
@@ -109,3 +114,142 @@ def test_extract_price_handles_amazon_markup():
 
     assert price is not None
     assert "15" in price
+
+
+def _results_html(links):
+    blocks = "".join(
+        f'<div class="result"><a class="result__a" href="{link}">Item {index}</a></div>'
+        for index, link in enumerate(links)
+    )
+    return f'<div class="results">{blocks}</div>'
+
+
+def test_previews_are_fetched_concurrently_and_merged_in_order(monkeypatch):
+    links = [f"https://shop{index}.test/item" for index in range(4)]
+    barrier = threading.Barrier(4, timeout=2)
+
+    def fake_preview(url):
+        barrier.wait()  # only passes if all four previews run at once
+        return {"price": url, "price_value": 1.0}
+
+    monkeypatch.setattr(websearch, "safe_get", lambda url, params=None: _results_html(links))
+    monkeypatch.setattr(websearch, "_preview_details_for", fake_preview)
+
+    results = list(websearch.scrape_websearch("iphone battery"))
+
+    assert [item["price"] for item in results] == links
+
+
+def test_previews_respect_per_domain_limit(monkeypatch):
+    links = [f"https://amazon.com/item{index}" for index in range(4)]
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_preview(url):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        return {"image": url}
+
+    monkeypatch.setattr(websearch, "safe_get", lambda url, params=None: _results_html(links))
+    monkeypatch.setattr(websearch, "_preview_details_for", fake_preview)
+    monkeypatch.setattr(websearch, "_PREVIEW_DISPATCHER", websearch._PreviewDispatcher())
+
+    results = list(websearch.scrape_websearch("iphone battery"))
+
+    assert all(item["image"] for item in results)
+    assert active["peak"] <= websearch.PREVIEW_PER_DOMAIN_LIMIT
+
+
+def test_busy_domain_does_not_hold_preview_workers(monkeypatch):
+    links = [f"https://amazon.com/item{index}" for index in range(4)] + ["https://shop.test/item"]
+    other_done = threading.Event()
+    amazon_started = []
+
+    def fake_preview(url):
+        if "amazon" in url:
+            amazon_started.append(url)
+            other_done.wait(2)
+        else:
+            other_done.set()
+        return {"image": url}
+
+    # Two workers for Amazon's limit plus one: the queued Amazon links must
+    # not take the spare worker from the other domain.
+    executor = ThreadPoolExecutor(max_workers=websearch.PREVIEW_PER_DOMAIN_LIMIT + 1)
+    monkeypatch.setattr(websearch, "_PREVIEW_EXECUTOR", executor)
+    monkeypatch.setattr(websearch, "_PREVIEW_DISPATCHER", websearch._PreviewDispatcher())
+    monkeypatch.setattr(websearch, "_preview_details_for", fake_preview)
+
+    started = time.monotonic()
+    previews = websearch._fetch_previews(dict(enumerate(links)))
+    executor.shutdown()
+
+    assert time.monotonic() - started < 1.5
+    assert len(amazon_started) == 4
+    assert len(previews) == 5
+
+
+def test_previews_past_time_budget_are_skipped(monkeypatch):
+    links = ["https://fast.test/item", "https://slow.test/item"]
+    release = threading.Event()
+
+    def fake_preview(url):
+        if "slow" in url:
+            release.wait(2)
+        return {"price": "$5.00", "price_value": 5.0}
+
+    monkeypatch.setattr(websearch, "safe_get", lambda url, params=None: _results_html(links))
+    monkeypatch.setattr(websearch, "_preview_details_for", fake_preview)
+    monkeypatch.setattr(websearch, "PREVIEW_TIME_BUDGET_SECONDS", 0.2)
+
+    try:
+        results = list(websearch.scrape_websearch("iphone battery"))
+    finally:
+        release.set()
+
+    assert results[0]["price"] == "$5.00"
+    assert results[1]["price"] is None
+
+
+def test_preview_document_parses_body_only_when_needed():
+    html = """
+    <html><head>
+      <meta property="og:image" content="https://cdn.test/pic.jpg" />
+      <meta property="product:price:amount" content="12.50" />
+    </head><body><span class="price">$99.00</span></body></html>
+    """
+
+    document = websearch._PreviewDocument(html)
+    assert websearch._extract_price_text(document, "shop.test") == "12.50"
+    assert document._full is None
+
+    # Amazon's body selectors force a full parse before falling back to meta.
+    assert websearch._extract_price_text(document, "www.amazon.com") == "12.50"
+    assert document._full is not None
+
+
+def test_async_scrape_fetches_previews_as_coroutines(monkeypatch):
+    links = [f"https://shop{index}.test/item" for index in range(4)]
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_fetch(url, params=None):
+        if url == websearch.SEARCH_URL:
+            return _results_html(links)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return f'<html><body><span class="price">$1{url[len("https://shop")]}.00</span></body></html>'
+
+    monkeypatch.setattr(websearch.aio, "fetch_text", fake_fetch)
+    monkeypatch.setattr(websearch.PREVIEW_CACHE, "get", lambda url: None)
+    monkeypatch.setattr(websearch.PREVIEW_CACHE, "set", lambda url, details: None)
+
+    results = asyncio.run(websearch.scrape_websearch_async("iphone battery"))
+
+    assert in_flight["max"] == 4
+    assert [item["price_value"] for item in results] == [10.0, 11.0, 12.0, 13.0]